@@ -0,0 +1,157 @@
+"""
+Benchmark - Carga no SQL Server: executemany x bulk copy (bcp)
+
+Cria uma tabela de rascunho <schema>.benchmark_bulk_copy com os tipos do
+positivador (DECIMAL, DATE, VARCHAR, INT), carrega o mesmo DataFrame
+sintético pelos dois caminhos do SQLServerLoader e compara o tempo total
+(linhas/s). A tabela é apagada no final.
+
+Usa as variáveis SQL_* do .env; serve um SQL Server local em container:
+    docker run -e ACCEPT_EULA=Y -e MSSQL_SA_PASSWORD=... -p 1433:1433 \\
+        mcr.microsoft.com/mssql/server:2022-latest
+
+Com --offline não acessa o banco: mede só a preparação dos dados
+(lotes do executemany x arquivo do bcp).
+
+Uso:
+    python benchmarks/benchmark_bulk_copy.py
+    python benchmarks/benchmark_bulk_copy.py --linhas 300000 --lote 5000
+    python benchmarks/benchmark_bulk_copy.py --offline
+
+Requer: bcp (mssql-tools) no PATH ou em SQL_BCP_PATH e login integrado
+(SQL_BCP_AUTH=trusted, ver loaders/bulk_copy.py)
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_dir)
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from config.database_config import LoadStrategy, TableConfig, get_database_config
+from loaders import bulk_copy
+from loaders.sql_server_loader import SQLServerLoader
+
+TABELA = "benchmark_bulk_copy"
+COLUNAS_VALOR = 30
+
+
+def gerar_dataframe(linhas: int, seed: int = 42) -> pd.DataFrame:
+    """Formato do positivador processado: data, códigos, textos e valores."""
+    rng = np.random.default_rng(seed)
+    dados = {
+        "data_ref": pd.Timestamp("2024-01-31") + pd.to_timedelta(rng.integers(0, 365, linhas), unit="D"),
+        "cod_assessor": rng.integers(1000, 99999, linhas),
+        "cod_cliente": rng.integers(1, 10_000_000, linhas),
+        "segmento": pd.Series(rng.choice(["varejo", "private", "exclusive"], linhas), dtype=object),
+        "profissao": pd.Series(rng.choice(["medico", "engenheiro", "nao informado"], linhas), dtype=object),
+    }
+    # Como nas receitas do positivador: a maioria dos clientes tem zero
+    for i in range(COLUNAS_VALOR):
+        valores = rng.uniform(-1e6, 1e6, linhas).round(2)
+        sorteio = rng.random(linhas)
+        valores[sorteio < 0.7] = 0.0
+        valores[sorteio > 0.9] = np.nan
+        dados[f"valor_{i}"] = valores
+    return pd.DataFrame(dados)
+
+
+def ddl(full_table_name: str) -> str:
+    """CREATE TABLE da tabela de rascunho (tipos do positivador)."""
+    colunas = [
+        "data_ref DATE",
+        "cod_assessor INT",
+        "cod_cliente INT",
+        "segmento VARCHAR(50)",
+        "profissao VARCHAR(100)",
+    ] + [f"valor_{i} DECIMAL(16,4)" for i in range(COLUNAS_VALOR)]
+    return f"CREATE TABLE {full_table_name} ({', '.join(colunas)})"
+
+
+def medir_offline(df: pd.DataFrame, lote: int) -> None:
+    """Só a preparação: parâmetros do executemany x arquivo UTF-16 do bcp."""
+    inicio = time.perf_counter()
+    for _ in SQLServerLoader._iter_batches(df, lote):
+        pass
+    t_params = time.perf_counter() - inicio
+
+    column_types = {coluna: {"default": None} for coluna in df.columns}
+    inicio = time.perf_counter()
+    destino = io.StringIO()
+    bulk_copy.serializar_para_bcp(df, column_types, destino, lote)
+    destino.getvalue().encode("utf-16-le")
+    t_bcp = time.perf_counter() - inicio
+
+    print(f"   {'parâmetros executemany':<26} {t_params:>8.2f}s")
+    print(f"   {'arquivo do bcp':<26} {t_bcp:>8.2f}s")
+
+
+def medir_carga(loader: SQLServerLoader, df: pd.DataFrame, bulk: bool) -> float:
+    """Trunca a tabela e carrega o DataFrame por um dos caminhos."""
+    config = loader.config
+    config.get_table_config(TABELA).bulk_copy = bulk
+    with loader._get_engine().begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {config.get_full_table_name(TABELA)}"))
+
+    inicio = time.perf_counter()
+    linhas = loader._insert_dataframe(df, TABELA)
+    duracao = time.perf_counter() - inicio
+    if linhas != len(df):
+        raise RuntimeError(f"{linhas} de {len(df)} linhas carregadas")
+    return duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark executemany x bcp")
+    parser.add_argument("--linhas", type=int, default=300_000)
+    parser.add_argument("--lote", type=int, default=5000, help="batch_size da tabela")
+    parser.add_argument("--offline", action="store_true", help="Só mede a preparação dos dados")
+    args = parser.parse_args()
+
+    df = gerar_dataframe(args.linhas)
+    print(f"📊 BENCHMARK - Carga SQL Server ({args.linhas:,} linhas x {df.shape[1]} colunas, lote {args.lote:,})")
+
+    if args.offline:
+        medir_offline(df, args.lote)
+        return
+
+    config = get_database_config()
+    if bulk_copy.localizar_bcp(config.bcp_path) is None:
+        print(f"❌ bcp não encontrado ({config.bcp_path}); instale o mssql-tools ou use --offline")
+        return
+    if config.bcp_auth != "trusted":
+        print("❌ bcp requer login integrado (SQL_BCP_AUTH=trusted); ou use --offline")
+        return
+
+    config.add_table_config(
+        TABELA, TableConfig(name=TABELA, load_strategy=LoadStrategy.APPEND, batch_size=args.lote)
+    )
+    full_table_name = config.get_full_table_name(TABELA)
+    loader = SQLServerLoader()
+
+    with loader._get_engine().begin() as conn:
+        conn.execute(text(f"IF OBJECT_ID('{full_table_name}') IS NOT NULL DROP TABLE {full_table_name}"))
+        conn.execute(text(ddl(full_table_name)))
+
+    try:
+        t_executemany = medir_carga(loader, df, bulk=False)
+        t_bcp = medir_carga(loader, df, bulk=True)
+    finally:
+        with loader._get_engine().begin() as conn:
+            conn.execute(text(f"DROP TABLE {full_table_name}"))
+
+    print(f"   {'caminho':<14} {'tempo (s)':>10} {'linhas/s':>12}")
+    for nome, duracao in [("executemany", t_executemany), ("bcp", t_bcp)]:
+        print(f"   {nome:<14} {duracao:>10.2f} {args.linhas / duracao:>12,.0f}")
+    print(f"\n   Ganho: {t_executemany / t_bcp:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
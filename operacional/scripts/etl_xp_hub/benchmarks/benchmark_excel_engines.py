@@ -0,0 +1,108 @@
+"""
+Benchmark - Leitura de Excel: openpyxl x calamine
+
+Lê cada fixture examples_data/*/*_antes_do_etl.xlsx com dtype=str em cada
+engine e compara tempo de parse e pico de memória (RSS). Cada medição roda
+num subprocesso próprio para que o pico de uma leitura não contamine a
+outra.
+
+Uso:
+    python benchmarks/benchmark_excel_engines.py
+    python benchmarks/benchmark_excel_engines.py --repeticoes 5
+
+Requer: pip install python-calamine (pandas >= 2.2)
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_dir)
+
+ENGINES = ["openpyxl", "calamine"]
+
+
+def medir_subprocesso(arquivo: str, engine: str, repeticoes: int) -> dict:
+    """Executa a leitura num subprocesso e devolve as métricas em JSON."""
+    resultado = subprocess.run(
+        [sys.executable, __file__, "--medir", arquivo, "--engine", engine,
+         "--repeticoes", str(repeticoes)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def medir(arquivo: str, engine: str, repeticoes: int):
+    """Lê o arquivo e imprime tempo mínimo e pico de RSS acima da linha de base."""
+    import resource
+    import time
+    import warnings
+
+    import pandas as pd
+
+    warnings.simplefilter("ignore")
+    rss_base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        df = pd.read_excel(arquivo, dtype=str, engine=engine)
+        tempos.append(time.perf_counter() - inicio)
+
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "segundos": min(tempos),
+        "rss_mb": (rss_pico - rss_base) / 1024,  # ru_maxrss em KB no Linux
+        "linhas": len(df),
+        "colunas": len(df.columns),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de engines de leitura Excel")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    parser.add_argument("--engine", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        medir(args.medir, args.engine, args.repeticoes)
+        return
+
+    from utils.excel_reader import calamine_available
+
+    if not calamine_available():
+        print("⚠️ python-calamine não disponível (ou pandas < 2.2); medindo só openpyxl")
+        engines = ["openpyxl"]
+    else:
+        engines = ENGINES
+
+    arquivos = sorted(glob.glob(os.path.join(base_dir, "examples_data", "*", "*_antes_do_etl.xlsx")))
+
+    print("📊 BENCHMARK - pd.read_excel(dtype=str)")
+    print(f"   {'arquivo':<45} {'linhas':>7} " + " ".join(f"{e + ' s':>12} {e + ' MB':>13}" for e in engines))
+
+    totais = {e: 0.0 for e in engines}
+    for arquivo in arquivos:
+        metricas = {e: medir_subprocesso(arquivo, e, args.repeticoes) for e in engines}
+        totais.update({e: totais[e] + metricas[e]["segundos"] for e in engines})
+        linhas = metricas[engines[0]]["linhas"]
+        colunas = " ".join(
+            f"{metricas[e]['segundos']:>12.3f} {metricas[e]['rss_mb']:>13.1f}" for e in engines
+        )
+        print(f"   {os.path.basename(arquivo):<45} {linhas:>7} {colunas}")
+
+    print("   " + "-" * 60)
+    print("   Total: " + " | ".join(f"{e}: {totais[e]:.2f}s" for e in engines))
+    if len(engines) == 2 and totais["calamine"] > 0:
+        print(f"   Ganho: {totais['openpyxl'] / totais['calamine']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
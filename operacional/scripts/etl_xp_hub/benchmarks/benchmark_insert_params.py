@@ -0,0 +1,131 @@
+"""
+Benchmark - Conversão DataFrame -> parâmetros do executemany
+
+Gera um DataFrame no formato do positivador processado (colunas float com
+nulos, texto, datas e inteiros) e compara a conversão antiga do
+SQLServerLoader._insert_dataframe (itertuples + pd.isna por célula, lista
+de tuplas do frame inteiro) com a atual (_iter_batches: conversão por
+coluna, um lote por vez). Mede tempo de CPU e pico de memória alocada
+(tracemalloc) e confere que os lotes têm exatamente os mesmos valores.
+
+Não acessa o banco: os lotes são só consumidos.
+
+Uso:
+    python benchmarks/benchmark_insert_params.py
+    python benchmarks/benchmark_insert_params.py --linhas 300000 --colunas 40 --lote 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_dir)
+
+import numpy as np
+import pandas as pd
+
+from loaders.sql_server_loader import SQLServerLoader
+
+
+def gerar_dataframe(linhas: int, colunas: int, nulos: float, seed: int = 42) -> pd.DataFrame:
+    """Mistura de tipos como no positivador: maioria float, alguns textos e datas."""
+    rng = np.random.default_rng(seed)
+    dados = {}
+    for i in range(colunas):
+        tipo = i % 8
+        if tipo == 0:
+            dados[f"texto_{i}"] = pd.Series(
+                rng.choice(["ativo", "inativo", "não informado"], linhas), dtype=object
+            )
+        elif tipo == 1:
+            dados[f"data_{i}"] = pd.Timestamp("2020-01-01") + pd.to_timedelta(
+                rng.integers(0, 1800, linhas), unit="D"
+            )
+        elif tipo == 2:
+            dados[f"inteiro_{i}"] = rng.integers(0, 2, linhas)
+        else:
+            dados[f"valor_{i}"] = rng.uniform(-1e6, 1e6, linhas).round(2)
+
+    df = pd.DataFrame(dados)
+    mascara = rng.random((linhas, colunas)) < nulos
+    for i, coluna in enumerate(df.columns):
+        if df[coluna].dtype.kind not in "iu":
+            df.loc[mascara[:, i], coluna] = None
+    return df
+
+
+def conversao_antiga(df: pd.DataFrame, batch_size: int):
+    """Como era: lista de tuplas do frame inteiro, pd.isna em cada célula."""
+    data_tuples = []
+    for row in df.itertuples(index=False, name=None):
+        converted_row = tuple(None if pd.isna(val) else val for val in row)
+        data_tuples.append(converted_row)
+    for i in range(0, len(data_tuples), batch_size):
+        yield data_tuples[i:i + batch_size]
+
+
+def medir(criar_gerador) -> tuple:
+    """
+    Consome os lotes duas vezes: uma para o tempo de CPU e outra, com
+    tracemalloc (que deixa as alocações bem mais lentas), para o pico.
+
+    Returns:
+        (CPU em s, pico em MB, tamanhos dos lotes)
+    """
+    inicio = time.process_time()
+    lotes = [len(lote) for lote in criar_gerador()]
+    cpu = time.process_time() - inicio
+
+    tracemalloc.start()
+    for _ in criar_gerador():
+        pass
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, pico / 1024**2, lotes
+
+
+def mesmos_valores(df: pd.DataFrame, batch_size: int) -> bool:
+    """Compara valor e tipo de cada parâmetro nas duas conversões."""
+    for antigo, novo in zip(conversao_antiga(df, batch_size), SQLServerLoader._iter_batches(df, batch_size)):
+        if len(antigo) != len(novo):
+            return False
+        for linha_antiga, linha_nova in zip(antigo, novo):
+            if linha_antiga != linha_nova or list(map(type, linha_antiga)) != list(map(type, linha_nova)):
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da conversão para executemany")
+    parser.add_argument("--linhas", type=int, default=300_000)
+    parser.add_argument("--colunas", type=int, default=40)
+    parser.add_argument("--lote", type=int, default=5000, help="batch_size da tabela")
+    parser.add_argument("--nulos", type=float, default=0.1, help="Fração de células vazias")
+    args = parser.parse_args()
+
+    df = gerar_dataframe(args.linhas, args.colunas, args.nulos)
+
+    print(
+        f"📊 BENCHMARK - Parâmetros do executemany "
+        f"({args.linhas:,} linhas x {args.colunas} colunas, lote {args.lote:,})"
+    )
+    print(f"   {'conversão':<28} {'CPU (s)':>9} {'pico (MB)':>10}")
+
+    cpu_antigo, pico_antigo, lotes_antigos = medir(lambda: conversao_antiga(df, args.lote))
+    print(f"   {'itertuples + pd.isna':<28} {cpu_antigo:>9.2f} {pico_antigo:>10.1f}")
+
+    cpu_novo, pico_novo, lotes_novos = medir(lambda: SQLServerLoader._iter_batches(df, args.lote))
+    print(f"   {'por coluna, lote sob demanda':<28} {cpu_novo:>9.2f} {pico_novo:>10.1f}")
+
+    igual = lotes_antigos == lotes_novos and mesmos_valores(df, args.lote)
+    print(
+        f"\n   Ganho: {cpu_antigo / cpu_novo:.1f}x CPU, {pico_antigo / pico_novo:.1f}x menos memória"
+        f"  |  mesmos valores: {'✅' if igual else '❌'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark - Download serial x paralelo do S3Extractor
+
+Monta um bucket falso com moto (sem acesso à AWS), injeta uma latência
+fixa por requisição para simular o round-trip até o S3 e compara o tempo
+de download_all_files com 1 worker e com N workers.
+
+Uso:
+    python benchmarks/benchmark_s3_download.py
+    python benchmarks/benchmark_s3_download.py --pastas 15 --arquivos 4 --latencia 0.05 --workers 8
+
+Requer: pip install "moto[s3]"
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_dir)
+
+# Credenciais falsas - o moto intercepta todas as chamadas
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ["AWS_REGION"] = "us-east-1"
+os.environ["S3_BUCKET_NAME"] = "benchmark-hub-xp"
+
+import boto3
+from moto import mock_aws
+
+from extractors.s3_extractor import S3Extractor
+
+
+def popular_bucket(num_pastas: int, arquivos_por_pasta: int, tamanho_kb: int):
+    """Cria pastas no padrão Hub XP com arquivos pendentes e já processados."""
+    s3 = boto3.client("s3", region_name="us-east-1")
+    s3.create_bucket(Bucket=os.environ["S3_BUCKET_NAME"])
+    conteudo = os.urandom(tamanho_kb * 1024)
+
+    for p in range(num_pastas):
+        pasta = f"pasta{p:02d}"
+        for a in range(arquivos_por_pasta):
+            nome = f"{pasta}_2025-01-{a + 1:02d}.xlsx"
+            s3.put_object(Bucket=os.environ["S3_BUCKET_NAME"], Key=f"{pasta}/{nome}", Body=conteudo)
+        # Histórico que não deve ser baixado
+        s3.put_object(
+            Bucket=os.environ["S3_BUCKET_NAME"],
+            Key=f"{pasta}/processado/{pasta}_2024-12-31.xlsx",
+            Body=conteudo,
+        )
+
+
+def medir(workers: int, latencia: float) -> tuple:
+    """Executa download_all_files e retorna (segundos, chaves baixadas)."""
+    temp_folder = tempfile.mkdtemp(prefix="bench_s3_")
+    try:
+        extractor = S3Extractor(temp_folder)
+        client = extractor._get_s3_client()
+
+        def atraso(**kwargs):
+            time.sleep(latencia)
+
+        client.meta.events.register("before-send.s3", atraso)
+
+        inicio = time.perf_counter()
+        arquivos = extractor.download_all_files(max_workers=workers)
+        duracao = time.perf_counter() - inicio
+        return duracao, [a.s3_key for a in arquivos]
+    finally:
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de download do S3Extractor")
+    parser.add_argument("--pastas", type=int, default=15)
+    parser.add_argument("--arquivos", type=int, default=3, help="Arquivos pendentes por pasta")
+    parser.add_argument("--tamanho-kb", type=int, default=256)
+    parser.add_argument("--latencia", type=float, default=0.03, help="Segundos por requisição")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with mock_aws():
+        popular_bucket(args.pastas, args.arquivos, args.tamanho_kb)
+
+        # Silencia os prints do extrator durante a medição
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            t_serial, chaves_serial = medir(1, args.latencia)
+            t_paralelo, chaves_paralelo = medir(args.workers, args.latencia)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    print("📊 BENCHMARK - S3Extractor.download_all_files")
+    print(f"   Pastas: {args.pastas} | Arquivos/pasta: {args.arquivos} | Latência: {args.latencia * 1000:.0f} ms")
+    print(f"   Serial (1 worker):      {t_serial:.2f}s")
+    print(f"   Paralelo ({args.workers} workers):  {t_paralelo:.2f}s")
+    print(f"   Ganho: {t_serial / t_paralelo:.1f}x")
+    print(f"   Mesma ordem de resultado: {'✅' if chaves_serial == chaves_paralelo else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark - Conversores de coluna da Tabela: apply por célula x vetorizado
+
+Gera colunas sintéticas no formato dos exports do Hub XP e compara, para
+cada conversor, o caminho antigo (Series.apply com o método por célula)
+com o vetorizado usado hoje pela Tabela. Também confere que os dois
+produzem exatamente o mesmo resultado.
+
+Uso:
+    python benchmarks/benchmark_tabela_parsers.py
+    python benchmarks/benchmark_tabela_parsers.py --linhas 200000 --nulos 0.1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_dir)
+
+import numpy as np
+import pandas as pd
+
+from processors.tabela import Tabela, _normalizar_texto
+
+
+def gerar_colunas(linhas: int, nulos: float, seed: int = 42) -> dict:
+    """Colunas de texto como saem do read_excel(dtype=str)."""
+    rng = np.random.default_rng(seed)
+    valores = rng.uniform(-1e7, 1e7, linhas).round(2)
+
+    decimal_ponto = pd.Series(valores.astype(str), dtype=object)
+    decimal_virgula = decimal_ponto.str.replace(".", ",", regex=False)
+
+    # 1.234,56 com separador de milhar e R$ -1.234,56
+    milhar = pd.Series(
+        [f"{v:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".") for v in valores],
+        dtype=object,
+    )
+    monetario = "R$ " + milhar
+
+    dias = rng.integers(0, 365 * 30, linhas)
+    datas = pd.Series(
+        (pd.Timestamp("1995-01-01") + pd.to_timedelta(dias, unit="D")).strftime("%d/%m/%Y"),
+        dtype=object,
+    )
+
+    # Como nas receitas do positivador: a maioria dos clientes tem zero
+    zeros = decimal_virgula.where(rng.random(linhas) < 0.2, "0")
+
+    profissoes = ["Médico", "Engenheiro(a)", "Advogada", "Não Informado", "Aposentado", "Empresário"]
+    texto = pd.Series(rng.choice(profissoes, linhas), dtype=object)
+
+    colunas = {
+        "numerico (1234.56)": decimal_ponto,
+        "numerico (1234,56)": decimal_virgula,
+        "numerico (80% zeros)": zeros,
+        "monetario (1.234,56)": milhar,
+        "monetario (R$ -1.234,56)": monetario,
+        "data (dd/mm/aaaa)": datas,
+        "texto (profissao)": texto,
+    }
+
+    mascara_nula = rng.random(linhas) < nulos
+    for serie in colunas.values():
+        serie[mascara_nula] = None
+
+    return colunas
+
+
+def medir(func, serie: pd.Series) -> tuple:
+    """Retorna (segundos, resultado) de uma conversão."""
+    inicio = time.perf_counter()
+    resultado = func(serie)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos conversores da Tabela")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--nulos", type=float, default=0.05, help="Fração de células vazias")
+    args = parser.parse_args()
+
+    tabela = Tabela(dataframe=pd.DataFrame({"x": [None]}))
+    conversores = {
+        "numerico": (
+            lambda s: s.apply(tabela._format_numeric),
+            tabela._parse_numeric_series,
+        ),
+        "monetario": (
+            lambda s: s.apply(tabela._clean_monetary_value),
+            tabela._parse_monetary_series,
+        ),
+        "data": (
+            lambda s: s.apply(tabela._format_date_br_robust),
+            tabela._parse_date_series,
+        ),
+        # Caminho antigo sem o cache de textos normalizados
+        "texto": (
+            lambda s: s.apply(lambda v: None if pd.isna(v) else _normalizar_texto.__wrapped__(str(v))),
+            tabela._normalize_text_series,
+        ),
+    }
+
+    print(f"📊 BENCHMARK - Conversores da Tabela ({args.linhas:,} linhas, {args.nulos:.0%} nulos)")
+    print(f"   {'coluna':<28} {'apply (s)':>10} {'vetorizado (s)':>15} {'ganho':>8}  igual")
+
+    for nome, serie in gerar_colunas(args.linhas, args.nulos).items():
+        antigo, novo = conversores[nome.split(" ")[0]]
+        t_antigo, r_antigo = medir(antigo, serie)
+        t_novo, r_novo = medir(novo, serie)
+
+        try:
+            pd.testing.assert_series_equal(r_antigo, r_novo, check_exact=True)
+            igual = "✅"
+        except AssertionError:
+            igual = "❌"
+
+        print(f"   {nome:<28} {t_antigo:>10.2f} {t_novo:>15.3f} {t_antigo / t_novo:>7.0f}x  {igual}")
+
+
+if __name__ == "__main__":
+    main()
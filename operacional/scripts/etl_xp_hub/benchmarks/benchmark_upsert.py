@@ -0,0 +1,179 @@
+"""
+Benchmark - UPSERT (staging + UPDATE/INSERT) x filtro por chave + APPEND
+
+Cria uma tabela de rascunho <schema>.benchmark_upsert com chave única,
+carrega --existentes linhas e aplica um arquivo de --linhas linhas pelos
+dois caminhos do SQLServerLoader:
+
+- filtro + APPEND: Tabela.filter_new_records_by_key (lê todas as chaves
+  do banco) e insere só as novas; linhas alteradas ficam desatualizadas
+- UPSERT: staging + UPDATE das alteradas + INSERT das novas
+- UPSERT atômico em blocos: o mesmo arquivo em --blocos blocos por
+  load_chunks, todos numa transação (TableConfig.atomic); com
+  SQL_BCP_AUTH=trusted cada bloco usa a sua staging carregada pelo bcp
+
+Antes de cada medida a tabela volta ao estado inicial (fora do tempo).
+A tabela é apagada no final.
+
+Usa as variáveis SQL_* do .env; serve um SQL Server local em container:
+    docker run -e ACCEPT_EULA=Y -e MSSQL_SA_PASSWORD=... -p 1433:1433 \\
+        mcr.microsoft.com/mssql/server:2022-latest
+
+Uso:
+    python benchmarks/benchmark_upsert.py
+    python benchmarks/benchmark_upsert.py --existentes 1000000 --linhas 100000 --novas 0.2 --alteradas 0.3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_dir)
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from config.database_config import LoadStrategy, TableConfig, get_database_config
+from loaders.sql_server_loader import SQLServerLoader, get_connection_metrics, get_engine
+from processors.tabela import Tabela
+
+TABELA = "benchmark_upsert"
+CHAVE = "chave"
+
+
+def gerar_base(linhas: int, seed: int = 42) -> pd.DataFrame:
+    """Estado inicial da tabela: chave única, data, texto e valores."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        CHAVE: [f"C{i:010d}" for i in range(linhas)],
+        "data_ref": pd.Timestamp("2024-01-31") + pd.to_timedelta(rng.integers(0, 365, linhas), unit="D"),
+        "segmento": pd.Series(rng.choice(["varejo", "private", "exclusive"], linhas), dtype=object),
+        "valor": rng.uniform(-1e6, 1e6, linhas).round(2),
+    })
+
+
+def gerar_arquivo(base: pd.DataFrame, linhas: int, novas: float, alteradas: float, seed: int = 7) -> pd.DataFrame:
+    """Arquivo com chaves novas, chaves existentes alteradas e existentes iguais."""
+    rng = np.random.default_rng(seed)
+    n_novas = int(linhas * novas)
+    existentes = base.iloc[rng.choice(len(base), linhas - n_novas, replace=False)].reset_index(drop=True)
+
+    # Parte das existentes muda de valor
+    mudam = rng.random(len(existentes)) < alteradas
+    existentes.loc[mudam, "valor"] = (existentes.loc[mudam, "valor"] + 1).round(2)
+
+    novas_linhas = gerar_base(n_novas, seed=seed)
+    novas_linhas[CHAVE] = [f"N{i:010d}" for i in range(n_novas)]
+    return pd.concat([existentes, novas_linhas], ignore_index=True)
+
+
+def ddl(full_table_name: str) -> str:
+    """CREATE TABLE da tabela de rascunho."""
+    return (
+        f"CREATE TABLE {full_table_name} ("
+        f"{CHAVE} VARCHAR(20) NOT NULL PRIMARY KEY, data_ref DATE, "
+        f"segmento VARCHAR(50), valor DECIMAL(16,4))"
+    )
+
+
+def restaurar(loader: SQLServerLoader, base: pd.DataFrame) -> None:
+    """Volta a tabela ao estado inicial."""
+    with get_engine().begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {loader.config.get_full_table_name(TABELA)}"))
+    loader._insert_dataframe(base, TABELA)
+
+
+def medir_filtro_append(loader: SQLServerLoader, arquivo: pd.DataFrame) -> tuple:
+    """Caminho atual: filtra as chaves novas e insere com APPEND."""
+    loader.config.get_table_config(TABELA).load_strategy = LoadStrategy.APPEND
+    inicio = time.perf_counter()
+    novos = Tabela.filter_new_records_by_key(
+        arquivo.copy(), loader.config.get_full_table_name(TABELA), get_engine(), CHAVE
+    )
+    resultado = loader.load_data(novos, TABELA) if len(novos) else {"rows_inserted": 0}
+    return time.perf_counter() - inicio, resultado
+
+
+def medir_upsert(loader: SQLServerLoader, arquivo: pd.DataFrame) -> tuple:
+    """UPSERT pela chave."""
+    loader.config.get_table_config(TABELA).load_strategy = LoadStrategy.UPSERT
+    inicio = time.perf_counter()
+    resultado = loader.load_data(arquivo, TABELA)
+    return time.perf_counter() - inicio, resultado
+
+
+def medir_upsert_atomico(loader: SQLServerLoader, arquivo: pd.DataFrame, blocos: int) -> tuple:
+    """UPSERT pela chave em blocos, numa única transação."""
+    table_config = loader.config.get_table_config(TABELA)
+    table_config.load_strategy = LoadStrategy.UPSERT
+    table_config.atomic = True
+    tamanho = -(-len(arquivo) // blocos)
+    partes = (arquivo.iloc[i:i + tamanho] for i in range(0, len(arquivo), tamanho))
+    inicio = time.perf_counter()
+    try:
+        resultado = loader.load_chunks(partes, TABELA)
+    finally:
+        table_config.atomic = False
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark UPSERT x filtro + APPEND")
+    parser.add_argument("--existentes", type=int, default=500_000, help="Linhas já na tabela")
+    parser.add_argument("--linhas", type=int, default=50_000, help="Linhas do arquivo")
+    parser.add_argument("--novas", type=float, default=0.2, help="Fração de chaves novas no arquivo")
+    parser.add_argument("--alteradas", type=float, default=0.3, help="Fração de linhas existentes alteradas")
+    parser.add_argument("--lote", type=int, default=5000, help="batch_size da tabela")
+    parser.add_argument("--blocos", type=int, default=4, help="Blocos do UPSERT atômico")
+    args = parser.parse_args()
+
+    base = gerar_base(args.existentes)
+    arquivo = gerar_arquivo(base, args.linhas, args.novas, args.alteradas)
+    print(
+        f"📊 BENCHMARK - UPSERT ({args.existentes:,} linhas na tabela, arquivo de {args.linhas:,}: "
+        f"{args.novas:.0%} novas, {args.alteradas:.0%} alteradas)"
+    )
+
+    config = get_database_config()
+    config.add_table_config(
+        TABELA,
+        TableConfig(name=TABELA, load_strategy=LoadStrategy.UPSERT, primary_key=CHAVE, batch_size=args.lote),
+    )
+    full_table_name = config.get_full_table_name(TABELA)
+    loader = SQLServerLoader()
+
+    with get_engine().begin() as conn:
+        conn.execute(text(f"IF OBJECT_ID('{full_table_name}') IS NOT NULL DROP TABLE {full_table_name}"))
+        conn.execute(text(ddl(full_table_name)))
+
+    try:
+        restaurar(loader, base)
+        t_filtro, r_filtro = medir_filtro_append(loader, arquivo)
+        restaurar(loader, base)
+        t_upsert, r_upsert = medir_upsert(loader, arquivo)
+        linhas_finais = loader.get_table_row_count(TABELA)
+        restaurar(loader, base)
+        t_atomico, r_atomico = medir_upsert_atomico(loader, arquivo, args.blocos)
+        linhas_atomico = loader.get_table_row_count(TABELA)
+    finally:
+        with get_engine().begin() as conn:
+            conn.execute(text(f"DROP TABLE {full_table_name}"))
+
+    print(f"\n   {'caminho':<16} {'tempo (s)':>10} {'inseridas':>10} {'atualizadas':>12}")
+    print(f"   {'filtro + APPEND':<16} {t_filtro:>10.2f} {r_filtro['rows_inserted']:>10,} {'-':>12}")
+    print(f"   {'UPSERT':<16} {t_upsert:>10.2f} {r_upsert['rows_inserted']:>10,} {r_upsert['rows_updated']:>12,}")
+    print(
+        f"   {'UPSERT atômico':<16} {t_atomico:>10.2f} {r_atomico['rows_inserted']:>10,} "
+        f"{r_atomico['rows_updated']:>12,}  ({r_atomico['chunks']} blocos)"
+    )
+    print(f"\n   Ganho: {t_filtro / t_upsert:.1f}x  |  linhas na tabela: {linhas_finais:,}")
+    if (linhas_atomico, r_atomico["rows_updated"]) != (linhas_finais, r_upsert["rows_updated"]):
+        print(f"   ⚠️ UPSERT atômico divergiu: {linhas_atomico:,} linhas na tabela")
+    print(f"   Conexões: {get_connection_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
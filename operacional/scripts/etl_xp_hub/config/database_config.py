@@ -6,7 +6,7 @@ incluindo string de conexão, configurações de tabelas e estratégias de carre
 """
 
 import os
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 from dotenv import load_dotenv
@@ -36,10 +36,27 @@ class TableConfig:
 
     name: str  # Nome da tabela no banco
     load_strategy: LoadStrategy  # Estratégia de carregamento
-    primary_key: Optional[str] = None  # Chave primária (para upsert/incremental)
-    batch_size: int = 1000  # Tamanho do lote para inserção
+    primary_key: Optional[Union[str, List[str]]] = None  # Chave (upsert/incremental); composta: "a, b" ou ["a", "b"]
+    batch_size: int = 1000  # Tamanho do lote para inserção (linhas por executemany)
+    commit_every: Optional[int] = None  # Linhas por transação (None = commit a cada lote)
+    atomic: bool = False  # Arquivo inteiro numa transação: falha não deixa linhas parciais
     timeout_seconds: int = 300  # Timeout para operações
     truncate_before_load: bool = False  # Se deve truncar antes (para TRUNCATE_LOAD)
+    bulk_copy: Optional[bool] = None  # bcp: None segue SQL_BULK_COPY, False nunca usa
+
+    def commit_interval(self) -> Optional[int]:
+        """Linhas entre commits (None = um commit só, no fim do arquivo)."""
+        if self.atomic:
+            return None
+        return self.commit_every or self.batch_size
+
+    def key_columns(self) -> List[str]:
+        """Colunas da chave primária (várias se a chave for composta)."""
+        if not self.primary_key:
+            return []
+        if isinstance(self.primary_key, str):
+            return [coluna.strip() for coluna in self.primary_key.split(",") if coluna.strip()]
+        return list(self.primary_key)
 
     def __post_init__(self):
         """Validações após inicialização"""
@@ -78,6 +95,22 @@ class SQLServerConfig:
         self.connection_timeout = int(os.getenv("SQL_CONNECTION_TIMEOUT", "30"))
         self.command_timeout = int(os.getenv("SQL_COMMAND_TIMEOUT", "300"))
 
+        # Bulk copy (bcp): "auto" usa quando o bcp está instalado e o lote
+        # tem pelo menos SQL_BULK_MIN_ROWS linhas; "off" desliga
+        self.bulk_copy = os.getenv("SQL_BULK_COPY", "auto").lower()
+        self.bulk_min_rows = int(os.getenv("SQL_BULK_MIN_ROWS", "20000"))
+        self.bulk_tablock = os.getenv("SQL_BULK_TABLOCK", "true").lower() == "true"
+        self.bcp_path = os.getenv("SQL_BCP_PATH", "bcp")
+        self.bcp_args = os.getenv("SQL_BCP_ARGS", "")
+        # O bcp nunca recebe a senha (ficaria visível no ps): só loga com
+        # SQL_BCP_AUTH=trusted (-T: integrada/Kerberos), opcionalmente por um
+        # DSN do odbc.ini (SQL_BCP_DSN). Sem isso a carga usa executemany.
+        self.bcp_auth = os.getenv("SQL_BCP_AUTH", "off").lower()
+        self.bcp_dsn = os.getenv("SQL_BCP_DSN", "")
+        # Limite da execução inteira do bcp (segundos; vazio = sem limite)
+        bcp_timeout = os.getenv("SQL_BCP_TIMEOUT", "")
+        self.bcp_timeout = int(bcp_timeout) if bcp_timeout else None
+
     def _setup_table_configurations(self):
         """
         Inicializa configurações de tabelas com exemplo de diversificação.
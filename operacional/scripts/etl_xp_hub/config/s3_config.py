@@ -7,7 +7,7 @@ incluindo credenciais, estrutura de buckets e padrões de nomenclatura.
 
 import os
 import re
-from typing import Optional, Tuple, List
+from typing import IO, Optional, Tuple, List
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
@@ -29,6 +29,9 @@ class S3FileInfo:
     date: str              # Data no formato aaaa-mm-dd
     s3_key: str            # Chave completa no S3 (folder/filename)
     local_path: Optional[str] = None  # Caminho local (quando baixado)
+    etag: Optional[str] = None        # ETag do objeto (quando listado)
+    size: Optional[int] = None        # Tamanho em bytes (quando listado)
+    buffer: Optional[IO[bytes]] = None  # Conteúdo em memória (download sem arquivo temporário)
 
 
 class S3Config:
@@ -63,6 +66,11 @@ class S3Config:
         self.download_timeout = int(os.getenv('S3_DOWNLOAD_TIMEOUT', '300'))
         self.upload_timeout = int(os.getenv('S3_UPLOAD_TIMEOUT', '300'))
         self.max_retries = int(os.getenv('S3_MAX_RETRIES', '3'))
+        self.download_workers = int(os.getenv('S3_DOWNLOAD_WORKERS', '8'))  # Downloads simultâneos
+        
+        # Download em memória: evita gravar em ./temp e só usa disco acima do limite
+        self.in_memory_downloads = os.getenv('S3_IN_MEMORY', 'false').lower() in ('1', 'true', 'yes')
+        self.memory_spill_threshold = int(os.getenv('S3_MEMORY_SPILL_MB', '64')) * 1024 * 1024
     
     def _validate_configuration(self):
         """Valida se todas as configurações obrigatórias estão presentes"""
@@ -213,14 +221,15 @@ class S3Config:
             import boto3
             s3_client = boto3.client('s3', **self.get_boto3_config())
             
-            response = s3_client.list_objects_v2(
+            paginator = s3_client.get_paginator('list_objects_v2')
+            pages = paginator.paginate(
                 Bucket=self.bucket_name,
                 Delimiter='/'
             )
             
             folders = []
-            if 'CommonPrefixes' in response:
-                for prefix in response['CommonPrefixes']:
+            for page in pages:
+                for prefix in page.get('CommonPrefixes', []):
                     folder_name = prefix['Prefix'].rstrip('/')
                     # Ignora pastas que começam com ponto ou são temporárias
                     if not folder_name.startswith('.') and folder_name != 'temp':
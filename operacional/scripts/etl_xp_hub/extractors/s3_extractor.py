@@ -6,7 +6,10 @@ Esta classe gerencia o download de arquivos Excel do S3 para processamento local
 
 import boto3
 import os
-from typing import List, Optional
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Callable, Dict, List, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from config.s3_config import get_s3_config, S3FileInfo
@@ -21,25 +24,33 @@ class S3Extractor:
     e organização em pastas temporárias.
     """
     
-    def __init__(self, temp_folder: str = "./temp"):
+    def __init__(self, temp_folder: str = "./temp", in_memory: Optional[bool] = None):
         """
         Inicializa extrator S3.
         
         Args:
             temp_folder: Pasta para arquivos temporários
+            in_memory: Baixa para buffers em memória em vez de arquivos
+                       (padrão: S3_IN_MEMORY)
         """
         self.config = get_s3_config()
         self.temp_folder = temp_folder
+        self.in_memory = self.config.in_memory_downloads if in_memory is None else in_memory
         self.s3_client = None
         
-        # Cria pasta temporária
-        os.makedirs(temp_folder, exist_ok=True)
+        # Cria pasta temporária (desnecessária no modo em memória)
+        if not self.in_memory:
+            os.makedirs(temp_folder, exist_ok=True)
     
     def _get_s3_client(self):
         """Cria cliente S3 se não existe."""
         if self.s3_client is None:
             try:
                 boto3_config = self.config.get_boto3_config()
+                # Pool de conexões comporta todos os downloads simultâneos
+                boto3_config['config'] = Config(
+                    max_pool_connections=max(10, self.config.download_workers)
+                )
                 self.s3_client = boto3.client('s3', **boto3_config)
             except Exception as e:
                 raise S3ExtractionError(
@@ -49,6 +60,33 @@ class S3Extractor:
                 )
         return self.s3_client
     
+    def _file_info_from_object(self, obj: dict) -> Optional[S3FileInfo]:
+        """
+        Converte um objeto retornado pelo list_objects_v2 em S3FileInfo.
+        
+        Args:
+            obj: Item de 'Contents' da listagem
+            
+        Returns:
+            S3FileInfo se for um arquivo pendente válido, None caso contrário
+        """
+        key = obj['Key']
+        filename = os.path.basename(key)
+        
+        # Só processa arquivos .xlsx que não estão na pasta processado
+        # e que estão diretamente na pasta (não em subpastas)
+        if not (filename.endswith('.xlsx') and
+                '/processado/' not in key and
+                key.count('/') == 1):  # Apenas um '/' = arquivo direto na pasta
+            return None
+        
+        file_info = self.config.parse_filename(filename)
+        if file_info:
+            file_info.s3_key = key
+            file_info.etag = obj.get('ETag', '').strip('"') or None
+            file_info.size = obj.get('Size')
+        return file_info
+    
     def list_files_in_folder(self, folder_name: str) -> List[S3FileInfo]:
         """
         Lista arquivos .xlsx em uma pasta específica do S3.
@@ -61,30 +99,21 @@ class S3Extractor:
         """
         try:
             s3_client = self._get_s3_client()
+            paginator = s3_client.get_paginator('list_objects_v2')
+            
+            files_info = []
             
-            response = s3_client.list_objects_v2(
+            # Pagina via ContinuationToken: pastas com mais de 1000 chaves
+            pages = paginator.paginate(
                 Bucket=self.config.bucket_name,
                 Prefix=f"{folder_name}/",
                 Delimiter="/"  # Não busca em subpastas
             )
-            
-            files_info = []
-            
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    key = obj['Key']
-                    filename = os.path.basename(key)
-                    
-                    # Só processa arquivos .xlsx que não estão na pasta processado
-                    # e que estão diretamente na pasta (não em subpastas)
-                    if (filename.endswith('.xlsx') and 
-                        '/processado/' not in key and
-                        key.count('/') == 1):  # Apenas um '/' = arquivo direto na pasta
-                        
-                        file_info = self.config.parse_filename(filename)
-                        if file_info:
-                            file_info.s3_key = key
-                            files_info.append(file_info)
+            for page in pages:
+                for obj in page.get('Contents', []):
+                    file_info = self._file_info_from_object(obj)
+                    if file_info:
+                        files_info.append(file_info)
             
             return files_info
             
@@ -93,6 +122,54 @@ class S3Extractor:
             print(f"⚠️ Warning: Could not list files in folder '{folder_name}': {e}")
             return []  # Retorna lista vazia em vez de quebrar
     
+    def build_inventory(self) -> Dict[str, List[S3FileInfo]]:
+        """
+        Monta o mapa pasta -> arquivos pendentes com listagens paginadas.
+        
+        Uma listagem com Delimiter='/' na raiz descobre as pastas e, em cada
+        pasta, outra com Prefix='<pasta>/' e Delimiter='/' traz só as chaves
+        diretas: 'processado/' volta como um único CommonPrefix, então o
+        histórico de arquivos já processados nunca é listado, por maior
+        que seja.
+        
+        Returns:
+            Dicionário {pasta: [S3FileInfo]} ordenado pelo nome da pasta.
+            Pastas sem arquivos pendentes aparecem com lista vazia.
+        """
+        inventory: Dict[str, List[S3FileInfo]] = {}
+        
+        try:
+            s3_client = self._get_s3_client()
+            paginator = s3_client.get_paginator('list_objects_v2')
+            
+            folders = []
+            for page in paginator.paginate(Bucket=self.config.bucket_name, Delimiter='/'):
+                for prefix in page.get('CommonPrefixes', []):
+                    folder = prefix['Prefix'].rstrip('/')
+                    # Ignora pastas que começam com ponto ou são temporárias
+                    if not folder.startswith('.') and folder != 'temp':
+                        folders.append(folder)
+            
+            for folder in sorted(folders):
+                folder_files = inventory.setdefault(folder, [])
+                pages = paginator.paginate(
+                    Bucket=self.config.bucket_name,
+                    Prefix=f"{folder}/",
+                    Delimiter='/'  # Subpastas (processado/) não são percorridas
+                )
+                for page in pages:
+                    for obj in page.get('Contents', []):
+                        file_info = self._file_info_from_object(obj)
+                        if file_info:
+                            folder_files.append(file_info)
+            
+        except Exception as e:
+            # Log warning mas não quebra o processo
+            print(f"⚠️ Warning: Could not build S3 inventory: {e}")
+            return {}
+        
+        return inventory
+    
     def download_file(self, s3_key: str, local_path: str) -> str:
         """
         Baixa um arquivo específico do S3.
@@ -127,42 +204,168 @@ class S3Extractor:
                 original_exception=e
             )
     
-    def download_all_files(self) -> List[S3FileInfo]:
+    def download_to_buffer(self, s3_key: str, spill_threshold: Optional[int] = None) -> IO[bytes]:
         """
-        Baixa todos os arquivos .xlsx de todas as pastas.
+        Baixa um arquivo do S3 para um buffer em memória.
+        
+        O buffer só passa para disco (arquivo temporário anônimo) quando o
+        objeto excede spill_threshold bytes.
         
+        Args:
+            s3_key: Chave do arquivo no S3
+            spill_threshold: Limite em bytes antes de usar disco
+                             (padrão: S3_MEMORY_SPILL_MB)
+            
         Returns:
-            Lista de informações dos arquivos baixados
+            Buffer posicionado no início, pronto para leitura
         """
-        downloaded_files = []
-        expected_folders = self.config.list_expected_folders()
+        if spill_threshold is None:
+            spill_threshold = self.config.memory_spill_threshold
         
-        print(f"📁 Verificando {len(expected_folders)} pastas: {expected_folders}")
+        buffer = tempfile.SpooledTemporaryFile(max_size=spill_threshold)
+        try:
+            s3_client = self._get_s3_client()
+            s3_client.download_fileobj(self.config.bucket_name, s3_key, buffer)
+            buffer.seek(0)
+            return buffer
+            
+        except Exception as e:
+            buffer.close()
+            raise S3ExtractionError(
+                f"Failed to download file to memory: {s3_key}",
+                bucket=self.config.bucket_name,
+                key=s3_key,
+                original_exception=e
+            )
+    
+    def _download_to_memory(self, file_info: S3FileInfo) -> S3FileInfo:
+        """
+        Baixa um arquivo listado para um buffer em memória.
         
-        for folder in expected_folders:
-            print(f"📂 Verificando pasta: {folder}")
+        local_path recebe o mesmo caminho do modo em disco (sem criar o
+        arquivo) para que os processadores continuem identificando o tipo
+        pelo nome; o conteúdo fica em file_info.buffer.
+        
+        Args:
+            file_info: Informações do arquivo no S3
+            
+        Returns:
+            O mesmo S3FileInfo com buffer e local_path preenchidos
+        """
+        folder = file_info.s3_key.split('/')[0]
+        local_filename = f"{folder}_{file_info.filename}"
+        
+        file_info.buffer = self.download_to_buffer(file_info.s3_key)
+        file_info.local_path = os.path.join(self.temp_folder, local_filename)
+        
+        return file_info
+    
+    def _download_to_temp(self, file_info: S3FileInfo) -> S3FileInfo:
+        """
+        Baixa um arquivo listado para a pasta temporária.
+        
+        Args:
+            file_info: Informações do arquivo no S3
             
-            folder_files = self.list_files_in_folder(folder)
+        Returns:
+            O mesmo S3FileInfo com local_path preenchido
+        """
+        folder = file_info.s3_key.split('/')[0]
+        local_filename = f"{folder}_{file_info.filename}"
+        local_path = os.path.join(self.temp_folder, local_filename)
+        
+        self.download_file(file_info.s3_key, local_path)
+        file_info.local_path = local_path
+        
+        return file_info
+    
+    def list_pending_files(self) -> List[S3FileInfo]:
+        """
+        Lista os arquivos .xlsx pendentes de todas as pastas, sem baixar.
+        
+        Returns:
+            Arquivos na ordem do modo serial (pasta, depois arquivo)
+        """
+        inventory = self.build_inventory()
+        
+        print(f"📁 Verificando {len(inventory)} pastas: {list(inventory)}")
+        
+        pending_files = []
+        for folder, folder_files in inventory.items():
+            print(f"📂 Verificando pasta: {folder}")
             
             if not folder_files:
                 print(f"ℹ️ Pasta '{folder}' está vazia ou não possui arquivos .xlsx")
                 continue
             
             print(f"📄 Encontrados {len(folder_files)} arquivos em '{folder}'")
+            pending_files.extend(folder_files)
+        
+        return pending_files
+    
+    def fetch(self, file_info: S3FileInfo) -> S3FileInfo:
+        """
+        Baixa um arquivo listado no modo configurado (memória ou temp_folder).
+        
+        Args:
+            file_info: Arquivo vindo de build_inventory/list_pending_files
+        
+        Returns:
+            O mesmo file_info com buffer ou local_path preenchido
+        """
+        if self.in_memory:
+            return self._download_to_memory(file_info)
+        return self._download_to_temp(file_info)
+    
+    def download_all_files(
+        self,
+        max_workers: Optional[int] = None,
+        should_skip: Optional[Callable[[S3FileInfo], bool]] = None,
+    ) -> List[S3FileInfo]:
+        """
+        Baixa todos os arquivos .xlsx de todas as pastas.
+        
+        As pastas e arquivos pendentes vêm de listagens paginadas por
+        pasta que não descem em 'processado/' (build_inventory). Com max_workers > 1 os arquivos são
+        baixados em paralelo por um pool de threads limitado. A ordem do
+        resultado é sempre a mesma do modo serial (pasta, depois arquivo).
+        
+        Args:
+            max_workers: Downloads simultâneos (padrão: S3_DOWNLOAD_WORKERS)
+        
+        No modo em memória (in_memory) cada arquivo vem em file_info.buffer
+        e nada é gravado em temp_folder.
+        
+        Arquivos para os quais should_skip retorna True (ex.: já ingeridos)
+        não são baixados, mas voltam na lista com local_path=None para que
+        ainda possam ser movidos para 'processado'.
+        
+        Returns:
+            Lista de informações dos arquivos baixados
+        """
+        if max_workers is None:
+            max_workers = self.config.download_workers
+        max_workers = max(1, max_workers)
+        
+        pending_files = self.list_pending_files()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (file_info, None if should_skip and should_skip(file_info)
+                 else executor.submit(self.fetch, file_info))
+                for file_info in pending_files
+            ]
             
-            for file_info in folder_files:
-                try:
-                    # Define caminho local
-                    local_filename = f"{folder}_{file_info.filename}"
-                    local_path = os.path.join(self.temp_folder, local_filename)
-                    
-                    # Baixa arquivo
-                    self.download_file(file_info.s3_key, local_path)
-                    
-                    # Atualiza informações do arquivo
-                    file_info.local_path = local_path
+            # Coleta na ordem de submissão para manter o resultado determinístico
+            downloaded_files = []
+            for file_info, future in futures:
+                if future is None:
+                    print(f"⏭️ Ignorado (já ingerido): {file_info.filename}")
                     downloaded_files.append(file_info)
-                    
+                    continue
+                
+                try:
+                    downloaded_files.append(future.result())
                     print(f"✅ Baixado: {file_info.filename}")
                     
                 except Exception as e:
@@ -212,8 +415,81 @@ class S3Extractor:
                 original_exception=e
             )
     
+    def move_files_to_processed(
+        self, s3_keys: List[str], max_workers: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Move vários arquivos para a pasta 'processado' no S3 em lote.
+        
+        As cópias (copy_object, server-side) rodam em paralelo; os originais
+        copiados com sucesso são removidos com um delete_objects por grupo
+        de até 1000 chaves. Arquivo que falha na cópia não é removido.
+        
+        Args:
+            s3_keys: Chaves atuais dos arquivos
+            max_workers: Cópias simultâneas (padrão: S3_DOWNLOAD_WORKERS)
+            
+        Returns:
+            Dicionário {chave: resultado} na ordem de entrada, onde resultado
+            tem 'status' ('success' ou 'error'), 'new_key' e 'error'
+        """
+        if max_workers is None:
+            max_workers = self.config.download_workers
+        max_workers = max(1, max_workers)
+        
+        results: Dict[str, Dict[str, Any]] = {
+            key: {"status": "error", "new_key": self.config.get_processed_key(key), "error": None}
+            for key in s3_keys
+        }
+        if not results:
+            return results
+        
+        s3_client = self._get_s3_client()
+        bucket = self.config.bucket_name
+        
+        def copy(key: str) -> None:
+            s3_client.copy_object(
+                Bucket=bucket,
+                CopySource={'Bucket': bucket, 'Key': key},
+                Key=results[key]["new_key"]
+            )
+        
+        copied = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(key, executor.submit(copy, key)) for key in results]
+            for key, future in futures:
+                try:
+                    future.result()
+                    copied.append(key)
+                except Exception as e:
+                    results[key]["error"] = f"copy failed: {e}"
+        
+        # delete_objects aceita no máximo 1000 chaves por chamada
+        for i in range(0, len(copied), 1000):
+            batch = copied[i:i + 1000]
+            try:
+                response = s3_client.delete_objects(
+                    Bucket=bucket,
+                    Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+                )
+                # Em modo Quiet só os erros são retornados
+                failed = {err['Key']: err.get('Message', err.get('Code')) for err in response.get('Errors', [])}
+            except Exception as e:
+                failed = {key: str(e) for key in batch}
+            
+            for key in batch:
+                if key in failed:
+                    results[key]["error"] = f"copied but original not deleted: {failed[key]}"
+                else:
+                    results[key]["status"] = "success"
+        
+        return results
+    
     def cleanup_temp_files(self):
         """Remove todos os arquivos temporários baixados."""
+        if not os.path.isdir(self.temp_folder):
+            return  # Modo em memória: nada foi gravado em disco
+        
         try:
             for file in os.listdir(self.temp_folder):
                 if file.endswith('.xlsx'):
@@ -0,0 +1,310 @@
+"""
+Carga via bulk copy (utilitário bcp do SQL Server)
+
+O bcp envia os dados pelo protocolo de bulk copy do TDS, sem o bind de
+parâmetros linha a linha do executemany. O DataFrame é serializado em
+blocos de batch_size linhas num arquivo texto UTF-16 (modo -w do bcp),
+com as colunas na ordem da tabela de destino, e carregado com uma única
+chamada ao bcp (commit a cada -b linhas ou uma transação só, TABLOCK
+opcional).
+
+Quando o bulk copy não se aplica (bcp não instalado, sem login integrado
+em SQL_BCP_AUTH, tabela com colunas que não vieram no DataFrame e têm
+DEFAULT, texto com tab/quebra de linha), o SQLServerLoader usa o
+executemany. Falhas do bcp em si levantam DatabaseLoadError: parte dos
+lotes pode já ter sido gravada, então não há fallback nesse caso.
+
+O bcp só loga de forma integrada (-T): a senha na linha de comando
+ficaria visível para qualquer usuário da máquina (ps, /proc). Para
+testar contra um SQL Server com autenticação Kerberos:
+    kinit usuario@DOMINIO
+    SQL_BULK_COPY=auto SQL_BCP_AUTH=trusted SQL_BCP_ARGS="-u" python main.py
+(ou SQL_BCP_DSN=<dsn do odbc.ini> para servidor/criptografia pelo DSN)
+"""
+
+import os
+import re
+import shlex
+import shutil
+import subprocess
+from functools import lru_cache
+from typing import IO, Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.exceptions import DatabaseLoadError
+
+# Terminadores do arquivo (-w: UTF-16, campos com tab, linhas com LF)
+SEPARADOR_CAMPO = "\t"
+SEPARADOR_LINHA = "\n"
+TERMINADOR_LINHA_BCP = "0x0a"
+
+# Caracteres que quebrariam o arquivo: texto com eles vai por executemany
+CARACTERES_PROIBIDOS = re.compile(r"[\t\n\r\x00]")
+
+# No modo caractere do bcp, campo vazio é NULL e "\0" é string vazia
+CAMPO_NULO = ""
+STRING_VAZIA = "\x00"
+
+
+@lru_cache(maxsize=None)
+def localizar_bcp(caminho: str = "bcp") -> Optional[str]:
+    """
+    Caminho do bcp do SQL Server (None se não estiver instalado).
+
+    Confere o "bcp -v": outros pacotes também instalam um "bcp" no PATH
+    (p.ex. o do Boost), que só faria a carga falhar.
+    """
+    executavel = shutil.which(caminho)
+    if executavel is None:
+        return None
+    try:
+        versao = subprocess.run([executavel, "-v"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return executavel if "SQL Server" in versao.stdout else None
+
+
+def _formatar_float(valores: np.ndarray) -> List[str]:
+    """Floats sem notação científica (o bcp não converte 1e-05 para DECIMAL)."""
+    texto = list(map(repr, valores.tolist()))
+    # repr usa notação científica abaixo de 1e-4 e a partir de 1e16
+    modulo = np.abs(valores)
+    for posicao in np.flatnonzero((modulo >= 1e16) | ((modulo < 1e-4) & (modulo > 0))):
+        texto[posicao] = np.format_float_positional(valores[posicao], trim="-")
+    return texto
+
+
+def _formatar_valor(valor: Any) -> str:
+    """Valor de uma coluna object no formato de texto aceito pelo bcp."""
+    if isinstance(valor, str):
+        return valor if valor else STRING_VAZIA
+    if isinstance(valor, (bool, np.bool_)):
+        return "1" if valor else "0"
+    if isinstance(valor, (float, np.floating)):
+        return _formatar_float(np.array([valor], dtype=float))[0]
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    if hasattr(valor, "isoformat"):
+        # datetime.datetime / datetime.date
+        return valor.isoformat(sep=" ") if hasattr(valor, "hour") else valor.isoformat()
+    return str(valor)
+
+
+def _formatar_distintos(distintos: pd.Index) -> Optional[List[str]]:
+    """Textos dos valores distintos de uma coluna (None se algum texto não cabe no arquivo)."""
+    kind = distintos.dtype.kind
+    if kind == "f":
+        return _formatar_float(distintos.to_numpy(dtype=float))
+    if kind in "iu":
+        return distintos.astype(str).tolist()
+    if kind == "b":
+        return ["1" if v else "0" for v in distintos]
+    if kind == "M":
+        return distintos.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3].tolist()
+    if any(CARACTERES_PROIBIDOS.search(v) for v in distintos):
+        return None
+    return [v if v else STRING_VAZIA for v in distintos]
+
+
+def _serializar_coluna(serie: pd.Series) -> Optional[List[str]]:
+    """
+    Converte uma coluna para os campos do arquivo.
+
+    Colunas repetem muito (zeros, datas, segmentos): cada valor distinto
+    é formatado uma vez só.
+
+    Returns:
+        Lista de textos (CAMPO_NULO nos nulos), ou None se algum texto tem
+        caracteres que o arquivo não comporta
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype(object)
+
+    if serie.dtype.kind in "fiubM" or pd.api.types.infer_dtype(serie, skipna=True) in ("string", "empty"):
+        codigos, distintos = pd.factorize(serie)
+        campos = _formatar_distintos(distintos)
+        if campos is None:
+            return None
+        # Nulos têm código -1: apontam para o CAMPO_NULO acrescentado no fim
+        return np.array(campos + [CAMPO_NULO], dtype=object)[codigos].tolist()
+
+    # Tipos misturados (1, "1", 1.0 não podem cair no mesmo distinto)
+    campos = []
+    for valor in serie.to_numpy(dtype=object):
+        if pd.isna(valor):
+            campos.append(CAMPO_NULO)
+        elif isinstance(valor, str) and CARACTERES_PROIBIDOS.search(valor):
+            return None
+        else:
+            campos.append(_formatar_valor(valor))
+    return campos
+
+
+def serializar_para_bcp(
+    df: pd.DataFrame,
+    column_types: Dict[str, Dict[str, Any]],
+    destino: IO[str],
+    batch_size: int,
+) -> bool:
+    """
+    Escreve o DataFrame no formato do bcp, batch_size linhas por vez.
+
+    O bcp carrega por posição: os campos saem na ordem das colunas da
+    tabela (column_types, em ORDINAL_POSITION). Colunas da tabela que não
+    estão no DataFrame vão vazias (NULL), como no INSERT com lista de
+    colunas - exceto se tiverem DEFAULT, que o INSERT aplicaria.
+
+    Args:
+        df: DataFrame a carregar
+        column_types: SQLServerLoader.get_column_types da tabela
+        destino: Arquivo texto aberto para escrita
+        batch_size: Linhas serializadas por vez
+
+    Returns:
+        False se o bulk copy não se aplica (nada útil foi escrito)
+    """
+    colunas_tabela = list(column_types)
+    if not colunas_tabela or set(df.columns) - set(colunas_tabela):
+        return False
+    for coluna in colunas_tabela:
+        tipo = column_types[coluna]
+        if coluna not in df.columns and tipo.get("default") is not None and not tipo.get("identity"):
+            return False
+
+    for inicio in range(0, len(df), batch_size):
+        bloco = df.iloc[inicio:inicio + batch_size]
+        vazio = [CAMPO_NULO] * len(bloco)
+        campos = []
+        for coluna in colunas_tabela:
+            if coluna not in bloco.columns:
+                campos.append(vazio)
+                continue
+            serializada = _serializar_coluna(bloco[coluna])
+            if serializada is None:
+                return False
+            campos.append(serializada)
+
+        destino.write(SEPARADOR_LINHA.join(map(SEPARADOR_CAMPO.join, zip(*campos))))
+        destino.write(SEPARADOR_LINHA)
+
+    return True
+
+
+def _linhas_commitadas(saida: str, commit_every: Optional[int]) -> int:
+    """
+    Linhas já commitadas por um bcp interrompido, pelo progresso na saída.
+
+    O bcp imprime "Total sent: N" a cada lote de -b linhas, e cada lote é
+    commitado; sem -b a transação é uma só e nada fica gravado.
+    """
+    enviadas = re.findall(r"Total sent: (\d+)", saida)
+    if not commit_every or not enviadas:
+        return 0
+    return int(enviadas[-1]) // commit_every * commit_every
+
+
+def executar_bcp(
+    bcp: str,
+    arquivo: str,
+    full_table_name: str,
+    config,
+    commit_every: Optional[int],
+    tablock: bool = True,
+    extra_args: Optional[str] = None,
+) -> int:
+    """
+    Carrega o arquivo com "bcp <tabela> in".
+
+    O login é integrado (-T, Kerberos no Linux), direto no servidor ou
+    pelo DSN de config.bcp_dsn: usuário e senha nunca vão para a linha de
+    comando, que qualquer usuário da máquina lê no ps.
+
+    Args:
+        bcp: Caminho do executável
+        arquivo: Arquivo gerado por serializar_para_bcp (UTF-16)
+        full_table_name: schema.tabela
+        config: SQLServerConfig (servidor, banco, DSN e bcp_timeout)
+        commit_every: Linhas por transação (-b); None = arquivo inteiro
+                      numa transação
+        tablock: Usa a dica TABLOCK (carga mínima logada, sem locks por linha)
+        extra_args: Argumentos adicionais do bcp (ex.: "-u" no driver 18)
+
+    Returns:
+        Linhas copiadas
+
+    Raises:
+        DatabaseLoadError: Se o bcp falhar ou passar de config.bcp_timeout
+                           (context["rows_committed"]: linhas já gravadas)
+    """
+    if config.bcp_dsn:
+        servidor = ["-D", "-S", config.bcp_dsn]
+    else:
+        servidor = ["-S", f"{config.server},{config.port}"]
+
+    comando = [
+        bcp,
+        f"{config.database}.{full_table_name}",
+        "in",
+        arquivo,
+        *servidor,
+        "-T",
+        "-w",
+        "-r", TERMINADOR_LINHA_BCP,
+        "-k",  # campos vazios são NULL, sem aplicar DEFAULT
+        "-m", "1",  # o primeiro erro interrompe a carga
+    ]
+    if commit_every:
+        comando += ["-b", str(commit_every)]
+    if tablock:
+        comando += ["-h", "TABLOCK"]
+    if extra_args:
+        comando += shlex.split(extra_args)
+
+    try:
+        resultado = subprocess.run(
+            comando, capture_output=True, text=True, timeout=config.bcp_timeout
+        )
+    except subprocess.TimeoutExpired as e:
+        saida = e.stdout.decode(errors="replace") if isinstance(e.stdout, bytes) else (e.stdout or "")
+        commitadas = _linhas_commitadas(saida, commit_every)
+        raise DatabaseLoadError(
+            f"bcp timed out after {config.bcp_timeout}s for table: {full_table_name} "
+            f"({commitadas} rows already committed)",
+            table_name=full_table_name,
+            operation="bulk_copy",
+            context={"rows_committed": commitadas, "output": saida[-2000:]},
+            original_exception=e,
+        )
+    except OSError as e:
+        raise DatabaseLoadError(
+            f"bcp failed for table: {full_table_name}",
+            table_name=full_table_name,
+            operation="bulk_copy",
+            original_exception=e,
+        )
+
+    copiadas = re.search(r"(\d+) rows copied", resultado.stdout)
+    if resultado.returncode != 0 or copiadas is None:
+        saida = resultado.stdout + resultado.stderr
+        raise DatabaseLoadError(
+            f"bcp failed for table: {full_table_name}",
+            table_name=full_table_name,
+            operation="bulk_copy",
+            context={
+                "returncode": resultado.returncode,
+                "rows_committed": _linhas_commitadas(saida, commit_every),
+                "output": saida[-2000:],
+            },
+        )
+
+    return int(copiadas.group(1))
+
+
+def remover_arquivo(arquivo: str) -> None:
+    """Remove o arquivo temporário do bcp (ignora se já não existe)."""
+    try:
+        os.remove(arquivo)
+    except FileNotFoundError:
+        pass
@@ -1,38 +1,117 @@
 import pandas as pd
 import numpy as np
 import sqlalchemy
-from sqlalchemy import create_engine, text
-from typing import Optional, Dict, Any
-import pyodbc
+from sqlalchemy import create_engine, event, text
+from typing import Optional, Dict, Any, Iterable, Iterator, List
+import os
+import tempfile
+import threading
 from config.database_config import get_database_config, LoadStrategy, TableConfig
+from loaders import bulk_copy
 from utils.exceptions import DatabaseLoadError
 
 
+# Engine global (singleton pattern): um pool de conexões por processo,
+# compartilhado por filtros de pré-carga, cargas, pós-processamento e
+# contagens. Cada conexão nova ao SQL Server custa um handshake TLS + login.
+_engine_instance = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
+# Colunas de auditoria preenchidas só no INSERT do upsert: data_carga
+# continua sendo a data em que a chave apareceu pela primeira vez e não
+# entra na comparação que decide se uma linha existente mudou
+COLUNAS_SO_INSERT = ("data_carga",)
+
+# Métricas do pool (conexões abertas no servidor x conexões emprestadas)
+_connection_metrics = {"connections_opened": 0, "checkouts": 0}
+_metrics_lock = threading.Lock()
+
+
+def _contar(metrica: str) -> None:
+    with _metrics_lock:
+        _connection_metrics[metrica] += 1
+
+
+def get_engine():
+    """
+    Retorna o engine SQLAlchemy (com pool de conexões) do processo.
+
+    Criado na primeira chamada. Um processo filho (fork) não reaproveita
+    as conexões do pai: ganha um engine próprio.
+
+    Raises:
+        DatabaseLoadError: Se o engine não puder ser criado
+    """
+    global _engine_instance, _engine_pid
+    with _engine_lock:
+        if _engine_instance is not None and _engine_pid == os.getpid():
+            return _engine_instance
+
+        if _engine_instance is not None:
+            # Conexões herdadas do processo pai ficam com ele
+            _engine_instance.dispose(close=False)
+
+        try:
+            engine = create_engine(
+                get_database_config().get_sqlalchemy_url(),
+                fast_executemany=True,
+                pool_pre_ping=True,
+                pool_recycle=300,
+                pool_size=10,
+                max_overflow=20,
+                echo=False,
+            )
+        except Exception as e:
+            raise DatabaseLoadError(
+                "Failed to create optimized database engine",
+                context={"connection_url": "***hidden***"},
+                original_exception=e,
+            )
+
+        event.listen(engine, "connect", lambda *_: _contar("connections_opened"))
+        event.listen(engine, "checkout", lambda *_: _contar("checkouts"))
+        _engine_instance, _engine_pid = engine, os.getpid()
+        return engine
+
+
+def get_connection_metrics() -> Dict[str, int]:
+    """
+    Métricas de conexão do processo.
+
+    Returns:
+        {"connections_opened": conexões abertas no servidor (handshakes),
+         "checkouts": conexões emprestadas pelo pool,
+         "checked_out": conexões em uso agora}
+    """
+    with _metrics_lock:
+        metricas = dict(_connection_metrics)
+    engine = _engine_instance if _engine_pid == os.getpid() else None
+    metricas["checked_out"] = engine.pool.checkedout() if engine is not None else 0
+    return metricas
+
+
+def _tipo_coluna_sql(tipo: Dict[str, Any]) -> str:
+    """Tipo SQL de uma coluna de get_column_types (ex.: "varchar(50)", "decimal(16,4)")."""
+    data_type = tipo["data_type"]
+    if data_type in ("char", "varchar", "nchar", "nvarchar", "binary", "varbinary"):
+        tamanho = tipo["max_length"]
+        return f"{data_type}({'max' if tamanho in (None, -1) else tamanho})"
+    if data_type in ("decimal", "numeric"):
+        return f"{data_type}({tipo['precision']},{tipo['scale']})"
+    return data_type
+
+
 class SQLServerLoader:
+    # Tipos das colunas por tabela (INFORMATION_SCHEMA), lidos uma vez por execução
+    _column_types: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
     def __init__(self):
         self.config = get_database_config()
-        self.engine = None
 
     def _get_engine(self):
-        if self.engine is None:
-            try:
-                connection_url = self.config.get_sqlalchemy_url()
-                self.engine = create_engine(
-                    connection_url,
-                    fast_executemany=True,
-                    pool_pre_ping=True,
-                    pool_recycle=300,
-                    pool_size=10,
-                    max_overflow=20,
-                    echo=False,
-                )
-            except Exception as e:
-                raise DatabaseLoadError(
-                    "Failed to create optimized database engine",
-                    context={"connection_url": "***hidden***"},
-                    original_exception=e,
-                )
-        return self.engine
+        """Engine compartilhado do processo (ver get_engine)."""
+        return get_engine()
 
     def test_connection(self) -> bool:
         try:
@@ -45,6 +124,62 @@ class SQLServerLoader:
                 "Database connection test failed", original_exception=e
             )
 
+    def get_column_types(self, table_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Tipos das colunas da tabela de destino, de INFORMATION_SCHEMA.COLUMNS.
+
+        A consulta roda uma vez por tabela e execução; as chamadas seguintes
+        (outros arquivos, outros blocos) usam o cache. Se a tabela não
+        existir ou não puder ser consultada, retorna {} e a carga segue sem
+        coerção de tipos.
+
+        Returns:
+            {"coluna": {"data_type": "decimal", "max_length": None,
+                        "precision": 16, "scale": 4, "nullable": True,
+                        "default": None, "identity": False}}
+            (na ordem das colunas da tabela)
+        """
+        full_table_name = self.config.get_full_table_name(table_name)
+        if full_table_name in SQLServerLoader._column_types:
+            return SQLServerLoader._column_types[full_table_name]
+
+        query = text(
+            """
+            SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH,
+                   NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE, COLUMN_DEFAULT,
+                   COLUMNPROPERTY(
+                       OBJECT_ID(QUOTENAME(TABLE_SCHEMA) + '.' + QUOTENAME(TABLE_NAME)),
+                       COLUMN_NAME, 'IsIdentity'
+                   ) AS IS_IDENTITY
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table
+            ORDER BY ORDINAL_POSITION
+            """
+        )
+        try:
+            with self._get_engine().connect() as conn:
+                rows = conn.execute(
+                    query, {"schema": self.config.schema, "table": table_name}
+                ).fetchall()
+        except Exception as e:
+            print(f"⚠️ Tipos de {full_table_name} indisponíveis, carga sem coerção: {e}")
+            rows = []
+
+        column_types = {
+            row[0]: {
+                "data_type": row[1].lower(),
+                "max_length": row[2],
+                "precision": row[3],
+                "scale": row[4],
+                "nullable": row[5] == "YES",
+                "default": row[6],
+                "identity": row[7] == 1,
+            }
+            for row in rows
+        }
+        SQLServerLoader._column_types[full_table_name] = column_types
+        return column_types
+
     def load_data(self, df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
         try:
             table_config = self.config.get_table_config(table_name)
@@ -75,19 +210,96 @@ class SQLServerLoader:
                 original_exception=e,
             )
 
+    def load_chunks(self, chunks: Iterable[pd.DataFrame], table_name: str) -> Dict[str, Any]:
+        """
+        Carrega um DataFrame entregue em blocos (TabelaStream.iter_chunks).
+
+        Cada bloco é inserido e descartado antes do próximo ser lido, então
+        a memória não depende do tamanho do arquivo. Em TRUNCATE_LOAD a
+        tabela é esvaziada uma vez, antes do primeiro bloco; em UPSERT cada
+        bloco é aplicado pela chave (ver _upsert_chunks). Com
+        TableConfig.atomic, o truncate e todos os blocos vão numa única
+        transação.
+        """
+        table_config = self.config.get_table_config(table_name)
+        strategy = table_config.load_strategy
+
+        if strategy == LoadStrategy.UPSERT:
+            return self._upsert_chunks(chunks, table_name, table_config)
+        if strategy not in (
+            LoadStrategy.TRUNCATE_LOAD,
+            LoadStrategy.INCREMENTAL,
+            LoadStrategy.APPEND,
+        ):
+            raise DatabaseLoadError(
+                f"Unsupported load strategy: {strategy}",
+                table_name=table_name,
+                operation="load_chunks",
+            )
+
+        # atomic: truncate e todos os blocos na mesma transação (sem bcp)
+        conn = self._get_engine().raw_connection() if table_config.atomic else None
+        try:
+            if strategy == LoadStrategy.TRUNCATE_LOAD:
+                truncate = f"TRUNCATE TABLE {self.config.get_full_table_name(table_name)}"
+                if conn is not None:
+                    conn.cursor().execute(truncate)
+                else:
+                    engine = self._get_engine()
+                    with engine.begin() as connection:
+                        connection.execute(text(truncate))
+
+            rows_inserted, blocos = 0, 0
+            for chunk in chunks:
+                blocos += 1
+                print(f"📦 Bloco {blocos}: {len(chunk)} linhas")
+                rows_inserted += self._insert_dataframe(chunk, table_name, conn=conn)
+
+            if conn is not None:
+                conn.commit()
+
+        except Exception as e:
+            if conn is not None:
+                conn.rollback()
+            if isinstance(e, DatabaseLoadError):
+                raise
+            raise DatabaseLoadError(
+                f"Chunked load failed for table: {table_name}",
+                table_name=table_name,
+                operation="load_chunks",
+                original_exception=e,
+            )
+        finally:
+            if conn is not None:
+                conn.close()
+
+        result = {
+            "strategy": strategy.value,
+            "table_name": table_name,
+            "rows_inserted": rows_inserted,
+            "chunks": blocos,
+            "status": "success",
+        }
+        if strategy == LoadStrategy.TRUNCATE_LOAD:
+            result["rows_deleted"] = "all"
+        return result
+
     def _truncate_and_load(
         self, df: pd.DataFrame, table_name: str, config: TableConfig
     ) -> Dict[str, Any]:
+        """
+        Esvazia a tabela e insere o DataFrame numa única transação.
+
+        O TRUNCATE e os INSERTs usam a mesma conexão: numa conexão separada
+        os INSERTs esperariam pelo lock do TRUNCATE ainda não commitado.
+        """
+        conn = self._get_engine().raw_connection()
         try:
-            engine = self._get_engine()
-            with engine.connect() as connection:
-                with connection.begin():
-                    connection.execute(
-                        text(
-                            f"TRUNCATE TABLE {self.config.get_full_table_name(table_name)}"
-                        )
-                    )
-                    rows_inserted = self._insert_dataframe(df, table_name)
+            conn.cursor().execute(
+                f"TRUNCATE TABLE {self.config.get_full_table_name(table_name)}"
+            )
+            rows_inserted = self._insert_dataframe(df, table_name, conn=conn)
+            conn.commit()
 
             return {
                 "strategy": "truncate_load",
@@ -97,18 +309,21 @@ class SQLServerLoader:
                 "status": "success",
             }
         except Exception as e:
+            conn.rollback()
             raise DatabaseLoadError(
                 f"Truncate and load failed for table: {table_name}",
                 table_name=table_name,
                 operation="truncate_load",
                 original_exception=e,
             )
+        finally:
+            conn.close()
 
     def _incremental_load(
         self, df: pd.DataFrame, table_name: str, config: TableConfig
     ) -> Dict[str, Any]:
         try:
-            # _insert_dataframe agora já cria sua própria conexão
+            # _insert_dataframe usa uma conexão do pool compartilhado
             rows_inserted = self._insert_dataframe(df, table_name)
 
             return {
@@ -136,7 +351,7 @@ class SQLServerLoader:
             print(f"\n📋 Primeiras 3 linhas:")
             print(df.head(3).to_string())
 
-            # _insert_dataframe agora já cria sua própria conexão
+            # _insert_dataframe usa uma conexão do pool compartilhado
             rows_inserted = self._insert_dataframe(df, table_name)
 
             return {
@@ -160,73 +375,396 @@ class SQLServerLoader:
     def _upsert_load(
         self, df: pd.DataFrame, table_name: str, config: TableConfig
     ) -> Dict[str, Any]:
-        raise DatabaseLoadError(
-            f"Upsert strategy not yet implemented for table: {table_name}",
-            table_name=table_name,
-            operation="upsert_load",
+        return self._upsert_chunks([df], table_name, config)
+
+    def _upsert_chunks(
+        self, chunks: Iterable[pd.DataFrame], table_name: str, config: TableConfig
+    ) -> Dict[str, Any]:
+        """
+        Insere ou atualiza pela chave TableConfig.primary_key (simples ou composta).
+
+        Cada bloco é aplicado por _merge_dataframe numa conexão do pool;
+        commit a cada bloco, ou um só no fim se config.atomic. Stagings
+        permanentes (bcp) que uma falha deixe para trás são apagadas após
+        o rollback.
+
+        Returns:
+            Resultado com rows_inserted, rows_updated e rows_unchanged
+        """
+        key_columns = config.key_columns()
+        contagem = {"inserted": 0, "updated": 0, "unchanged": 0}
+        blocos = 0
+        stagings: List[str] = []
+
+        conn = self._get_engine().raw_connection()
+        try:
+            for chunk in chunks:
+                blocos += 1
+                merge = self._merge_dataframe(chunk, table_name, key_columns, conn, blocos, stagings)
+                for acao, linhas in merge.items():
+                    contagem[acao] += linhas
+                if not config.atomic:
+                    conn.commit()
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            for stage in stagings:
+                self._drop_stage_table(stage)
+            if isinstance(e, DatabaseLoadError):
+                raise
+            raise DatabaseLoadError(
+                f"Upsert load failed for table: {table_name}",
+                table_name=table_name,
+                operation="upsert_load",
+                context={"primary_key": key_columns},
+                original_exception=e,
+            )
+        finally:
+            conn.close()
+
+        print(
+            f"🔁 Upsert em {self.config.get_full_table_name(table_name)}: "
+            f"{contagem['inserted']} inseridas, {contagem['updated']} atualizadas, "
+            f"{contagem['unchanged']} sem alteração"
         )
+        return {
+            "strategy": "upsert",
+            "table_name": table_name,
+            "rows_inserted": contagem["inserted"],
+            "rows_updated": contagem["updated"],
+            "rows_unchanged": contagem["unchanged"],
+            "chunks": blocos,
+            "status": "success",
+        }
+
+    def _stage_table(self, table_name: str, bloco: int) -> str:
+        """Staging permanente do upsert com bcp (uma por tabela, processo e bloco)."""
+        return f"{self.config.schema}.[stage_{table_name}_{os.getpid()}_{bloco}]"
 
-    def _insert_dataframe(self, df: pd.DataFrame, table_name: str) -> int:
-        """Insere DataFrame usando pyodbc diretamente"""
+    def _drop_stage_table(self, stage: str) -> None:
+        """Apaga, numa conexão própria, uma staging permanente se ela existir."""
         try:
-            full_table_name = self.config.get_full_table_name(table_name)
-            conn_str = self.config.get_connection_string()
+            with self._get_engine().begin() as connection:
+                connection.execute(text(f"IF OBJECT_ID(N'{stage}') IS NOT NULL DROP TABLE {stage}"))
+        except Exception as e:
+            print(f"⚠️ Não foi possível apagar a staging {stage}: {e}")
+
+    def _merge_dataframe(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        key_columns: List[str],
+        conn,
+        bloco: int = 1,
+        stagings: Optional[List[str]] = None,
+    ) -> Dict[str, int]:
+        """
+        Aplica um DataFrame à tabela pela chave, em operações set-based.
+
+        O DataFrame vai para uma staging com os tipos das colunas de
+        destino (CAST para o tipo de INFORMATION_SCHEMA, o que também deixa
+        de fora o IDENTITY) e é aplicado com um UPDATE das chaves que já
+        existem e mudaram seguido de um INSERT das chaves novas; linhas
+        iguais às do banco não são reescritas. Colunas de COLUNAS_SO_INSERT
+        (data_carga) só são gravadas no INSERT. Nada é commitado aqui.
+
+        Com o bcp habilitado (ver _bulk_copy_enabled) a staging é uma tabela
+        permanente, criada (CREATE TABLE com os tipos de INFORMATION_SCHEMA,
+        sem ler o destino) e carregada pelo bcp fora de conn - o bcp tem
+        sessão própria e não enxerga tabelas #temporárias - e apagada dentro
+        da transação de conn. Cada bloco tem a sua: numa carga atômica o
+        DROP da staging do bloco anterior e os locks no destino só são
+        liberados no commit, e reaproveitar o nome (ou ler o destino)
+        noutra sessão esperaria por conn para sempre. O nome vai para
+        stagings, para quem chama apagá-la se a transação for desfeita.
+        Sem bcp é uma #temporária da sessão de conn, carregada por
+        executemany.
+
+        Chaves repetidas no DataFrame ficam com a última ocorrência (como
+        em filter_new_records_by_key). A chave deve ser única no destino.
+
+        Returns:
+            {"inserted": n, "updated": n, "unchanged": n}
+        """
+        faltando = [coluna for coluna in key_columns if coluna not in df.columns]
+        if faltando:
+            raise DatabaseLoadError(
+                f"Key columns missing from DataFrame: {faltando}",
+                table_name=table_name,
+                operation="upsert_load",
+                context={"columns": list(df.columns)},
+            )
+        if len(df) == 0:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        repetidas = df.duplicated(subset=key_columns, keep="last")
+        if repetidas.any():
+            print(f"⚠️ {int(repetidas.sum())} linhas com chave repetida; mantida a última de cada chave")
+            df = df[~repetidas]
+
+        full_table_name = self.config.get_full_table_name(table_name)
+        column_types = self.get_column_types(table_name)
+        colunas = df.columns.tolist()
+        identidade = [coluna for coluna in colunas if column_types.get(coluna, {}).get("identity")]
+        valores = [
+            coluna for coluna in colunas
+            if coluna not in key_columns and coluna not in identidade and coluna not in COLUNAS_SO_INSERT
+        ]
+        lista_colunas = ", ".join(f"[{coluna}]" for coluna in colunas)
+        juncao = " AND ".join(f"t.[{coluna}] = s.[{coluna}]" for coluna in key_columns)
+
+        # CAST para o tipo da coluna: mesma definição, sem a propriedade IDENTITY
+        colunas_stage = ", ".join(
+            f"CAST([{coluna}] AS {_tipo_coluna_sql(column_types[coluna])}) AS [{coluna}]"
+            if coluna in column_types else f"[{coluna}]"
+            for coluna in colunas
+        )
+
+        cursor = conn.cursor()
+        stage_bcp = self._bulk_copy_enabled(table_name, len(df)) and all(
+            coluna in column_types for coluna in colunas
+        )
+        if stage_bcp:
+            stage = self._stage_table(table_name, bloco)
+            self._drop_stage_table(stage)
+            definicao = ", ".join(
+                f"[{coluna}] {_tipo_coluna_sql(column_types[coluna])} NULL" for coluna in colunas
+            )
+            with self._get_engine().begin() as connection:
+                connection.execute(text(f"CREATE TABLE {stage} ({definicao})"))
+            if stagings is not None:
+                stagings.append(stage)
+            if self._bulk_insert_dataframe(df, table_name, target=stage) is None:
+                print("⚠️ Bulk copy não se aplica a estes dados; usando executemany")
+                self._insert_dataframe(df, table_name, conn=conn, target=stage)
+        else:
+            stage = f"[#stage_{table_name}]"
+            cursor.execute(f"IF OBJECT_ID('tempdb..{stage}') IS NOT NULL DROP TABLE {stage}")
+            cursor.execute(f"SELECT TOP 0 {colunas_stage} INTO {stage} FROM {full_table_name}")
+            self._insert_dataframe(df, table_name, conn=conn, target=stage)
+
+        atualizadas = 0
+        if valores:
+            # EXCEPT compara NULL com NULL como igual: só reescreve o que mudou
+            cursor.execute(
+                f"UPDATE t SET {', '.join(f't.[{coluna}] = s.[{coluna}]' for coluna in valores)} "
+                f"FROM {full_table_name} AS t INNER JOIN {stage} AS s ON {juncao} "
+                f"WHERE EXISTS (SELECT {', '.join(f's.[{coluna}]' for coluna in valores)} "
+                f"EXCEPT SELECT {', '.join(f't.[{coluna}]' for coluna in valores)})"
+            )
+            atualizadas = cursor.rowcount
+
+        insert = (
+            f"INSERT INTO {full_table_name} ({lista_colunas}) "
+            f"SELECT {', '.join(f's.[{coluna}]' for coluna in colunas)} FROM {stage} AS s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {full_table_name} AS t WHERE {juncao})"
+        )
+        if identidade:
+            # Valores explícitos na coluna IDENTITY vindos do arquivo
+            cursor.execute(f"SET IDENTITY_INSERT {full_table_name} ON")
+        cursor.execute(insert)
+        inseridas = cursor.rowcount
+        if identidade:
+            cursor.execute(f"SET IDENTITY_INSERT {full_table_name} OFF")
+
+        cursor.execute(f"DROP TABLE {stage}")
+        cursor.close()
+
+        return {
+            "inserted": inseridas,
+            "updated": atualizadas,
+            "unchanged": max(len(df) - inseridas - atualizadas, 0),
+        }
+
+    def _bulk_copy_enabled(self, table_name: str, rows: int) -> bool:
+        """Se a carga deve tentar o bcp (ver SQL_BULK_COPY e TableConfig.bulk_copy)."""
+        table_config = self.config.get_table_config(table_name)
+        if table_config.bulk_copy is False or self.config.bulk_copy == "off":
+            return False
+        if self.config.bcp_auth != "trusted":
+            # Sem login integrado o bcp precisaria da senha na linha de comando
+            return False
+        if table_config.bulk_copy is None and rows < self.config.bulk_min_rows:
+            return False
+        return bulk_copy.localizar_bcp(self.config.bcp_path) is not None
+
+    def _bulk_insert_dataframe(
+        self, df: pd.DataFrame, table_name: str, target: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Insere DataFrame pelo bcp (protocolo de bulk copy).
+
+        Args:
+            target: Tabela de staging do upsert no lugar de schema.table_name
+                    (criada com as colunas do DataFrame, nessa ordem; carga
+                    numa transação só, já que a staging é descartável)
+
+        Returns:
+            Linhas inseridas, ou None se o bulk copy não se aplica a este
+            DataFrame (quem chama usa o executemany)
+        """
+        full_table_name = target or self.config.get_full_table_name(table_name)
+        table_config = self.config.get_table_config(table_name)
+        batch_size = table_config.batch_size
+        if target is None:
+            column_types = self.get_column_types(table_name)
+            commit_every = table_config.commit_interval()
+        else:
+            column_types = {coluna: {"default": None} for coluna in df.columns}
+            commit_every = None
+
+        fd, arquivo = tempfile.mkstemp(suffix=".bcp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-16-le", newline="") as destino:
+                if not bulk_copy.serializar_para_bcp(df, column_types, destino, batch_size):
+                    return None
+
+            print(f"\n🚚 Bulk copy (bcp) em {full_table_name}: {len(df)} linhas, lotes de {batch_size}")
+            copiadas = bulk_copy.executar_bcp(
+                bulk_copy.localizar_bcp(self.config.bcp_path),
+                arquivo,
+                full_table_name,
+                self.config,
+                commit_every,
+                tablock=self.config.bulk_tablock,
+                extra_args=self.config.bcp_args,
+            )
+        finally:
+            bulk_copy.remover_arquivo(arquivo)
+
+        if copiadas != len(df):
+            raise DatabaseLoadError(
+                f"bcp copied {copiadas} of {len(df)} rows to table: {full_table_name}",
+                table_name=table_name,
+                operation="bulk_copy",
+            )
+
+        print(f"   ✅ Bulk copy concluído! Total: {copiadas} linhas\n")
+        return copiadas
+
+    def _insert_dataframe(
+        self, df: pd.DataFrame, table_name: str, conn=None, target: Optional[str] = None
+    ) -> int:
+        """
+        Insere DataFrame pelo bcp quando disponível, senão por executemany
+        numa conexão do pool compartilhado (fast_executemany no cursor).
+
+        batch_size é o número de linhas por executemany; os commits seguem
+        TableConfig.commit_interval() (commit_every linhas, ou um só no fim
+        se atomic). Uma falha desfaz a transação aberta.
+
+        Args:
+            df: DataFrame a inserir
+            table_name: Nome da tabela (sem schema)
+            conn: Conexão do pool (raw_connection) de quem chama, com
+                  transação aberta; nesse caso nada é commitado aqui (nem
+                  usa o bcp, que tem conexão própria)
+            target: Tabela onde inserir, no lugar de schema.table_name (ex.:
+                    a #stage do upsert, visível só na sessão de conn)
+
+        Returns:
+            Linhas inseridas
+        """
+        if conn is None and self._bulk_copy_enabled(table_name, len(df)):
+            rows_inserted = self._bulk_insert_dataframe(df, table_name)
+            if rows_inserted is not None:
+                return rows_inserted
+            print("⚠️ Bulk copy não se aplica a estes dados; usando executemany")
+
+        propria = conn is None
+        try:
+            full_table_name = target or self.config.get_full_table_name(table_name)
+            table_config = self.config.get_table_config(table_name)
+
+            # Conexão emprestada do pool (devolvida no close)
+            if propria:
+                conn = self._get_engine().raw_connection()
+            cursor = conn.cursor()
+            # Parâmetros enviados em array, não um round-trip por linha
+            cursor.fast_executemany = True
             
-            # Conectar usando pyodbc diretamente
-            with pyodbc.connect(conn_str) as conn:
-                cursor = conn.cursor()
-                
-                # Obter colunas
-                columns = df.columns.tolist()
-                
-                # Criar placeholders para valores
-                placeholders = ', '.join(['?' for _ in columns])
-                columns_str = ', '.join([f'[{col}]' for col in columns])
-                
-                # Query de inserção
-                insert_query = f"INSERT INTO {full_table_name} ({columns_str}) VALUES ({placeholders})"
-                
-                # Converter DataFrame para lista de tuplas
-                # Converter <NA> para None para compatibilidade com pyodbc
-                data_tuples = []
-                for row in df.itertuples(index=False, name=None):
-                    # Converter pd.NA para None
-                    converted_row = tuple(None if pd.isna(val) else val for val in row)
-                    data_tuples.append(converted_row)
-                
-                # Inserir em lotes
-                batch_size = self.config.get_table_config(table_name).batch_size
-                total_inserted = 0
-                total_rows = len(data_tuples)
-                
-                print(f"\n📊 Iniciando inserção em {full_table_name}")
-                print(f"   Total de linhas: {total_rows}")
-                print(f"   Tamanho do lote: {batch_size}")
+            # Obter colunas
+            columns = df.columns.tolist()
+            
+            # Criar placeholders para valores
+            placeholders = ', '.join(['?' for _ in columns])
+            columns_str = ', '.join([f'[{col}]' for col in columns])
+            
+            # Query de inserção
+            insert_query = f"INSERT INTO {full_table_name} ({columns_str}) VALUES ({placeholders})"
+            
+            # Inserir em lotes (cada lote é convertido só na hora de enviar)
+            batch_size = table_config.batch_size
+            commit_every = table_config.commit_interval() if propria else None
+            total_inserted = 0
+            pendentes = 0
+            total_rows = len(df)
+            
+            print(f"\n📊 Iniciando inserção em {full_table_name}")
+            print(f"   Total de linhas: {total_rows}")
+            print(f"   Tamanho do lote: {batch_size}")
+            print(f"   Commit: {f'a cada {commit_every} linhas' if commit_every else 'uma transação'}")
+            
+            for batch in self._iter_batches(df, batch_size):
+                cursor.executemany(insert_query, batch)
+                total_inserted += len(batch)
+                pendentes += len(batch)
                 
-                for i in range(0, len(data_tuples), batch_size):
-                    batch = data_tuples[i:i + batch_size]
-                    cursor.executemany(insert_query, batch)
-                    total_inserted += len(batch)
-                    
-                    # Commit a cada lote
+                # Commit a cada commit_every linhas (arredondado para lotes inteiros)
+                if commit_every and pendentes >= commit_every:
                     conn.commit()
-                    
-                    # Progress mais frequente
-                    remaining = total_rows - total_inserted
-                    progress = (total_inserted / total_rows) * 100
-                    print(f"   💾 Inseridas {total_inserted}/{total_rows} linhas ({progress:.1f}%) - Faltam: {remaining}")
-                
-                cursor.close()
+                    pendentes = 0
                 
-                print(f"   ✅ Inserção concluída! Total: {total_inserted} linhas\n")
+                # Progress mais frequente
+                remaining = total_rows - total_inserted
+                progress = (total_inserted / total_rows) * 100
+                print(f"   💾 Inseridas {total_inserted}/{total_rows} linhas ({progress:.1f}%) - Faltam: {remaining}")
+            
+            cursor.close()
+            if propria:
+                conn.commit()
+            
+            print(f"   ✅ Inserção concluída! Total: {total_inserted} linhas\n")
             
             return total_inserted
             
         except Exception as e:
+            if propria and conn is not None:
+                conn.rollback()
             raise DatabaseLoadError(
                 f"[DATABASE_LOAD_ERROR] Failed to bulk insert DataFrame to table: {full_table_name}",
                 context={"error": str(e), "columns": list(df.columns)},
             )
+        finally:
+            if propria and conn is not None:
+                conn.close()
+
+    @staticmethod
+    def _iter_batches(df: pd.DataFrame, batch_size: int) -> Iterator[List[tuple]]:
+        """
+        Gera os lotes de parâmetros do executemany sob demanda.
+
+        A conversão é por coluna: os valores do lote viram um array object
+        e os nulos (NaN, NaT, pd.NA) viram None numa operação com máscara,
+        sem pd.isna célula a célula. Datas repetem muito, então cada data
+        distinta vira Timestamp uma vez só. Só o lote atual fica convertido
+        em memória; os valores são os mesmos do antigo itertuples + pd.isna.
+        """
+        for inicio in range(0, len(df), batch_size):
+            bloco = df.iloc[inicio:inicio + batch_size]
+            colunas = []
+            for _, serie in bloco.items():
+                if serie.dtype.kind == "M":
+                    # NaT tem código -1: aponta para o None acrescentado no fim
+                    codigos, distintos = pd.factorize(serie)
+                    valores = np.append(distintos.to_numpy(dtype=object), None)[codigos]
+                else:
+                    valores = serie.to_numpy(dtype=object)
+                    nulos = pd.isna(valores)
+                    if nulos.any():
+                        valores = np.where(nulos, None, valores)
+                colunas.append(valores.tolist())
+            yield list(zip(*colunas))
 
     def get_table_row_count(self, table_name: str) -> int:
         try:
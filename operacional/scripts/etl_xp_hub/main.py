@@ -8,23 +8,51 @@ Sistema que descobre automaticamente processadores por convenção:
 """
 
 import os
+import io
 import sys
+import argparse
 import importlib
+import dataclasses
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
+import pandas as pd
+
 # Adiciona diretório base e processors ao sys.path
 base_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(base_dir)
 sys.path.append(os.path.join(base_dir, "processors"))
 
 from extractors.s3_extractor import S3Extractor
-from processors.tabela import Tabela
-from utils.helpers import inserir_tabela_no_banco
-from config.database_config import LoadStrategy
+from processors.tabela import Tabela, TabelaStream
+from utils.helpers import chamar_hook, inserir_tabela_no_banco
+from config.database_config import LoadStrategy, get_database_config
+from loaders.sql_server_loader import get_connection_metrics, get_engine
+from utils.ingestion_ledger import get_ingestion_ledger
+from utils.pipeline import PipelineEmEstagios
 
 # Lista de processadores que buscam dados de APIs (não precisam de arquivo)
 PROCESSADORES_SEM_ARQUIVO = ['bc_cdi_historico']
 
+# Arquivos a partir deste tamanho usam o STREAMING_FUNCTION do processador
+STREAMING_MIN_BYTES = int(float(os.getenv("ETL_STREAMING_MIN_MB", "50")) * 1024 * 1024)
+
+# --ignore-ledger/--force: reprocessa arquivos já registrados no ledger
+IGNORAR_LEDGER = False
+
+
+def habilitar_copy_on_write():
+    """
+    Liga o copy-on-write do pandas neste processo (padrão a partir do 3.0).
+
+    Chamado no início do main() e em cada processo de transformação: a
+    Tabela e os hooks de carga recebem cópias rasas, que só não duplicam
+    dados com ele ligado (ver processors.tabela.copy_on_write_ativo).
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
 
 def descobrir_processadores():
     """
@@ -75,6 +103,12 @@ def obter_configuracoes_processador(folder_name):
             "load_strategy": getattr(module, "LOAD_STRATEGY", LoadStrategy.APPEND),
             "batch_size": getattr(module, "BATCH_SIZE", 3000),
             "pre_load_func": getattr(module, "PRE_LOAD_FUNCTION", None),
+            "compact_dtypes": getattr(module, "COMPACT_DTYPES", False),
+            "streaming_func": getattr(module, "STREAMING_FUNCTION", None),
+            "commit_every": getattr(module, "COMMIT_EVERY", None),
+            "atomic_load": getattr(module, "ATOMIC_LOAD", False),
+            "primary_key": getattr(module, "PRIMARY_KEY", None),
+            "post_load_func": getattr(module, "POST_LOAD_FUNCTION", None),
         }
     except Exception:
         return {
@@ -82,85 +116,236 @@ def obter_configuracoes_processador(folder_name):
             "load_strategy": LoadStrategy.APPEND,
             "batch_size": 3000,
             "pre_load_func": None,
+            "compact_dtypes": False,
+            "streaming_func": None,
+            "commit_every": None,
+            "atomic_load": False,
+            "primary_key": None,
+            "post_load_func": None,
         }
 
 
-def processar_arquivo(file_info, processadores):
+def resolver_pasta(file_info):
     """
-    Processa arquivo usando processador específico ou genérico.
+    Retorna o nome do processador (pasta normalizada) de um arquivo.
+    """
+    folder_name = file_info.folder_name.lower().strip()
+
+    # Tratamento especial para arquivos de contas (contas_h, contas_e, contas_a)
+    if folder_name.startswith('contas_'):
+        folder_name = 'contas'
+
+    return folder_name
+
+
+def ledger_da_tabela(config):
+    """
+    Registro de ingestão da tabela de destino, se ele se aplica a ela.
+
+    Só tabelas APPEND sem POST_LOAD_FUNCTION: nelas as linhas de um arquivo
+    carregado continuam no banco. Em TRUNCATE_LOAD, UPSERT ou com limpeza
+    por período (que apaga linhas de arquivos anteriores), pular um
+    reenvio deixaria a tabela sem os dados dele.
+    """
+    if config["load_strategy"] != LoadStrategy.APPEND or config["post_load_func"] is not None:
+        return None
+    return get_ingestion_ledger()
+
+
+def arquivo_ja_ingerido(file_info):
     """
+    Verifica no registro de ingestão se o ETag do arquivo já foi carregado
+    na tabela de destino (permite pular o download).
+    """
+    if IGNORAR_LEDGER or not file_info.etag:
+        return False
+
+    config = obter_configuracoes_processador(resolver_pasta(file_info))
+    ledger = ledger_da_tabela(config)
+    return ledger is not None and ledger.lookup(config["nome_tabela"], etag=file_info.etag) is not None
+
+
+def preparar_arquivo(file_info):
+    """
+    Resolve a configuração de destino e consulta o registro de ingestão.
+
+    Com --ignore-ledger o registro não é consultado (o hash é calculado
+    mesmo assim, para registrar a nova carga).
+
+    Returns:
+        (config, content_hash), ou None se o arquivo é byte a byte idêntico
+        a um já carregado na mesma tabela (mesmo ETag ou mesmo SHA-256)
+    """
+    filename = file_info.filename
+    config = obter_configuracoes_processador(resolver_pasta(file_info))
+
+    ledger = ledger_da_tabela(config)
+    if ledger is None:
+        return config, None
+
+    if not IGNORAR_LEDGER and ledger.lookup(config["nome_tabela"], etag=file_info.etag):
+        print(f"⏭️ {filename}: já ingerido em {config['nome_tabela']} (ETag), pulando")
+        return None
+
+    source = Tabela.resolve_source(file_info.local_path, file_info.buffer)
+    content_hash = ledger.compute_hash(source)
+    anterior = None if IGNORAR_LEDGER else ledger.lookup(config["nome_tabela"], content_hash=content_hash)
+    if anterior:
+        print(f"⏭️ {filename}: conteúdo idêntico a {anterior['s3_key']}, pulando")
+        return None
+
+    return config, content_hash
+
+
+def transformar_arquivo(file_info, processador_func=None):
+    """
+    Executa o parse e as transformações de um arquivo (etapa CPU-bound).
+
+    Não acessa o banco, então pode rodar em outro processo. Se o
+    processador definir COMPACT_DTYPES = True, os tipos são compactados
+    ao final (category/inteiros menores): a Tabela pode ficar em memória
+    esperando a carga enquanto outros arquivos são processados. É opt-in
+    porque PRE_LOAD_FUNCTION/POST_LOAD_FUNCTION recebem esse DataFrame
+    e não esperam colunas category.
+
+    Arquivos com ETL_STREAMING_MIN_MB ou mais, de processadores com
+    STREAMING_FUNCTION, viram uma TabelaStream: a leitura e as
+    transformações acontecem bloco a bloco durante a carga.
+
+    Args:
+        file_info: Arquivo baixado (local_path ou buffer)
+        processador_func: Função processar_<pasta>; None usa o genérico
+
+    Returns:
+        Tabela processada
+    """
+    file_path = file_info.local_path
+    folder_name = resolver_pasta(file_info)
+
+    # Download em memória: o buffer é repassado ao processador junto com o
+    # caminho lógico (que continua identificando o arquivo pelo nome)
+    fonte = {"buffer": file_info.buffer} if file_info.buffer is not None else {}
+
+    streaming = False
     try:
-        folder_name = file_info.folder_name.lower().strip()
-        
-        # Tratamento especial para arquivos de contas (contas_h, contas_e, contas_a)
-        if folder_name.startswith('contas_'):
-            folder_name = 'contas'
-        
-        file_path = file_info.local_path
-        filename = file_info.filename
+        print(f"📄 Processando: {file_info.filename} (pasta: {folder_name})")
+        config = obter_configuracoes_processador(folder_name)
 
-        print(f"📄 Processando: {filename} (pasta: {folder_name})")
+        if processador_func is not None:
+            if config["streaming_func"] is not None and (file_info.size or 0) >= STREAMING_MIN_BYTES:
+                print(f"🌊 Arquivo grande: processando em blocos ({folder_name})")
+                streaming = True
+                return config["streaming_func"](file_path, **fonte)
 
-        if folder_name in processadores:
             print(f"🎯 Usando processador específico: {folder_name}")
-            processador_func = processadores[folder_name]
-            tabela_processada = processador_func(file_path)
-            config = obter_configuracoes_processador(folder_name)
-        else:
-            print(f"🔧 Usando processamento genérico: {folder_name}")
-            tabela = Tabela(file_path)
-
-            print(f"\n📊 DEBUG - DataFrame ORIGINAL:")
-            df_original = tabela.get_data()
-            print(f"   Shape: {df_original.shape}")
-            print(f"   Columns: {list(df_original.columns)}")
-            print(f"   Types: {df_original.dtypes.to_dict()}")
-            print(f"\n📋 Primeiras 3 linhas ORIGINAIS:")
-            print(df_original.head(3).to_string())
-
-            tabela_processada = (
-                tabela.remove_empty_rows().trim_text_columns().add_processing_date()
-            )
+            tabela = processador_func(file_path, **fonte)
+            if config["compact_dtypes"]:
+                tabela.compact_dtypes()
+            return tabela
+
+        print(f"🔧 Usando processamento genérico: {folder_name}")
+        tabela = Tabela(file_path, buffer=file_info.buffer)
+
+        print(f"\n📊 DEBUG - DataFrame ORIGINAL:")
+        df_original = tabela.get_data()
+        print(f"   Shape: {df_original.shape}")
+        print(f"   Columns: {list(df_original.columns)}")
+        print(f"   Types: {df_original.dtypes.to_dict()}")
+        print(f"\n📋 Primeiras 3 linhas ORIGINAIS:")
+        print(df_original.head(3).to_string())
+
+        tabela_processada = (
+            tabela.remove_empty_rows().trim_text_columns().add_processing_date()
+        )
+
+        print(f"\n📊 DEBUG - DataFrame PROCESSADO:")
+        df_processado = tabela_processada.get_data()
+        print(f"   Shape: {df_processado.shape}")
+        print(f"   Columns: {list(df_processado.columns)}")
+        print(f"   Types: {df_processado.dtypes.to_dict()}")
+        print(f"\n📋 Primeiras 3 linhas PROCESSADAS:")
+        print(df_processado.head(3).to_string())
+
+        if config["compact_dtypes"]:
+            tabela_processada.compact_dtypes()
+        return tabela_processada
 
-            print(f"\n📊 DEBUG - DataFrame PROCESSADO:")
-            df_processado = tabela_processada.get_data()
-            print(f"   Shape: {df_processado.shape}")
-            print(f"   Columns: {list(df_processado.columns)}")
-            print(f"   Types: {df_processado.dtypes.to_dict()}")
-            print(f"\n📋 Primeiras 3 linhas PROCESSADAS:")
-            print(df_processado.head(3).to_string())
+    finally:
+        # A TabelaStream guarda o buffer: ele só é lido (e liberado) na carga
+        if not streaming:
+            _liberar_buffer(file_info)
 
-            config = obter_configuracoes_processador(folder_name)
 
-        resultado = inserir_tabela_no_banco(
-            tabela_processada,
+def carregar_arquivo(file_info, tabela_processada, config, content_hash=None):
+    """
+    Insere a Tabela processada no banco, registra a ingestão e executa
+    o pós-processamento do processador (se houver).
+    """
+    filename = file_info.filename
+    folder_name = resolver_pasta(file_info)
+
+    resultado = inserir_tabela_no_banco(
+        tabela_processada,
+        config["nome_tabela"],
+        config["load_strategy"],
+        config["batch_size"],
+        config["pre_load_func"],  # Passa a função de pré-processamento
+        commit_every=config["commit_every"],
+        atomic=config["atomic_load"],
+        primary_key=config["primary_key"],
+    )
+
+    print(f"✅ {filename}: {resultado['rows_inserted']} linhas inseridas")
+
+    ledger = ledger_da_tabela(config)
+    if ledger is not None:
+        ledger.record(
             config["nome_tabela"],
-            config["load_strategy"],
-            config["batch_size"],
-            config["pre_load_func"],  # Passa a função de pré-processamento
+            file_info.s3_key,
+            etag=file_info.etag,
+            content_hash=content_hash,
+            rows_inserted=resultado["rows_inserted"],
         )
+    
+    # Executar função de pós-processamento se existir
+    try:
+        module = importlib.import_module(f"processors.{folder_name}")
+        if hasattr(module, "POST_LOAD_FUNCTION"):
+            print(f"🔄 Executando pós-processamento para {folder_name}...")
+            engine = get_engine()
+            
+            post_func = getattr(module, "POST_LOAD_FUNCTION")
+            full_table_name = get_database_config().get_full_table_name(config["nome_tabela"])
+            post_result = chamar_hook(
+                post_func, tabela_processada.get_data(), full_table_name, engine, nome="POST_LOAD_FUNCTION"
+            )
+            
+            if post_result.get("status") == "success":
+                print(f"✅ Pós-processamento concluído: {post_result}")
+            else:
+                print(f"⚠️ Pós-processamento com aviso: {post_result}")
+    except Exception as e:
+        print(f"⚠️ Erro no pós-processamento (dados já inseridos): {e}")
 
-        print(f"✅ {filename}: {resultado['rows_inserted']} linhas inseridas")
-        
-        # Executar função de pós-processamento se existir
-        try:
-            module = importlib.import_module(f"processors.{folder_name}")
-            if hasattr(module, "POST_LOAD_FUNCTION"):
-                print(f"🔄 Executando pós-processamento para {folder_name}...")
-                from loaders.sql_server_loader import SQLServerLoader
-                loader = SQLServerLoader()
-                engine = loader._get_engine()
-                
-                post_func = getattr(module, "POST_LOAD_FUNCTION")
-                full_table_name = loader.config.get_full_table_name(config["nome_tabela"])
-                post_result = post_func(tabela_processada.get_data(), full_table_name, engine)
-                
-                if post_result.get("status") == "success":
-                    print(f"✅ Pós-processamento concluído: {post_result}")
-                else:
-                    print(f"⚠️ Pós-processamento com aviso: {post_result}")
-        except Exception as e:
-            print(f"⚠️ Erro no pós-processamento (dados já inseridos): {e}")
+
+def processar_arquivo(file_info, processadores):
+    """
+    Processa arquivo usando processador específico ou genérico.
+
+    Arquivos byte a byte idênticos a um já carregado na mesma tabela
+    (mesmo ETag ou mesmo SHA-256) são pulados antes do parse.
+    """
+    filename = file_info.filename
+
+    try:
+        preparo = preparar_arquivo(file_info)
+        if preparo is None:
+            return True
+        config, content_hash = preparo
+
+        processador_func = processadores.get(resolver_pasta(file_info))
+        tabela_processada = transformar_arquivo(file_info, processador_func)
+        carregar_arquivo(file_info, tabela_processada, config, content_hash)
         
         return True
 
@@ -168,6 +353,214 @@ def processar_arquivo(file_info, processadores):
         print(f"❌ Erro processando {filename}: {e}")
         return False
 
+    finally:
+        _liberar_buffer(file_info)
+
+
+def baixar_na_vez(extractor, file_info):
+    """
+    Baixa um arquivo listado só na hora de processá-lo.
+
+    Usado no modo em memória (sem --pipeline): o buffer é fechado quando
+    o arquivo termina (ou é enviado ao pool de processos), então só os
+    arquivos em andamento ficam em memória. Arquivos já ingeridos não
+    são baixados.
+
+    Returns:
+        False se o download falhou (o arquivo não deve ser movido)
+    """
+    if arquivo_ja_ingerido(file_info):
+        print(f"⏭️ Ignorado (já ingerido): {file_info.filename}")
+        return True
+
+    try:
+        extractor.fetch(file_info)
+    except Exception as e:
+        print(f"❌ Erro baixando {file_info.filename}: {e}")
+        return False
+
+    print(f"✅ Baixado: {file_info.filename}")
+    return True
+
+
+def _liberar_buffer(file_info):
+    """Fecha o buffer em memória de um arquivo que não será mais lido."""
+    if file_info.buffer is not None:
+        file_info.buffer.close()
+        file_info.buffer = None
+
+
+def _arquivo_para_processo(file_info):
+    """
+    Prepara o S3FileInfo para ser enviado a outro processo.
+
+    Buffers em disco temporário (SpooledTemporaryFile) não são
+    serializáveis; o conteúdo segue como BytesIO.
+    """
+    if file_info.buffer is None:
+        return file_info
+
+    file_info.buffer.seek(0)
+    conteudo = io.BytesIO(file_info.buffer.read())
+    file_info.buffer.close()
+    file_info.buffer = None
+    return dataclasses.replace(file_info, buffer=conteudo)
+
+
+def processar_arquivos_em_paralelo(arquivos, processadores, workers, baixar=None, max_em_voo=None):
+    """
+    Processa arquivos com parse/transformação num pool de processos.
+
+    As Tabelas prontas voltam para este processo, que faz as cargas uma a
+    uma. Arquivos da mesma tabela de destino são carregados na ordem da
+    lista, para que o pós-processamento por período veja as cargas na
+    mesma sequência do modo serial.
+
+    Como no PipelineEmEstagios, no máximo max_em_voo arquivos ficam entre
+    o envio ao pool e o fim da carga: um novo arquivo só é enviado quando
+    outro termina de carregar, então as Tabelas esperando carga não
+    crescem com o tamanho da lista.
+
+    Args:
+        baixar: Baixa o arquivo na hora do envio (modo em memória);
+                retorna False se o download falhou
+        max_em_voo: Arquivos enviados e ainda não carregados (padrão: 2 × workers)
+
+    Returns:
+        (sucessos, falhas)
+    """
+    sucessos, falhas = 0, 0
+    fila_por_tabela = defaultdict(deque)
+    max_em_voo = max(1, max_em_voo or 2 * workers)
+
+    def em_voo():
+        return sum(len(fila) for fila in fila_por_tabela.values())
+
+    def carregar_prontos():
+        # Espera o primeiro arquivo de alguma tabela ficar pronto e carrega,
+        # em cada tabela, todos os prontos no início da fila
+        nonlocal sucessos, falhas
+        wait([fila[0][1] for fila in fila_por_tabela.values()], return_when=FIRST_COMPLETED)
+
+        for nome_tabela in list(fila_por_tabela):
+            fila = fila_por_tabela[nome_tabela]
+            while fila and fila[0][1].done():
+                arquivo, future, config, content_hash = fila.popleft()
+                try:
+                    carregar_arquivo(arquivo, future.result(), config, content_hash)
+                    sucessos += 1
+                except Exception as e:
+                    print(f"❌ Erro processando {arquivo.filename}: {e}")
+                    falhas += 1
+            if not fila:
+                del fila_por_tabela[nome_tabela]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=habilitar_copy_on_write) as executor:
+        for arquivo in arquivos:
+            while em_voo() >= max_em_voo:
+                carregar_prontos()
+
+            if baixar is not None and not baixar(arquivo):
+                continue
+
+            try:
+                preparo = preparar_arquivo(arquivo)
+            except Exception as e:
+                print(f"❌ Erro processando {arquivo.filename}: {e}")
+                _liberar_buffer(arquivo)
+                falhas += 1
+                continue
+
+            if preparo is None:
+                _liberar_buffer(arquivo)
+                sucessos += 1
+                continue
+
+            config, content_hash = preparo
+            future = executor.submit(
+                transformar_arquivo,
+                _arquivo_para_processo(arquivo),
+                processadores.get(resolver_pasta(arquivo)),
+            )
+            fila_por_tabela[config["nome_tabela"]].append(
+                (arquivo, future, config, content_hash)
+            )
+
+        while fila_por_tabela:
+            carregar_prontos()
+
+    return sucessos, falhas
+
+
+def processar_em_pipeline(extractor, arquivos, processadores, workers):
+    """
+    Processa arquivos em estágios sobrepostos: enquanto um arquivo é
+    carregado, os próximos já estão sendo transformados e baixados.
+
+    Concorrência por estágio:
+        - download: S3_DOWNLOAD_WORKERS threads
+        - transformação: `workers` (pool de processos se > 1)
+        - carga: serial, na ordem da lista por tabela de destino
+        - movimentação para 'processado': em lotes conforme as cargas terminam
+
+    Filas entre estágios têm capacidade ETL_PIPELINE_QUEUE (padrão 2), o que
+    limita quantos arquivos ficam em memória ao mesmo tempo.
+
+    Returns:
+        (sucessos, falhas)
+    """
+    executor = (
+        ProcessPoolExecutor(max_workers=workers, initializer=habilitar_copy_on_write)
+        if workers > 1 else None
+    )
+
+    def preparar(arquivo):
+        try:
+            preparo = preparar_arquivo(arquivo)
+        except Exception:
+            _liberar_buffer(arquivo)
+            raise
+        if preparo is None:
+            _liberar_buffer(arquivo)
+        return preparo
+
+    def transformar(arquivo, preparo):
+        processador_func = processadores.get(resolver_pasta(arquivo))
+        if executor is None:
+            return transformar_arquivo(arquivo, processador_func)
+        return executor.submit(
+            transformar_arquivo, _arquivo_para_processo(arquivo), processador_func
+        ).result()
+
+    def carregar(arquivo, tabela_processada, preparo):
+        config, content_hash = preparo
+        try:
+            carregar_arquivo(arquivo, tabela_processada, config, content_hash)
+        finally:
+            _liberar_buffer(arquivo)
+
+    pipeline = PipelineEmEstagios(
+        baixar=extractor.fetch,
+        preparar=preparar,
+        transformar=transformar,
+        carregar=carregar,
+        mover=extractor.move_files_to_processed,
+        chave_ordem=lambda a: obter_configuracoes_processador(resolver_pasta(a))["nome_tabela"],
+        pular=arquivo_ja_ingerido,
+        download_workers=extractor.config.download_workers,
+        transform_workers=max(1, workers),
+        tamanho_fila=int(os.getenv("ETL_PIPELINE_QUEUE", "2")),
+    )
+
+    try:
+        resultado = pipeline.executar(arquivos)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"📊 Downloads com erro: {resultado['falhas_download']}")
+    return resultado["sucessos"], resultado["falhas"]
+
 
 def processar_apis(processadores):
     """Processa dados de APIs que não dependem de arquivos."""
@@ -192,6 +585,9 @@ def processar_apis(processadores):
                     config["load_strategy"],
                     config["batch_size"],
                     config["pre_load_func"],
+                    commit_every=config["commit_every"],
+                    atomic=config["atomic_load"],
+                    primary_key=config["primary_key"],
                 )
                 
                 print(f"   ✅ {proc_name}: {resultado['rows_inserted']} linhas inseridas")
@@ -203,8 +599,18 @@ def processar_apis(processadores):
     return sucessos_api
 
 
-def main():
-    """Função principal - genérica e escalável."""
+def main(workers=1, pipeline=False, ignorar_ledger=False):
+    """
+    Função principal - genérica e escalável.
+
+    Args:
+        workers: Processos para parse/transformação (1 = serial)
+        pipeline: Sobrepõe download, transformação, carga e movimentação
+        ignorar_ledger: Reprocessa arquivos já registrados no ledger
+    """
+    global IGNORAR_LEDGER
+    IGNORAR_LEDGER = ignorar_ledger
+    habilitar_copy_on_write()
     inicio = datetime.now()
 
     print("🚀 ETL Pipeline Genérico")
@@ -223,7 +629,13 @@ def main():
         
         print("\n📥 Extraindo arquivos do S3...")
         extractor = S3Extractor("./temp")
-        arquivos = extractor.download_all_files()
+        # Em memória, cada arquivo é baixado na sua vez (poucos buffers
+        # vivos por vez) em vez de todos antes do processamento
+        sob_demanda = extractor.in_memory and not pipeline
+        if pipeline or sob_demanda:
+            arquivos = extractor.list_pending_files()
+        else:
+            arquivos = extractor.download_all_files(should_skip=arquivo_ja_ingerido)
 
         if not arquivos:
             print("ℹ️ Nenhum arquivo encontrado no S3")
@@ -231,24 +643,47 @@ def main():
                 print("ℹ️ Nenhum dado processado nesta execução")
             return 0
 
-        print(f"📁 {len(arquivos)} arquivos baixados")
-
         sucessos, falhas = 0, 0
 
-        print(f"\n⚙️ Processando arquivos...")
-        for arquivo in arquivos:
-            if processar_arquivo(arquivo, processadores):
-                sucessos += 1
-            else:
-                falhas += 1
+        if pipeline:
+            print(f"\n🔀 Processando {len(arquivos)} arquivos em estágios "
+                  f"(download → transformação → carga → movimentação)...")
+            sucessos, falhas = processar_em_pipeline(extractor, arquivos, processadores, workers)
+        else:
+            print(f"📁 {len(arquivos)} arquivos {'pendentes' if sob_demanda else 'baixados'}")
 
-        print(f"\n📦 Movendo arquivos processados...")
-        for arquivo in arquivos:
-            try:
-                extractor.move_to_processed(arquivo.s3_key)
-                print(f"✅ {arquivo.filename} movido para processado")
-            except Exception as e:
-                print(f"⚠️ {arquivo.filename} não foi movido: {e}")
+            nao_baixados = set()
+
+            def baixar(arquivo):
+                if baixar_na_vez(extractor, arquivo):
+                    return True
+                nao_baixados.add(arquivo.s3_key)
+                return False
+
+            if workers > 1:
+                print(f"\n⚙️ Processando arquivos ({workers} processos)...")
+                sucessos, falhas = processar_arquivos_em_paralelo(
+                    arquivos, processadores, workers, baixar=baixar if sob_demanda else None
+                )
+            else:
+                print(f"\n⚙️ Processando arquivos...")
+                for arquivo in arquivos:
+                    if sob_demanda and not baixar(arquivo):
+                        continue
+                    if processar_arquivo(arquivo, processadores):
+                        sucessos += 1
+                    else:
+                        falhas += 1
+            arquivos = [a for a in arquivos if a.s3_key not in nao_baixados]
+
+            print(f"\n📦 Movendo arquivos processados...")
+            movimentos = extractor.move_files_to_processed([a.s3_key for a in arquivos])
+            for arquivo in arquivos:
+                movimento = movimentos[arquivo.s3_key]
+                if movimento["status"] == "success":
+                    print(f"✅ {arquivo.filename} movido para processado")
+                else:
+                    print(f"⚠️ {arquivo.filename} não foi movido: {movimento['error']}")
 
         print(f"\n🧹 Limpando temporários...")
         extractor.cleanup_temp_files()
@@ -264,6 +699,9 @@ def main():
         print(f"🌐 APIs processadas: {sucessos_api}")
         print(f"📁 Arquivos processados: {sucessos}")
         print(f"❌ Falhas: {falhas}")
+        conexoes = get_connection_metrics()
+        print(f"🔌 Conexões ao banco: {conexoes['connections_opened']} abertas, "
+              f"{conexoes['checkouts']} usos do pool")
         print("✅ Pipeline concluído!")
 
         return 0 if falhas == 0 else 1
@@ -274,4 +712,26 @@ def main():
 
 
 if __name__ == "__main__":
-    exit(main())
+    parser = argparse.ArgumentParser(description="ETL Hub XP: S3 -> SQL Server")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("ETL_WORKERS", "1")),
+        help="Processos para parse/transformação em paralelo (padrão: 1, serial)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        default=os.getenv("ETL_PIPELINE", "false").lower() in ("1", "true", "yes"),
+        help="Sobrepõe download, transformação, carga e movimentação em estágios com filas limitadas",
+    )
+    parser.add_argument(
+        "--ignore-ledger",
+        "--force",
+        dest="ignore_ledger",
+        action="store_true",
+        help="Reprocessa arquivos já registrados no ledger de ingestão (a nova carga é registrada)",
+    )
+    args = parser.parse_args()
+
+    exit(main(workers=args.workers, pipeline=args.pipeline, ignorar_ledger=args.ignore_ledger))
@@ -122,11 +122,11 @@ def filter_existing_dates(df: pd.DataFrame, table_name: str, engine) -> pd.DataF
         print(f"   Datas no banco: {len(existing_dates)}")
         print(f"   Datas no DataFrame: {len(df)}")
         
-        # Converte data_ref para datetime para comparação
-        df['data_ref'] = pd.to_datetime(df['data_ref'])
+        # Converte data_ref para datetime para comparação (sem alterar o df recebido)
+        df_filtered = df.assign(data_ref=pd.to_datetime(df['data_ref']))
         
         # Filtra apenas as datas novas
-        df_filtered = df[~df['data_ref'].isin(existing_dates)]
+        df_filtered = df_filtered[~df_filtered['data_ref'].isin(existing_dates)]
         
         print(f"   Novas datas a inserir: {len(df_filtered)}")
         
@@ -163,9 +163,8 @@ def processar_bc_cdi_historico(file_path: Optional[str] = None) -> Optional[Tabe
     
     # Para determinar o período, precisamos do engine
     try:
-        from loaders.sql_server_loader import SQLServerLoader
-        loader = SQLServerLoader()
-        engine = loader._get_engine()
+        from loaders.sql_server_loader import get_engine
+        engine = get_engine()
         
         # Determina período de consulta
         data_ini, data_fin = obter_periodo_consulta(engine)
@@ -4,16 +4,18 @@ Trata dados acumulados com lógica especial para substituir dados do mesmo perí
 """
 
 from processors.tabela import Tabela
+from utils.schema import ProcessorSchema
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
 from sqlalchemy import text
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, IO
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_captacao"
 LOAD_STRATEGY = LoadStrategy.APPEND  # Usamos APPEND pois temos lógica customizada
 BATCH_SIZE = 5000
+ATOMIC_LOAD = True  # Falha não deixa linhas parciais para a limpeza pós-carga
 
 # Mapeamento de colunas
 COLUMN_MAPPING = {
@@ -43,49 +45,20 @@ COLUMN_ORDER = [
 ]
 
 
-def processar_captacao(file_path: str) -> Tabela:
+def processar_captacao(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de captação do Hub XP.
 
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
 
     Returns:
         Objeto Tabela processado
     """
-    # Cria instância da tabela
-    tabela = Tabela(file_path)
-
-    # Remove coluna Escritório se existir
-    if "Escritório" in tabela.df.columns:
-        tabela.df = tabela.df.drop("Escritório", axis=1)
-
-    # Renomeia colunas
-    tabela.rename_columns(COLUMN_MAPPING)
-
-    # Normaliza colunas de texto (lowercase)
-    tabela.normalize_text_columns(TEXT_COLUMNS)
-
-    # Formata data_ref
-    if "data_ref" in tabela.df.columns:
-        tabela.format_date_columns(["data_ref"])
-
-    # Processa sinal_captacao (C = 1, D = -1)
-    if "sinal_captacao" in tabela.df.columns:
-        tabela.df["sinal_captacao"] = tabela.df["sinal_captacao"].apply(
-            process_sinal_captacao
-        )
-
-    # Formata colunas numéricas
-    tabela.format_numeric_columns(NUMERIC_COLUMNS)
-
-    # Adiciona data de processamento
-    tabela.add_processing_date()
-
-    # Reordena colunas
-    tabela.reorder_columns(COLUMN_ORDER)
-
-    return tabela
+    # Cria instância da tabela e aplica o schema (a coluna Escritório
+    # fica fora de COLUMN_ORDER e é descartada)
+    return transformar_captacao(Tabela(file_path, buffer=buffer))
 
 
 def process_sinal_captacao(valor: Any) -> int:
@@ -104,6 +77,17 @@ def process_sinal_captacao(valor: Any) -> int:
         return 0
 
 
+# Renomeia, normaliza texto, formata data_ref, converte sinal (C = 1,
+# D = -1) e valores, adiciona data_carga e reordena numa única passada
+SCHEMA = ProcessorSchema.from_constants(
+    globals(),
+    date_columns=["data_ref"],
+    converters={"sinal_captacao": process_sinal_captacao},
+    add_processing_date=True,
+)
+transformar_captacao = SCHEMA.compile()
+
+
 # Registrar função de pós-processamento diretamente
 # Esta função será chamada automaticamente pelo loader após inserção bem-sucedida
 POST_LOAD_FUNCTION = Tabela.post_load_cleanup_by_period
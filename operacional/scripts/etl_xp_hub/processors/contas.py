@@ -8,13 +8,14 @@ from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, IO
 from sqlalchemy import text
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_ativacoes_habilitacoes_evasoes"
 LOAD_STRATEGY = LoadStrategy.APPEND
 BATCH_SIZE = 5000
+ATOMIC_LOAD = True  # Falha não deixa linhas parciais para a limpeza pós-carga
 
 # Mapeamento de colunas
 COLUMN_MAPPING = {
@@ -38,12 +39,13 @@ COLUMN_ORDER = [
 ]
 
 
-def processar_contas(file_path: str) -> Tabela:
+def processar_contas(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de contas (ativações, habilitações ou evasões).
 
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
 
     Returns:
         Objeto Tabela processado
@@ -63,18 +65,10 @@ def processar_contas(file_path: str) -> Tabela:
     print(f"   📁 Tipo de movimentação detectado: {tipo_movimentacao}")
 
     # Cria instância da tabela
-    tabela = Tabela(file_path)
-
-    # Remove linhas com "Filtros aplicados:"
-    if len(tabela.df) > 0:
-        # Remove linhas que contêm "Filtros aplicados:" em qualquer coluna
-        mask = ~tabela.df.apply(
-            lambda row: row.astype(str)
-            .str.contains("Filtros aplicados:", case=False)
-            .any(),
-            axis=1,
-        )
-        tabela.df = tabela.df[mask]
+    tabela = Tabela(file_path, buffer=buffer)
+
+    # Remove linhas que contêm "Filtros aplicados:" em qualquer coluna
+    tabela.drop_rows_containing("Filtros aplicados:")
 
     # Remove coluna 'conta ativada' se for arquivo de habilitação
     if tipo_movimentacao == "habilitacao" and "conta ativada" in tabela.df.columns:
@@ -127,14 +121,14 @@ def post_load_cleanup(df: pd.DataFrame, table_name: str, engine) -> Dict[str, An
             print("⚠️ Colunas necessárias não encontradas. Pulando limpeza.")
             return {"status": "skipped", "reason": "missing required columns"}
         
-        # Converter data_ref para datetime
-        df['data_ref'] = pd.to_datetime(df['data_ref'])
+        # Converter data_ref para datetime (sem alterar o DataFrame recebido)
+        data_ref = pd.to_datetime(df['data_ref'])
         
         # Pegar a data_carga atual (deve ser a mesma para todos os registros inseridos)
         data_carga_atual = df['data_carga'].iloc[0]
         
         # Agrupar por período e tipo
-        grupos = df.groupby(['tipo_movimentacao', df['data_ref'].dt.to_period('M')]).size()
+        grupos = df.groupby(['tipo_movimentacao', data_ref.dt.to_period('M')]).size()
         
         print(f"\n🧹 Removendo registros com data_carga anterior a {data_carga_atual}...")
         total_deleted = 0
@@ -13,6 +13,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from processors.tabela import Tabela
 from config.database_config import LoadStrategy
 from utils.helpers import executar_etl_completo, validar_arquivo_existe
+from typing import IO, Optional
 
 # Configurações específicas para diversificação
 MAPEAMENTO_COLUNAS = {
@@ -47,9 +48,11 @@ ORDEM_COLUNAS = list(MAPEAMENTO_COLUNAS.values()) + ["data_carga"]
 NOME_TABELA = "xp_diversificacao"
 LOAD_STRATEGY = LoadStrategy.APPEND
 BATCH_SIZE = 5000
+EXCEL_ENGINE = "calamine"  # Cai para openpyxl se python-calamine não estiver instalado
+COMPACT_DTYPES = True  # Sem hooks de carga: compacta enquanto espera na fila
 
 
-def processar_diversificacao(file_path: str) -> Tabela:
+def processar_diversificacao(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de diversificação usando classe Tabela.
 
@@ -58,6 +61,7 @@ def processar_diversificacao(file_path: str) -> Tabela:
 
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
 
     Returns:
         Instância de Tabela processada
@@ -66,7 +70,7 @@ def processar_diversificacao(file_path: str) -> Tabela:
 
     # Cria instância da classe Tabela e aplica transformações específicas
     diversificacao = (
-        Tabela(file_path)
+        Tabela(file_path, buffer=buffer, excel_engine=EXCEL_ENGINE, lazy=True)
         .validate_required_columns(list(MAPEAMENTO_COLUNAS.keys()))
         .remove_empty_rows()
         .trim_text_columns()
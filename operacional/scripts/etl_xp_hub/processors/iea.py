@@ -4,8 +4,10 @@ Processa dados mensais com métricas de performance dos assessores.
 """
 
 from processors.tabela import Tabela
+from utils.schema import ProcessorSchema
 from config.database_config import LoadStrategy
 import os
+from typing import IO, Optional
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_iea"
@@ -31,9 +33,6 @@ COLUMN_MAPPING = {
     "Atingimento Contas Acessadas Hub": "atingimento_contas_acessadas_hub"
 }
 
-# Colunas a remover
-COLUMNS_TO_DROP = ["Código Matriz", "Matriz"]
-
 # Colunas numéricas
 NUMERIC_COLUMNS = [
     "iea_final",
@@ -54,42 +53,29 @@ NUMERIC_COLUMNS = [
 # Ordem final das colunas
 COLUMN_ORDER = list(COLUMN_MAPPING.values())
 
+# Remove as 2 últimas linhas (totais), renomeia, tira o 'A' do
+# cod_assessor, converte números e reordena
+SCHEMA = ProcessorSchema.from_constants(
+    globals(), remove_last_rows=2, code_columns={"cod_assessor": "A"}
+)
+transformar_iea = SCHEMA.compile()
+
 
-def processar_iea(file_path: str) -> Tabela:
+def processar_iea(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de IEA do Hub XP.
     
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
         
     Returns:
         Objeto Tabela processado
     """
     print(f"   📁 Processando IEA: {os.path.basename(file_path)}")
     
-    # Cria instância da tabela
-    tabela = Tabela(file_path)
-    
-    # Remove as últimas 2 linhas (geralmente totais)
-    tabela.remove_last_rows(2)
-    
-    # Remove colunas desnecessárias
-    for col in COLUMNS_TO_DROP:
-        if col in tabela.df.columns:
-            tabela.df = tabela.df.drop(col, axis=1)
-    
-    # Renomeia colunas
-    tabela.rename_columns(COLUMN_MAPPING)
-    
-    # Remove 'A' do início do cod_assessor
-    if "cod_assessor" in tabela.df.columns:
-        tabela.clean_column_code("cod_assessor", "A")
-    
-    # Formata colunas numéricas
-    tabela.format_numeric_columns(NUMERIC_COLUMNS)
-    
-    # Reordena colunas
-    tabela.reorder_columns(COLUMN_ORDER)
+    # Cria instância da tabela carregando só as colunas mapeadas
+    tabela = transformar_iea(Tabela(file_path, buffer=buffer, usecols=COLUMN_MAPPING))
     
     print(f"   ✅ Total de registros: {len(tabela.df)}")
     
@@ -3,15 +3,17 @@ Processador para arquivos de NPS Respostas.
 Processa dados de respostas de pesquisas NPS (Net Promoter Score).
 """
 from processors.tabela import Tabela
+from utils.excel_reader import columns_filter, read_excel_as_text
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, IO
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_nps_respostas"
 LOAD_STRATEGY = LoadStrategy.APPEND  # Estratégia padrão - ajustar conforme necessário
 BATCH_SIZE = 5000
+EXCEL_ENGINE = "calamine"  # Cai para openpyxl se python-calamine não estiver instalado
 
 # Mapeamento de colunas principais (as mais importantes)
 COLUMN_MAPPING = {
@@ -160,12 +162,13 @@ COLUMN_ORDER = [
 ]
 
 
-def processar_nps_respostas(file_path: str) -> Tabela:
+def processar_nps_respostas(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de NPS Respostas.
     
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
         
     Returns:
         Objeto Tabela processado
@@ -179,7 +182,14 @@ def processar_nps_respostas(file_path: str) -> Tabela:
     
     # Lê o arquivo pulando as 2 primeiras linhas
     try:
-        df = pd.read_excel(file_path, dtype=str, engine="openpyxl", skiprows=2)
+        source = Tabela.resolve_source(file_path, buffer)
+        # Só as colunas mapeadas; a duplicada 'Link to Response' vem como '.1'
+        df = read_excel_as_text(
+            source,
+            engine=EXCEL_ENGINE,
+            skiprows=2,
+            usecols=columns_filter(list(COLUMN_MAPPING) + ['Link to Response.1']),
+        )
         if df.empty:
             raise ValueError(f"Excel file is empty: {file_path}")
         tabela.df = df
@@ -3,10 +3,11 @@ Processador para arquivos de Open Investment Extrato do Hub XP.
 Processa dados de extrato de investimentos com informações de produtos e valores.
 """
 from processors.tabela import Tabela
+from utils.schema import ProcessorSchema
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, IO
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_open_investment_extrato"
@@ -39,42 +40,28 @@ NUMERIC_COLUMNS = ['valor_bruto', 'valor_liquido']
 # Ordem final das colunas
 COLUMN_ORDER = list(COLUMN_MAPPING.values()) + ['data_carga']
 
-def processar_oi_extrato(file_path: str) -> Tabela:
+# Remove as 2 últimas linhas (totais/filtros), renomeia, tira o 'A' do
+# cod_assessor, normaliza texto, converte valores e adiciona data_carga
+SCHEMA = ProcessorSchema.from_constants(
+    globals(),
+    remove_last_rows=2,
+    code_columns={'cod_assessor': 'A'},
+    add_processing_date=True,
+)
+transformar_oi_extrato = SCHEMA.compile()
+
+def processar_oi_extrato(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de Open Investment Extrato do Hub XP.
     
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
         
     Returns:
         Objeto Tabela processado
     """
-    # Cria instância da tabela
-    tabela = Tabela(file_path)
-    
-    # Remove as últimas 2 linhas (geralmente contém totais ou filtros)
-    tabela.remove_last_rows(2)
-    
-    # Renomeia colunas conforme mapeamento
-    tabela.rename_columns(COLUMN_MAPPING)
-    
-    # Remove 'A' do início do cod_assessor se existir
-    if 'cod_assessor' in tabela.df.columns:
-        tabela.clean_column_code('cod_assessor', 'A')
-    
-    # Normaliza colunas de texto
-    tabela.normalize_text_columns(TEXT_COLUMNS)
-    
-    # Formata colunas numéricas
-    tabela.format_numeric_columns(NUMERIC_COLUMNS)
-    
-    # Adiciona data de carga
-    tabela.add_processing_date()
-    
-    # Reordena colunas
-    tabela.reorder_columns(COLUMN_ORDER)
-    
-    return tabela
+    return transformar_oi_extrato(Tabela(file_path, buffer=buffer))
 
 
 if __name__ == "__main__":
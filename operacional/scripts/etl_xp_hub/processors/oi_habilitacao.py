@@ -7,12 +7,13 @@ from processors.tabela import Tabela
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, IO
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_open_investment_habilitacao"
 LOAD_STRATEGY = LoadStrategy.APPEND  # Usamos APPEND pois temos lógica customizada
 BATCH_SIZE = 5000
+ATOMIC_LOAD = True  # Falha não deixa linhas parciais para a limpeza pós-carga
 
 # Mapeamento de colunas
 COLUMN_MAPPING = {
@@ -30,9 +31,6 @@ COLUMN_MAPPING = {
     "Sugestão Estratégia": "sugestao_estrategia",
 }
 
-# Colunas a remover
-COLUMNS_TO_DROP = ["Cód. Matriz", "Segmento", "Descrição Estratégia"]
-
 # Colunas de texto a normalizar
 TEXT_COLUMNS = [
     "cod_xp",
@@ -65,27 +63,23 @@ COLUMN_ORDER = [
 ]
 
 
-def processar_oi_habilitacao(file_path: str) -> Tabela:
+def processar_oi_habilitacao(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de Open Finance (OI Habilitação) do Hub XP.
 
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
 
     Returns:
         Objeto Tabela processado
     """
-    # Cria instância da tabela
-    tabela = Tabela(file_path)
-
-    # Remove as últimas 2 linhas (conforme código original)
-    if len(tabela.df) >= 2:
-        tabela.df = tabela.df.iloc[:-2]
+    # Cria instância da tabela carregando só as colunas mapeadas
+    tabela = Tabela(file_path, buffer=buffer, usecols=COLUMN_MAPPING)
 
-    # Remove colunas desnecessárias
-    for col in COLUMNS_TO_DROP:
-        if col in tabela.df.columns:
-            tabela.df = tabela.df.drop(col, axis=1)
+    # Remove o rodapé "Filtros aplicados:"; a linha em branco acima dele
+    # sai junto com as demais sem data_permissao
+    tabela.drop_rows_containing("Filtros aplicados:")
 
     # Renomeia colunas
     tabela.rename_columns(COLUMN_MAPPING)
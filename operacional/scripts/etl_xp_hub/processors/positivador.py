@@ -3,17 +3,21 @@ Processador para arquivos de Positivador do Hub XP.
 Processa dados de clientes com informações de cadastro, operações e receitas.
 """
 
-from processors.tabela import Tabela
+from processors.tabela import Tabela, TabelaStream
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
 import numpy as np
 import os
+from typing import IO, Optional
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_positivador"
 LOAD_STRATEGY = LoadStrategy.APPEND
 BATCH_SIZE = 5000
+COMMIT_EVERY = 50_000  # Linhas por transação (menos log flushes que um commit por lote)
+EXCEL_ENGINE = "calamine"  # Cai para openpyxl se python-calamine não estiver instalado
+COMPACT_DTYPES = True  # Sem hooks de carga: compacta enquanto espera na fila
 
 # Mapeamento de colunas do Excel para o banco
 COLUMN_MAPPING = {
@@ -59,6 +63,9 @@ COLUMN_MAPPING = {
     "Valor Receita Aluguel": "receita_aluguel",
 }
 
+# Colunas lidas do Excel (data_ref só existe nos arquivos _acumulado)
+USECOLS = list(COLUMN_MAPPING) + ["data_ref"]
+
 # Colunas por tipo de tratamento
 TEXT_COLUMNS = ["cod_aai", "cod_xp", "profissao", "sexo", "segmento"]
 BOOLEAN_COLUMNS = [
@@ -152,21 +159,19 @@ def add_custom_reference_date(tabela: Tabela, column_name: str = "data_ref") ->
     return tabela
 
 
-def processar_positivador(file_path: str) -> Tabela:
+def transformar_positivador(tabela: Tabela) -> Tabela:
     """
-    Processa arquivo de positivador do Hub XP.
+    Aplica as transformações do positivador (linha a linha, então também
+    serve para cada bloco de uma TabelaStream).
 
     Args:
-        file_path: Caminho do arquivo Excel
+        tabela: Tabela com as colunas do Excel
 
     Returns:
         Objeto Tabela processado
     """
-    # Cria instância da tabela
-    tabela = Tabela(file_path)
-    
     # Verifica se é arquivo acumulado e tem coluna data_ref
-    filename = os.path.basename(file_path)
+    filename = os.path.basename(tabela.file_path)
     filename_no_ext = os.path.splitext(filename)[0]
     is_acumulado = filename_no_ext.endswith("_acumulado")
     
@@ -181,13 +186,17 @@ def processar_positivador(file_path: str) -> Tabela:
         .rename_columns(COLUMN_MAPPING)
         .normalize_text_columns(TEXT_COLUMNS)
         .format_date_columns(date_columns_to_format)
-        .format_numeric_columns(NUMERIC_COLUMNS)
+        # IMPORTANTE: converte já validando contra o DECIMAL(16,4) do SQL Server
+        # (arquivos acumulados podem ter valores muito grandes)
+        .format_decimal_columns(NUMERIC_COLUMNS, precision=16, scale=4)
         .convert_boolean_columns(BOOLEAN_COLUMNS)
     )
-    
-    # IMPORTANTE: Valida limites decimais para evitar overflow no SQL Server
-    # Especialmente importante para arquivos acumulados que podem ter valores muito grandes
-    tabela = tabela.validate_decimal_limits(NUMERIC_COLUMNS, precision=16, scale=4)
+    for coluna, overflow in tabela.decimal_overflow.items():
+        if overflow["overflow"]:
+            print(
+                f"   ⚠️ Coluna '{coluna}': {overflow['overflow']} valores excedem "
+                f"DECIMAL(16,4) e viraram NULL (ex.: {overflow['examples']})"
+            )
     
     # Aplica método customizado de data de referência
     tabela = add_custom_reference_date(tabela)
@@ -202,6 +211,45 @@ def processar_positivador(file_path: str) -> Tabela:
     return tabela
 
 
+def processar_positivador(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
+    """
+    Processa arquivo de positivador do Hub XP.
+
+    Args:
+        file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
+
+    Returns:
+        Objeto Tabela processado
+    """
+    # Cria instância da tabela (só as colunas mapeadas e data_ref de acumulados)
+    tabela = Tabela(
+        file_path,
+        buffer=buffer,
+        excel_engine=EXCEL_ENGINE,
+        usecols=USECOLS,
+    )
+    return transformar_positivador(tabela)
+
+
+def processar_positivador_stream(file_path: str, buffer: Optional[IO[bytes]] = None) -> TabelaStream:
+    """
+    Processa o positivador em blocos de linhas (arquivos _acumulado grandes).
+
+    Args:
+        file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
+
+    Returns:
+        TabelaStream que entrega os blocos já transformados
+    """
+    return TabelaStream(file_path, usecols=USECOLS, buffer=buffer).pipe(transformar_positivador)
+
+
+# Arquivos grandes são lidos e carregados em blocos (ver main.py)
+STREAMING_FUNCTION = processar_positivador_stream
+
+
 if __name__ == "__main__":
     # Teste local do processador
     import sys
@@ -6,11 +6,11 @@ from processors.tabela import Tabela
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, IO
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_rpa_clientes"
-LOAD_STRATEGY = LoadStrategy.APPEND  # Usa APPEND mas com filtragem customizada
+LOAD_STRATEGY = LoadStrategy.UPSERT  # Insere clientes novos e atualiza os existentes (data_carga só no INSERT)
 BATCH_SIZE = 5000
 
 # Colunas de texto a normalizar (assumindo que existem no arquivo)
@@ -19,21 +19,23 @@ TEXT_COLUMNS = ["elegibilidade_cartao", "status_conta_digital", "produto", "emai
 # Colunas monetárias que precisam limpeza especial
 MONETARY_COLUMNS = ["patrimonio"]
 
-# Coluna chave para verificar duplicatas
+# Coluna chave do cliente (UPSERT)
 KEY_COLUMN = "cod_xp"
+PRIMARY_KEY = KEY_COLUMN
 
-def processar_rpa_clientes(file_path: str) -> Tabela:
+def processar_rpa_clientes(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de RPA Clientes do Hub XP.
     
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
         
     Returns:
         Objeto Tabela processado
     """
     # Cria instância da tabela
-    tabela = Tabela(file_path)
+    tabela = Tabela(file_path, buffer=buffer)
     
     # Limpa e formata colunas monetárias usando método da classe Tabela
     tabela.clean_monetary_columns(MONETARY_COLUMNS)
@@ -47,12 +49,6 @@ def processar_rpa_clientes(file_path: str) -> Tabela:
     return tabela
 
 
-
-# Registrar função de pré-processamento diretamente
-# Esta função será chamada ANTES da inserção
-PRE_LOAD_FUNCTION = lambda df, table, engine: Tabela.filter_new_records_by_key(df, table, engine, KEY_COLUMN)
-
-
 if __name__ == "__main__":
     # Teste local do processador
     import sys
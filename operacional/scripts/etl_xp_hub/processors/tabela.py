@@ -6,12 +6,215 @@ permitindo aplicar diferentes transformações conforme necessário.
 """
 
 import pandas as pd
+import numpy as np
 import os
-from typing import Dict, List, Optional, Any, Union
+import re
+from typing import IO, Dict, Iterable, List, Optional, Any, Union
 from datetime import datetime, date
+from functools import lru_cache
 import unicodedata
 
 from utils.exceptions import TransformationError, ValidationError
+from utils.excel_reader import columns_filter, iter_excel_chunks_as_text, read_excel_as_text
+
+# Formatos de data aceitos, na ordem em que são tentados
+FORMATOS_DATA_BR = [
+    "%d/%m/%Y",  # 31/12/2024
+    "%d-%m-%Y",  # 31-12-2024
+    "%d.%m.%Y",  # 31.12.2024
+    "%d/%m/%Y %H:%M:%S",  # 31/12/2024 14:30:00
+    "%d/%m/%Y %H:%M",  # 31/12/2024 14:30
+    "%Y-%m-%d",  # 2024-12-31 (ISO)
+    "%Y-%m-%d %H:%M:%S",  # 2024-12-31 14:30:00
+]
+
+# Valores distintos usados para escolher o formato mais provável da coluna
+AMOSTRA_INFERENCIA_DATA = 200
+
+# Textos normalizados guardados em cache (compartilhado entre colunas e arquivos)
+CACHE_TEXTO_NORMALIZADO = 100_000
+
+# compact_dtypes: coluna de texto vira category se distintos/linhas <= este valor
+PROPORCAO_MAXIMA_CATEGORIA = 0.5
+
+# Linhas lidas por bloco na TabelaStream
+LINHAS_POR_CHUNK = 50_000
+
+# drop_rows_containing: linhas finais onde ficam os rodapés dos exports
+LINHAS_RODAPE = 20
+
+# coerce_to_schema: tipos do SQL Server (INFORMATION_SCHEMA.COLUMNS.DATA_TYPE)
+TIPOS_SQL_DECIMAL = {"decimal", "numeric", "money", "smallmoney"}
+TIPOS_SQL_FLOAT = {"float", "real"}
+TIPOS_SQL_DATA = {"date", "datetime", "datetime2", "smalldatetime", "datetimeoffset"}
+TIPOS_SQL_TEXTO = {"char", "varchar", "nchar", "nvarchar", "text", "ntext"}
+LIMITES_SQL_INTEIRO = {
+    "bit": (0, 1),
+    "tinyint": (0, 255),
+    "smallint": (-(2**15), 2**15 - 1),
+    "int": (-(2**31), 2**31 - 1),
+    "bigint": (-(2**63), 2**63 - 1),
+}
+
+
+def copy_on_write_ativo() -> bool:
+    """
+    Se o copy-on-write do pandas está ativo (padrão a partir do pandas 3.0;
+    no 2.x o main.py liga a opção mode.copy_on_write ao iniciar).
+
+    Com ele, cópias rasas (Tabela(dataframe=...), get_data()) não duplicam
+    dados: só a coluna alterada é copiada, na hora da escrita.
+    """
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+
+@lru_cache(maxsize=CACHE_TEXTO_NORMALIZADO)
+def _normalizar_texto(texto: str) -> str:
+    """Remove acentos, converte para lowercase e tira espaços das pontas."""
+    return (
+        unicodedata.normalize("NFKD", texto.lower())
+        .encode("ASCII", "ignore")
+        .decode("utf-8")
+        .strip()
+    )
+
+
+class _PlanoTabela:
+    """
+    Plano de transformações pendentes de uma Tabela em modo lazy.
+
+    Cada coluna viva é identificada por um id estável: renomear ou
+    reordenar só altera a lista (nome, id), sem tocar nos dados. As
+    operações que mexem em valores ficam em `operacoes`:
+
+        ("map", id, func)              func(Series) -> Series, elemento a elemento
+        ("const", id, valor)           coluna com valor constante
+        ("filtro", tipo, args, ids)    filtro de linhas que lê as colunas `ids`
+
+    executar() aplica o plano num DataFrame:
+        - colunas que não chegam ao fim nem são lidas por filtros nunca
+          são convertidas (projeção antecipada)
+        - cada filtro roda assim que as colunas que ele lê estão prontas;
+          conversões das demais colunas ficam para depois, já sobre menos
+          linhas
+        - as conversões pendentes de cada coluna rodam em sequência, uma
+          coluna por vez, e o DataFrame final é montado uma única vez
+
+    Os valores são os mesmos do modo eager. Só o dtype pode mudar quando o
+    filtro remove todas as linhas conversíveis de uma coluna: ela sai como
+    object (None) em vez de float64/datetime64 vazio.
+    """
+
+    def __init__(self, columns: Iterable[Any]):
+        self.colunas = [(nome, ("origem", i)) for i, nome in enumerate(columns)]
+        self.operacoes: List[tuple] = []
+        self.pendente = False
+        self._constantes = 0
+
+    def nomes(self) -> List[Any]:
+        return [nome for nome, _ in self.colunas]
+
+    def id_de(self, nome: Any) -> tuple:
+        return next(id_coluna for n, id_coluna in self.colunas if n == nome)
+
+    def renomear(self, mapping: Dict[str, str]) -> bool:
+        """Renomeia no plano; False se o resultado teria nomes duplicados."""
+        novas = [(mapping.get(nome, nome), id_coluna) for nome, id_coluna in self.colunas]
+        if len({nome for nome, _ in novas}) != len(novas):
+            return False
+        self.colunas = novas
+        self.pendente = True
+        return True
+
+    def selecionar(self, nomes: List[Any]) -> bool:
+        """Projeta e reordena; False se a seleção repete colunas."""
+        if len(set(nomes)) != len(nomes):
+            return False
+        self.colunas = [(nome, self.id_de(nome)) for nome in nomes]
+        self.pendente = True
+        return True
+
+    def mapear(self, nome: Any, func) -> None:
+        self.operacoes.append(("map", self.id_de(nome), func))
+        self.pendente = True
+
+    def constante(self, nome: Any, valor: Any) -> None:
+        self._constantes += 1
+        id_coluna = ("constante", self._constantes)
+        self.operacoes.append(("const", id_coluna, valor))
+
+        nomes = self.nomes()
+        if nome in nomes:
+            self.colunas[nomes.index(nome)] = (nome, id_coluna)
+        else:
+            self.colunas.append((nome, id_coluna))
+        self.pendente = True
+
+    def filtrar(self, tipo: str, args: tuple, nomes: List[Any]) -> None:
+        ids = [self.id_de(nome) for nome in nomes]
+        self.operacoes.append(("filtro", tipo, args, ids))
+        self.pendente = True
+
+    def executar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Aplica o plano e devolve o DataFrame resultante."""
+        necessarios = {id_coluna for _, id_coluna in self.colunas}
+        for op in self.operacoes:
+            if op[0] == "filtro":
+                necessarios.update(op[3])
+
+        # Projeção antecipada: só as colunas de origem que ainda serão usadas
+        series: Dict[tuple, pd.Series] = {
+            id_coluna: df.iloc[:, id_coluna[1]]
+            for id_coluna in necessarios
+            if id_coluna[0] == "origem"
+        }
+        index = df.index
+        pendentes: Dict[tuple, List[tuple]] = {}
+
+        for posicao, op in enumerate(self.operacoes):
+            if op[0] == "map" and op[1] in necessarios:
+                pendentes.setdefault(op[1], []).append((posicao, op[2]))
+            elif op[0] == "const" and op[1] in necessarios:
+                series[op[1]] = pd.Series(op[2], index=index, dtype=object)
+
+        def aplicar_pendentes(id_coluna: tuple, ate: int) -> None:
+            fila = pendentes.get(id_coluna, [])
+            while fila and fila[0][0] < ate:
+                series[id_coluna] = fila.pop(0)[1](series[id_coluna])
+
+        for posicao, op in enumerate(self.operacoes):
+            if op[0] != "filtro":
+                continue
+            _, tipo, args, ids = op
+            for id_coluna in ids:
+                aplicar_pendentes(id_coluna, posicao)
+
+            if tipo == "ultimas_linhas":
+                num_rows = args[0]
+                if not (num_rows > 0 and len(index) > num_rows):
+                    continue
+                manter = np.arange(len(index)) < len(index) - num_rows
+            elif tipo == "linhas_vazias":
+                manter = np.zeros(len(index), dtype=bool)
+                for id_coluna in ids:
+                    manter |= series[id_coluna].notna().to_numpy()
+            else:  # "valores"
+                values, exclude = args
+                manter = series[ids[0]].isin(values).to_numpy()
+                if exclude:
+                    manter = ~manter
+
+            index = index[manter]
+            series = {id_coluna: s[manter] for id_coluna, s in series.items()}
+
+        # Conversões restantes, uma coluna por vez
+        for id_coluna in pendentes:
+            aplicar_pendentes(id_coluna, len(self.operacoes))
+
+        return pd.DataFrame(
+            {nome: series[id_coluna] for nome, id_coluna in self.colunas},
+            index=index,
+        )
 
 
 class Tabela:
@@ -22,30 +225,143 @@ class Tabela:
     para transformar dados de diferentes tipos de arquivo.
     """
 
-    def __init__(self, file_path: Optional[str] = None, dataframe: Optional[pd.DataFrame] = None):
+    # Modo lazy: transformações viram um plano executado no primeiro acesso a df
+    lazy = False
+    _plano: Optional[_PlanoTabela] = None
+
+    # Resultado do último compact_dtypes (exposto em info())
+    compaction: Optional[Dict[str, Any]] = None
+
+    # Valores fora do DECIMAL de destino por coluna (format_decimal_columns)
+    decimal_overflow: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # Resultado do último coerce_to_schema, por coluna
+    schema_coercion: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        dataframe: Optional[pd.DataFrame] = None,
+        buffer: Optional[IO[bytes]] = None,
+        excel_engine: Optional[str] = None,
+        usecols: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ):
         """
         Inicializa com carregamento do arquivo Excel ou DataFrame pronto.
 
         Args:
             file_path: Caminho para o arquivo Excel
             dataframe: DataFrame já carregado (alternativa ao file_path)
+            buffer: Conteúdo do Excel em memória; file_path passa a ser
+                    apenas o nome lógico do arquivo
+            excel_engine: "calamine", "openpyxl" ou "auto" (padrão: EXCEL_ENGINE)
+            usecols: Colunas do Excel a carregar (ex.: COLUMN_MAPPING); as
+                     demais não são convertidas nem alocadas. None = todas
+            lazy: Acumula as transformações num plano otimizado, executado
+                  em get_data() ou no primeiro acesso a df
         """
-        if file_path is None and dataframe is None:
-            raise ValueError("Deve fornecer file_path ou dataframe")
+        if file_path is None and dataframe is None and buffer is None:
+            raise ValueError("Deve fornecer file_path, dataframe ou buffer")
             
         self.file_path = file_path
+        self.excel_engine = excel_engine
+        self.usecols = list(usecols) if usecols is not None else None
+        self.lazy = lazy
         self.original_columns = None
         
         if dataframe is not None:
-            self.df = dataframe.copy()
+            # Com copy-on-write, cópia rasa: as transformações não alteram o
+            # DataFrame de quem chamou (sem ele, só uma cópia completa garante isso)
+            self.df = dataframe.copy(deep=not copy_on_write_ativo())
             self.original_columns = list(self.df.columns)
         else:
-            self.df = self.load_excel()
+            self.df = self.load_excel(buffer)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """DataFrame atual (no modo lazy, executa o plano pendente antes)."""
+        if self._plano is not None:
+            # Quem acessa df pode alterá-lo: o próximo plano parte do zero
+            plano, self._plano = self._plano, None
+            if plano.pendente:
+                self._df = plano.executar(self._df)
+        return self._df
+
+    @df.setter
+    def df(self, dataframe: pd.DataFrame) -> None:
+        self._df = dataframe
+        self._plano = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # O plano guarda funções locais (não serializáveis): executa antes
+        self.df
+        return self.__dict__.copy()
+
+    def _plano_lazy(self) -> Optional[_PlanoTabela]:
+        """Plano em construção (None fora do modo lazy ou com colunas duplicadas)."""
+        if self.lazy and self._plano is None and self._df.columns.is_unique:
+            self._plano = _PlanoTabela(self._df.columns)
+        return self._plano
+
+    def _columns(self) -> List[Any]:
+        """Colunas atuais, sem executar o plano pendente."""
+        plano = self._plano_lazy()
+        if plano is not None:
+            return plano.nomes()
+        return list(self._df.columns)
+
+    def _map_column(self, column: Any, func) -> None:
+        """Aplica func(Series) -> Series a uma coluna (ou agenda no plano)."""
+        plano = self._plano_lazy()
+        if plano is not None:
+            plano.mapear(column, func)
+        else:
+            self.df[column] = func(self.df[column])
+
+    def _filter_rows(self, tipo: str, args: tuple, columns: List[Any], eager) -> None:
+        """Filtra linhas com eager(df) -> df (ou agenda no plano)."""
+        plano = self._plano_lazy()
+        if plano is not None:
+            plano.filtrar(tipo, args, columns)
+        else:
+            self.df = eager(self.df)
+
+    def _assign_constant(self, column: Any, value: Any) -> None:
+        """Cria/sobrescreve uma coluna com valor constante (ou agenda no plano)."""
+        plano = self._plano_lazy()
+        if plano is not None:
+            plano.constante(column, value)
+        else:
+            self.df[column] = value
+
+    @staticmethod
+    def resolve_source(file_path: str, buffer: Optional[IO[bytes]] = None) -> Union[str, IO[bytes]]:
+        """
+        Retorna de onde ler o Excel: o buffer em memória, se houver, ou o caminho.
+
+        Args:
+            file_path: Caminho do arquivo
+            buffer: Conteúdo em memória (download do S3 sem arquivo temporário)
+
+        Returns:
+            Buffer posicionado no início ou o próprio caminho
+        """
+        if buffer is not None:
+            buffer.seek(0)
+            return buffer
+        return file_path
 
-    def load_excel(self) -> pd.DataFrame:
+    def load_excel(self, buffer: Optional[IO[bytes]] = None) -> pd.DataFrame:
         """
         Carrega arquivo Excel como DataFrame.
 
+        O buffer não fica guardado na instância: quem o criou pode fechá-lo
+        logo após a leitura e a Tabela continua serializável.
+
+        Args:
+            buffer: Conteúdo em memória; None lê de file_path
+
         Returns:
             DataFrame com dados brutos
 
@@ -53,13 +369,23 @@ class Tabela:
             TransformationError: Se não conseguir carregar o arquivo
         """
         try:
-            if not os.path.exists(self.file_path):
+            source = self.resolve_source(self.file_path, buffer)
+
+            if isinstance(source, str) and not os.path.exists(source):
                 raise TransformationError(
                     f"File not found: {self.file_path}", file_path=self.file_path
                 )
 
             # Carrega como string para preservar formatação
-            df = pd.read_excel(self.file_path, dtype=str, engine="openpyxl")
+            df = read_excel_as_text(
+                source, engine=self.excel_engine, usecols=columns_filter(self.usecols)
+            )
+
+            if self.usecols is not None and len(df.columns) == 0:
+                raise TransformationError(
+                    f"None of the expected columns found in Excel file: {self.file_path}",
+                    file_path=self.file_path,
+                )
 
             if df.empty:
                 raise TransformationError(
@@ -90,12 +416,13 @@ class Tabela:
             Self para permitir method chaining
         """
         # Só renomeia colunas que existem
-        valid_mapping = {
-            old: new for old, new in mapping.items() if old in self.df.columns
-        }
+        columns = self._columns()
+        valid_mapping = {old: new for old, new in mapping.items() if old in columns}
 
         if valid_mapping:
-            self.df = self.df.rename(columns=valid_mapping)
+            plano = self._plano_lazy()
+            if plano is None or not plano.renomear(valid_mapping):
+                self.df = self.df.rename(columns=valid_mapping)
 
         return self
 
@@ -110,8 +437,8 @@ class Tabela:
             Self para permitir method chaining
         """
         for column in columns:
-            if column in self.df.columns:
-                self.df[column] = self.df[column].apply(self._normalize_text)
+            if column in self._columns():
+                self._map_column(column, self._normalize_text_series)
 
         return self
 
@@ -126,8 +453,8 @@ class Tabela:
             Self para permitir method chaining
         """
         for column in columns:
-            if column in self.df.columns:
-                self.df[column] = self.df[column].apply(self._format_date_br_robust)
+            if column in self._columns():
+                self._map_column(column, self._parse_date_series)
 
         return self
 
@@ -142,16 +469,53 @@ class Tabela:
             Self para permitir method chaining
         """
         for column in columns:
-            if column in self.df.columns:
-                self.df[column] = self.df[column].apply(self._format_numeric)
+            if column in self._columns():
+                self._map_column(column, self._parse_numeric_series)
 
         return self
     
+    def format_decimal_columns(
+        self, columns: List[str], precision: int = 16, scale: int = 4
+    ) -> "Tabela":
+        """
+        Converte colunas numéricas para o DECIMAL(precision, scale) de destino.
+
+        Uma única passada por coluna: parse (como format_numeric_columns),
+        arredondamento para scale casas e troca por NULL dos valores que
+        não cabem no DECIMAL (evita overflow no SQL Server): após o
+        arredondamento, |valor| >= 10 ** (precision - scale). O resultado é
+        sempre float64 e as ocorrências ficam em self.decimal_overflow
+        (também em info()); nada é impresso, quem chama decide como reportar:
+
+            {"coluna": {"overflow": 2, "examples": [1.5e+16, -2e+17]}}
+
+        Colunas já numéricas só passam pelo arredondamento e pela checagem.
+
+        Args:
+            columns: Lista de colunas numéricas (texto do Excel ou já convertidas)
+            precision: Total de dígitos (padrão 16)
+            scale: Dígitos após a vírgula (padrão 4)
+
+        Returns:
+            Self para permitir method chaining
+        """
+        self.decimal_overflow = {}
+        for column in columns:
+            if column in self._columns():
+                self._map_column(
+                    column,
+                    self._decimal_guard(column, precision, scale, self._numeric_values),
+                )
+
+        return self
+
     def validate_decimal_limits(self, columns: List[str], precision: int = 16, scale: int = 4) -> "Tabela":
         """
         Valida e trata valores numéricos que excedem limites de DECIMAL/NUMERIC do SQL Server.
-        Substitui valores que excedem o limite por NULL para evitar erros de overflow.
-        
+
+        Mantido por compatibilidade: é o próprio format_decimal_columns
+        (mesma regra de overflow e mesmo relatório em self.decimal_overflow).
+
         Args:
             columns: Lista de colunas numéricas para validar
             precision: Total de dígitos (padrão 16)
@@ -160,41 +524,41 @@ class Tabela:
         Returns:
             Self para permitir method chaining
         """
-        # Calcula o valor máximo baseado na precisão e escala
-        max_digits_before_decimal = precision - scale
-        max_value = 10 ** max_digits_before_decimal - 1
-        
-        print(f"\n🔍 Validando limites decimais para colunas numéricas...")
-        print(f"   Precisão: {precision}, Escala: {scale}")
-        print(f"   Valor máximo permitido: {max_value:,.{scale}f}")
-        
-        valores_alterados = 0
-        
-        for column in columns:
-            if column in self.df.columns:
-                # Converte para float64 para garantir comparação correta
-                self.df[column] = pd.to_numeric(self.df[column], errors='coerce')
-                
-                # Identifica valores que excedem o limite
-                mask_overflow = self.df[column].abs() > max_value
-                count_overflow = mask_overflow.sum()
-                
-                if count_overflow > 0:
-                    # Captura alguns exemplos dos valores que serão alterados
-                    exemplos = self.df.loc[mask_overflow, column].head(3).tolist()
-                    
-                    print(f"   ⚠️ Coluna '{column}': {count_overflow} valores excedem o limite")
-                    print(f"      Exemplos: {[f'{v:,.2f}' for v in exemplos[:3]]}")
-                    
-                    # Substitui valores que excedem o limite por NULL
-                    self.df.loc[mask_overflow, column] = None
-                    valores_alterados += count_overflow
-        
-        if valores_alterados > 0:
-            print(f"   ✅ Total de valores alterados para NULL: {valores_alterados}")
-        else:
-            print(f"   ✅ Nenhum valor excede os limites")
-            
+        return self.format_decimal_columns(columns, precision, scale)
+
+    def coerce_to_schema(self, column_types: Dict[str, Dict[str, Any]]) -> "Tabela":
+        """
+        Converte cada coluna para o tipo da coluna de destino no SQL Server.
+
+        Os tipos vêm de SQLServerLoader.get_column_types (INFORMATION_SCHEMA,
+        lidos uma vez por execução). Assim cada lote chega ao pyodbc com um
+        tipo único por coluna, sem adivinhação nem lote recusado:
+
+            decimal/numeric/money   float64 arredondado para a escala
+            int/bigint/smallint...  int64 (object com int/None se há nulos)
+            bit                     0/1 (texto via format_boolean_columns)
+            float/real              float64
+            date/datetime...        datetime64 (texto via format_date_columns)
+            char/varchar/nvarchar   str
+
+        Como em format_decimal_columns, valores que não cabem no tipo
+        (fora da faixa, texto maior que o tamanho) viram NULL; as
+        ocorrências ficam em self.schema_coercion. Colunas sem tipo
+        conhecido (ou de tipos não listados) ficam como estão.
+
+        Args:
+            column_types: {"coluna": {"data_type", "max_length", "precision", "scale"}}
+
+        Returns:
+            Self para permitir method chaining
+        """
+        self.schema_coercion = {}
+        for column in self._columns():
+            tipo = column_types.get(column)
+            conversor = self._schema_converter(column, tipo) if tipo else None
+            if conversor is not None:
+                self._map_column(column, conversor)
+
         return self
 
     def format_boolean_columns(self, columns: List[str]) -> "Tabela":
@@ -208,8 +572,8 @@ class Tabela:
             Self para permitir method chaining
         """
         for column in columns:
-            if column in self.df.columns:
-                self.df[column] = self.df[column].apply(self._convert_boolean)
+            if column in self._columns():
+                self._map_column(column, lambda serie: serie.apply(self._convert_boolean))
 
         return self
 
@@ -236,8 +600,24 @@ class Tabela:
             Self para permitir method chaining
         """
         for column in columns:
-            if column in self.df.columns:
-                self.df[column] = self.df[column].apply(self._clean_monetary_value)
+            if column in self._columns():
+                self._map_column(column, self._parse_monetary_series)
+
+        return self
+
+    def apply_to_column(self, column: str, func) -> "Tabela":
+        """
+        Aplica uma função a cada valor de uma coluna (ex.: sinal C/D -> 1/-1).
+
+        Args:
+            column: Nome da coluna
+            func: Função valor -> valor convertido
+
+        Returns:
+            Self para permitir method chaining
+        """
+        if column in self._columns():
+            self._map_column(column, lambda serie: serie.apply(func))
 
         return self
 
@@ -252,11 +632,10 @@ class Tabela:
         Returns:
             Self para permitir method chaining
         """
-        if column in self.df.columns:
-            self.df[column] = (
-                self.df[column]
-                .astype(str)
-                .str.replace(chars_to_remove, "", regex=False)
+        if column in self._columns():
+            self._map_column(
+                column,
+                lambda serie: serie.astype(str).str.replace(chars_to_remove, "", regex=False),
             )
 
         return self
@@ -271,11 +650,11 @@ class Tabela:
         Returns:
             Self para permitir method chaining
         """
-        if column in self.df.columns:
-            self.df[column] = (
-                self.df[column].astype(str).str.replace(r"[^\d]", "", regex=True)
+        if column in self._columns():
+            self._map_column(
+                column,
+                lambda serie: serie.astype(str).str.replace(r"[^\d]", "", regex=True).replace("", pd.NA),
             )
-            self.df[column] = self.df[column].replace("", pd.NA)
 
         return self
 
@@ -289,8 +668,12 @@ class Tabela:
         Returns:
             Self para permitir method chaining
         """
-        if num_rows > 0 and len(self.df) > num_rows:
-            self.df = self.df.iloc[:-num_rows]
+        def eager(df: pd.DataFrame) -> pd.DataFrame:
+            if num_rows > 0 and len(df) > num_rows:
+                return df.iloc[:-num_rows]
+            return df
+
+        self._filter_rows("ultimas_linhas", (num_rows,), [], eager)
 
         return self
 
@@ -301,7 +684,9 @@ class Tabela:
         Returns:
             Self para permitir method chaining
         """
-        self.df = self.df.dropna(how="all")
+        self._filter_rows(
+            "linhas_vazias", (), self._columns(), lambda df: df.dropna(how="all")
+        )
         return self
 
     def remove_empty_columns(self) -> "Tabela":
@@ -339,7 +724,7 @@ class Tabela:
         Returns:
             Self para permitir method chaining
         """
-        self.df[column_name] = datetime.today().strftime("%Y-%m-%d")
+        self._assign_constant(column_name, datetime.today().strftime("%Y-%m-%d"))
         return self
 
     def add_reference_date(self, column_name: str = "data_ref") -> "Tabela":
@@ -362,10 +747,10 @@ class Tabela:
             date_str = filename_no_ext[-10:]  # Últimos 10 caracteres
             # Valida se é uma data válida
             pd.to_datetime(date_str, format="%Y-%m-%d")
-            self.df[column_name] = date_str
+            self._assign_constant(column_name, date_str)
         except:
             # Se falhar, usa data de hoje
-            self.df[column_name] = datetime.today().strftime("%Y-%m-%d")
+            self._assign_constant(column_name, datetime.today().strftime("%Y-%m-%d"))
         return self
 
     def reorder_columns(self, column_order: List[str]) -> "Tabela":
@@ -379,9 +764,12 @@ class Tabela:
             Self para permitir method chaining
         """
         # Só reordena colunas que existem
-        existing_columns = [col for col in column_order if col in self.df.columns]
+        columns = self._columns()
+        existing_columns = [col for col in column_order if col in columns]
         if existing_columns:
-            self.df = self.df[existing_columns]
+            plano = self._plano_lazy()
+            if plano is None or not plano.selecionar(existing_columns):
+                self.df = self.df[existing_columns]
 
         return self
 
@@ -399,11 +787,67 @@ class Tabela:
         Returns:
             Self para permitir method chaining
         """
-        if column in self.df.columns:
+        def eager(df: pd.DataFrame) -> pd.DataFrame:
             if exclude:
-                self.df = self.df[~self.df[column].isin(values)]
-            else:
-                self.df = self.df[self.df[column].isin(values)]
+                return df[~df[column].isin(values)]
+            return df[df[column].isin(values)]
+
+        if column in self._columns():
+            self._filter_rows("valores", (values, exclude), [column], eager)
+
+        return self
+
+    def drop_rows_containing(
+        self,
+        pattern: str,
+        columns: Optional[List[str]] = None,
+        case: bool = False,
+        regex: bool = False,
+        last_rows: Optional[int] = LINHAS_RODAPE,
+    ) -> "Tabela":
+        """
+        Remove linhas em que alguma célula contém o texto (ex.: rodapé
+        "Filtros aplicados:" dos exports do Hub XP).
+
+        A busca é feita coluna a coluna com operações vetorizadas; cada
+        célula é comparada como texto (vazios viram "nan"). Por padrão só
+        as últimas LINHAS_RODAPE linhas são examinadas, já que é lá que
+        ficam os rodapés; se a primeira delas também casar, o rodapé pode
+        ser maior que a janela e a busca passa para a tabela inteira.
+
+        Args:
+            pattern: Texto (ou regex, se regex=True) a procurar
+            columns: Colunas onde procurar (None = todas)
+            case: Diferencia maiúsculas de minúsculas
+            regex: Interpreta pattern como expressão regular
+            last_rows: Linhas finais examinadas primeiro (None = tabela
+                       inteira desde o início)
+
+        Returns:
+            Self para permitir method chaining
+        """
+        df = self.df
+        columns = [col for col in (columns or df.columns) if col in df.columns]
+
+        def procurar(inicio: int) -> np.ndarray:
+            alvo = df.iloc[inicio:]
+            encontrado = np.zeros(len(alvo), dtype=bool)
+            for column in columns:
+                encontrado |= (
+                    alvo[column].astype(str).str.contains(pattern, case=case, regex=regex).to_numpy()
+                )
+            return encontrado
+
+        inicio = 0 if last_rows is None else max(len(df) - last_rows, 0)
+        encontrado = procurar(inicio)
+        if inicio > 0 and encontrado[:1].any():
+            inicio = 0
+            encontrado = procurar(inicio)
+
+        if encontrado.any():
+            manter = np.ones(len(df), dtype=bool)
+            manter[inicio:] = ~encontrado
+            self.df = df[manter]
 
         return self
 
@@ -420,9 +864,8 @@ class Tabela:
         Raises:
             ValidationError: Se alguma coluna obrigatória estiver ausente
         """
-        missing_columns = [
-            col for col in required_columns if col not in self.df.columns
-        ]
+        columns = self._columns()
+        missing_columns = [col for col in required_columns if col not in columns]
 
         if missing_columns:
             raise ValidationError(
@@ -431,21 +874,82 @@ class Tabela:
                 failed_rules=missing_columns,
                 context={
                     "missing_columns": missing_columns,
-                    "available_columns": list(self.df.columns),
+                    "available_columns": columns,
                     "required_columns": required_columns,
                 },
             )
 
         return self
 
+    def compact_dtypes(
+        self, max_category_ratio: float = PROPORCAO_MAXIMA_CATEGORIA
+    ) -> "Tabela":
+        """
+        Reduz a memória do DataFrame antes da carga.
+
+        - texto com poucos valores distintos (tipo_movimentacao, segmento,
+          cod_aai, ano_mes...) vira category
+        - inteiros vão para o menor tipo que comporta os valores
+        - float64 vira float32 só quando todos os valores são exatamente
+          representáveis (nenhum valor enviado ao banco muda)
+
+        Os valores lidos por itertuples (usado na inserção) continuam os
+        mesmos; vazios de colunas category passam a ser NaN em vez de None.
+
+        Args:
+            max_category_ratio: Máximo de valores distintos / linhas para
+                                converter texto em category
+
+        Returns:
+            Self para permitir method chaining
+        """
+        colunas = {}
+        bytes_antes = bytes_depois = 0
+
+        for column in self.df.columns:
+            serie = self.df[column]
+            compacta = self._compact_series(serie, max_category_ratio)
+            if compacta is None:
+                continue
+
+            antes = serie.memory_usage(deep=True, index=False)
+            depois = compacta.memory_usage(deep=True, index=False)
+            if depois >= antes:
+                continue
+
+            self.df[column] = compacta
+            colunas[column] = f"{serie.dtype} -> {compacta.dtype}"
+            bytes_antes += antes
+            bytes_depois += depois
+
+        self.compaction = {
+            "columns": colunas,
+            "bytes_before": int(bytes_antes),
+            "bytes_after": int(bytes_depois),
+            "bytes_saved": int(bytes_antes - bytes_depois),
+        }
+
+        if colunas:
+            print(
+                f"   🗜️ Tipos compactados em {len(colunas)} colunas: "
+                f"{bytes_antes / 1024**2:.1f} MB -> {bytes_depois / 1024**2:.1f} MB"
+            )
+
+        return self
+
     def get_data(self) -> pd.DataFrame:
         """
         Retorna o DataFrame atual.
 
+        Com copy-on-write é uma cópia rasa: nenhum dado é copiado e o que
+        quem recebeu escrever nela não chega à Tabela (sem copy-on-write,
+        cópia completa). Os hooks de carga são chamados por
+        utils.helpers.chamar_hook, que avisa se alteraram o que receberam.
+
         Returns:
             DataFrame processado
         """
-        return self.df.copy()
+        return self.df.copy(deep=not copy_on_write_ativo())
 
     def save_csv(self, file_path: str, **kwargs) -> "Tabela":
         """
@@ -487,6 +991,10 @@ class Tabela:
             "original_columns": self.original_columns,
             "null_counts": self.df.isnull().sum().to_dict(),
             "dtypes": self.df.dtypes.to_dict(),
+            "memory_bytes": int(self.df.memory_usage(deep=True).sum()),
+            "compaction": self.compaction,
+            "decimal_overflow": self.decimal_overflow,
+            "schema_coercion": self.schema_coercion,
         }
 
     # Métodos auxiliares privados
@@ -496,15 +1004,29 @@ class Tabela:
             return None
 
         try:
-            return (
-                unicodedata.normalize("NFKD", str(texto).lower())
-                .encode("ASCII", "ignore")
-                .decode("utf-8")
-                .strip()
-            )
+            return _normalizar_texto(str(texto))
         except:
             return None
 
+    def _normalize_text_series(self, serie: pd.Series) -> pd.Series:
+        """
+        Equivalente vetorizado de serie.apply(self._normalize_text).
+
+        Colunas como segmento, sexo e profissao repetem poucos valores em
+        muitas linhas: cada valor distinto é normalizado uma vez (e fica no
+        cache de _normalizar_texto para as próximas colunas e arquivos).
+        """
+        distintos = self._distinct_strings(serie)
+        if distintos is None:
+            return serie.apply(self._normalize_text)
+        nulo, codigos, unicos = distintos
+
+        normalizados = np.array([_normalizar_texto(u) for u in unicos], dtype=object)
+
+        saida = np.full(len(serie), None, dtype=object)
+        saida[~nulo] = normalizados[codigos]
+        return pd.Series(saida, index=serie.index, name=serie.name, dtype=object)
+
     def _format_date_br(self, data: Any) -> Optional[datetime]:
         """Converte data para formato datetime, considerando formato brasileiro (DD/MM/YYYY)."""
         if pd.isna(data) or str(data).strip() == "":
@@ -527,18 +1049,7 @@ class Tabela:
 
         data_str = str(data).strip()
 
-        # Lista de formatos para tentar
-        formatos = [
-            "%d/%m/%Y",  # 31/12/2024
-            "%d-%m-%Y",  # 31-12-2024
-            "%d.%m.%Y",  # 31.12.2024
-            "%d/%m/%Y %H:%M:%S",  # 31/12/2024 14:30:00
-            "%d/%m/%Y %H:%M",  # 31/12/2024 14:30
-            "%Y-%m-%d",  # 2024-12-31 (ISO)
-            "%Y-%m-%d %H:%M:%S",  # 2024-12-31 14:30:00
-        ]
-
-        for fmt in formatos:
+        for fmt in FORMATOS_DATA_BR:
             try:
                 return pd.to_datetime(data_str, format=fmt)
             except:
@@ -550,6 +1061,85 @@ class Tabela:
         except:
             return None
 
+    def _parse_date_series(self, serie: pd.Series) -> pd.Series:
+        """
+        Equivalente vetorizado de serie.apply(self._format_date_br_robust).
+
+        Cada valor distinto é convertido uma única vez. O formato mais
+        frequente numa amostra é aplicado primeiro à coluna inteira e os
+        demais formatos só ao que sobrou. Como os formatos de
+        FORMATOS_DATA_BR são mutuamente exclusivos (match exato), a ordem
+        não altera o resultado. O parser genérico (dayfirst) só vê os
+        valores que nenhum formato reconheceu.
+
+        Returns:
+            Série datetime64 (NaT onde não converteu), ou object com None
+            se a coluna inteira está vazia - igual ao apply por célula
+        """
+        if serie.empty:
+            return serie.apply(self._format_date_br_robust)
+
+        valores = serie.to_numpy(dtype=object)
+        vazio = pd.isna(valores)
+        texto = pd.Series(valores[~vazio], dtype=object).astype(str).str.strip()
+        vazio[~vazio] = (texto == "").to_numpy()
+
+        if vazio.all():
+            return pd.Series([None] * len(serie), index=serie.index, name=serie.name, dtype=object)
+
+        originais = valores[~vazio]
+        codigos, distintos = pd.factorize(texto[texto != ""].to_numpy(dtype=object))
+
+        convertidos = np.full(len(distintos), np.datetime64("NaT"), dtype="datetime64[ns]")
+        pendentes = np.ones(len(distintos), dtype=bool)
+
+        for fmt in self._ordenar_formatos_data(distintos[:AMOSTRA_INFERENCIA_DATA]):
+            if not pendentes.any():
+                break
+            indices = np.flatnonzero(pendentes)
+            resultado = pd.to_datetime(
+                pd.Series(distintos[indices], dtype=object), format=fmt, errors="coerce"
+            ).to_numpy(dtype="datetime64[ns]")
+            ok = ~np.isnat(resultado)
+            convertidos[indices[ok]] = resultado[ok]
+            pendentes[indices[ok]] = False
+
+        datas = convertidos[codigos]
+
+        # Fallback por célula (com o valor original) só para o que sobrou
+        restantes = np.flatnonzero(pendentes[codigos])
+        if len(restantes):
+            cache = {}
+            for i in restantes:
+                original = originais[i]
+                chave = (type(original), original)
+                if chave not in cache:
+                    cache[chave] = self._format_date_br_robust(original)
+                data = cache[chave]
+                if data is None or pd.isna(data):
+                    continue
+                if not isinstance(data, pd.Timestamp) or data.tzinfo is not None:
+                    # Resultado fora do padrão (ex.: com fuso): mantém o caminho por célula
+                    return serie.apply(self._format_date_br_robust)
+                datas[i] = data.to_datetime64()
+
+        saida = np.full(len(serie), np.datetime64("NaT"), dtype="datetime64[ns]")
+        saida[~vazio] = datas
+        return pd.Series(saida, index=serie.index, name=serie.name)
+
+    @staticmethod
+    def _ordenar_formatos_data(amostra: np.ndarray) -> List[str]:
+        """Ordena FORMATOS_DATA_BR pelo número de acertos na amostra."""
+        if len(amostra) == 0:
+            return list(FORMATOS_DATA_BR)
+
+        amostra_serie = pd.Series(amostra, dtype=object)
+        acertos = {
+            fmt: pd.to_datetime(amostra_serie, format=fmt, errors="coerce").notna().sum()
+            for fmt in FORMATOS_DATA_BR
+        }
+        return sorted(FORMATOS_DATA_BR, key=lambda fmt: -acertos[fmt])
+
     def _format_numeric(self, valor: Any) -> Optional[float]:
         """Converte valor para float, tratando separadores decimais brasileiros."""
         if pd.isna(valor) or str(valor).strip() == "":
@@ -561,6 +1151,273 @@ class Tabela:
         except:
             return None
 
+    def _parse_numeric_series(self, serie: pd.Series) -> pd.Series:
+        """
+        Equivalente vetorizado de serie.apply(self._format_numeric).
+
+        Cada valor distinto é convertido uma única vez. Quando todos os
+        distintos são números simples ("1234.56" ou "1234,56"), a conversão
+        é um único astype(float) - mesmo parser do float(). Caso contrário
+        (vazios, lixo, etc.) os distintos passam por _format_numeric.
+
+        Returns:
+            Série float64 (NaN onde não converteu), ou object com None se
+            nenhum valor da coluna converteu - igual ao apply por célula
+        """
+        distintos = self._distinct_strings(serie)
+        if distintos is None:
+            return serie.apply(self._format_numeric)
+        nulo, codigos, unicos = distintos
+
+        try:
+            numeros = np.array([u.replace(",", ".") for u in unicos], dtype=object).astype(float)
+            algum_valido = len(unicos) > 0
+        except ValueError:
+            convertidos = [self._format_numeric(u) for u in unicos]
+            numeros = np.array([np.nan if v is None else v for v in convertidos], dtype=float)
+            algum_valido = any(v is not None for v in convertidos)
+
+        if not algum_valido:
+            return pd.Series([None] * len(serie), index=serie.index, name=serie.name, dtype=object)
+
+        saida = np.full(len(serie), np.nan)
+        saida[~nulo] = numeros[codigos]
+        return pd.Series(saida, index=serie.index, name=serie.name)
+
+    def _numeric_values(self, serie: pd.Series) -> pd.Series:
+        """Série numérica como está; texto passa por _parse_numeric_series."""
+        if pd.api.types.is_numeric_dtype(serie):
+            return serie
+        return pd.to_numeric(self._parse_numeric_series(serie), errors="coerce")
+
+    def _decimal_guard(
+        self, column: Any, precision: int, scale: int, parse, relatorio: Optional[Dict] = None
+    ):
+        """
+        Função Series -> Series que converte com parse, arredonda para
+        scale casas e anula o que não cabe em DECIMAL(precision, scale),
+        registrando as ocorrências em relatorio[column] (padrão:
+        self.decimal_overflow). Não imprime nada: o relatório é de quem chama.
+        """
+        limite = 10.0 ** (precision - scale)
+        if relatorio is None:
+            relatorio = self.decimal_overflow
+
+        def converter(serie: pd.Series) -> pd.Series:
+            valores = np.round(pd.to_numeric(parse(serie), errors="coerce").to_numpy(dtype=float), scale)
+            overflow = np.abs(valores) >= limite
+            quantidade = int(overflow.sum())
+
+            relatorio[column] = {
+                "overflow": quantidade,
+                "examples": valores[overflow][:3].tolist(),
+            }
+            if quantidade:
+                valores[overflow] = np.nan
+
+            return pd.Series(valores, index=serie.index, name=serie.name)
+
+        return converter
+
+    def _schema_converter(self, column: Any, tipo: Dict[str, Any]):
+        """
+        Função Series -> Series que leva a coluna ao tipo SQL de destino
+        (None se o tipo não é tratado). Ver coerce_to_schema.
+        """
+        data_type = str(tipo.get("data_type", "")).lower()
+        relatorio = self.schema_coercion
+        numeros = self._numeric_values
+
+        def registrar(overflow: np.ndarray, valores: np.ndarray) -> None:
+            quantidade = int(overflow.sum())
+            relatorio[column] = {
+                "sql_type": data_type,
+                "overflow": quantidade,
+                "examples": valores[overflow][:3].tolist(),
+            }
+            if quantidade:
+                print(f"   ⚠️ Coluna '{column}': {quantidade} valores não cabem em {data_type} e viraram NULL")
+
+        if data_type in TIPOS_SQL_DECIMAL:
+            guarda = self._decimal_guard(
+                column, int(tipo["precision"]), int(tipo["scale"] or 0), numeros, relatorio
+            )
+
+            def decimais(serie: pd.Series) -> pd.Series:
+                saida = guarda(serie)
+                relatorio[column]["sql_type"] = data_type
+                if relatorio[column]["overflow"]:
+                    print(
+                        f"   ⚠️ Coluna '{column}': {relatorio[column]['overflow']} valores "
+                        f"não cabem em {data_type} e viraram NULL"
+                    )
+                return saida
+
+            return decimais
+
+        if data_type in TIPOS_SQL_FLOAT:
+            return lambda serie: numeros(serie).astype(float)
+
+        if data_type in LIMITES_SQL_INTEIRO:
+            minimo, maximo = LIMITES_SQL_INTEIRO[data_type]
+
+            def inteiros(serie: pd.Series) -> pd.Series:
+                if serie.dtype.kind in "iu" and data_type != "bit":
+                    # Já inteiro sem nulos: só confere a faixa (sem passar por float)
+                    if serie.empty or (serie.min() >= minimo and serie.max() <= maximo):
+                        relatorio[column] = {"sql_type": data_type, "overflow": 0, "examples": []}
+                        return serie.astype(np.int64)
+
+                if data_type == "bit" and not pd.api.types.is_numeric_dtype(serie):
+                    serie = serie.apply(self._convert_boolean)
+                valores = numeros(serie)
+                if data_type == "bit":
+                    valores = (valores != 0).astype(float).where(valores.notna())
+                # Mesmo truncamento que o SQL Server aplica a float -> int
+                valores = np.trunc(valores.to_numpy(dtype=float))
+
+                overflow = (valores < minimo) | (valores > maximo)
+                registrar(overflow, valores)
+                valores[overflow] = np.nan
+
+                nulos = np.isnan(valores)
+                if not nulos.any():
+                    return pd.Series(valores.astype(np.int64), index=serie.index, name=serie.name)
+                # pyodbc não aceita numpy.int64 nem pd.NA: int do Python e None
+                saida = np.full(len(valores), None, dtype=object)
+                saida[~nulos] = valores[~nulos].astype(np.int64).tolist()
+                return pd.Series(saida, index=serie.index, name=serie.name, dtype=object)
+
+            return inteiros
+
+        if data_type in TIPOS_SQL_DATA:
+
+            def datas(serie: pd.Series) -> pd.Series:
+                if pd.api.types.is_datetime64_any_dtype(serie):
+                    return serie
+                preenchidos = serie.dropna()
+                if pd.api.types.infer_dtype(preenchidos, skipna=True) in ("date", "datetime", "empty"):
+                    return serie
+                return self._parse_date_series(serie)
+
+            return datas
+
+        if data_type in TIPOS_SQL_TEXTO:
+            tamanho = tipo.get("max_length")
+            # -1 = varchar(max)
+            tamanho = int(tamanho) if tamanho is not None and int(tamanho) > 0 else None
+
+            def textos(serie: pd.Series) -> pd.Series:
+                valores = serie.to_numpy(dtype=object, copy=True)
+                preenchido = ~pd.isna(valores)
+                if pd.api.types.infer_dtype(valores[preenchido], skipna=False) not in ("string", "empty"):
+                    # 12.0 -> "12", como o SQL Server converteria o número
+                    valores[preenchido] = [
+                        str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)
+                        for v in valores[preenchido]
+                    ]
+                valores[~preenchido] = None
+
+                overflow = np.zeros(len(valores), dtype=bool)
+                if tamanho is not None:
+                    overflow[preenchido] = pd.Series(valores[preenchido]).str.len().to_numpy() > tamanho
+                registrar(overflow, valores)
+                valores[overflow] = None
+
+                return pd.Series(valores, index=serie.index, name=serie.name, dtype=object)
+
+            return textos
+
+        return None
+
+    def _parse_monetary_series(self, serie: pd.Series) -> pd.Series:
+        """
+        Equivalente vetorizado de serie.apply(self._clean_monetary_value).
+
+        Cada valor distinto é convertido uma única vez; colunas monetárias
+        repetem muito (zeros, valores redondos).
+
+        Returns:
+            Série float64 (0.0 para nulos e valores inválidos)
+        """
+        distintos = self._distinct_strings(serie)
+        if distintos is None:
+            return serie.apply(self._clean_monetary_value)
+        nulo, codigos, unicos = distintos
+
+        # Mesma limpeza de _clean_monetary_value com métodos de str: remove
+        # "R$", depois espaços (split() usa os mesmos brancos Unicode do \s)
+        # e o "-"; a ordem não altera o resultado do re.sub original
+        limpos = [u.strip() for u in unicos]
+        negativo = np.array(["-" in u for u in limpos], dtype=bool)
+        limpos = [
+            "".join(u.replace("R$", "").split()).replace("-", "").replace(".", "").replace(",", ".")
+            for u in limpos
+        ]
+
+        try:
+            numeros = np.array(limpos, dtype=object).astype(float)
+            numeros = np.where(negativo, -numeros, numeros)
+        except ValueError:
+            numeros = np.array([self._clean_monetary_value(u) for u in unicos], dtype=float)
+
+        saida = np.zeros(len(serie))
+        saida[~nulo] = numeros[codigos]
+        return pd.Series(saida, index=serie.index, name=serie.name)
+
+    @staticmethod
+    def _compact_series(serie: pd.Series, max_category_ratio: float) -> Optional[pd.Series]:
+        """Versão compacta de uma coluna, ou None se não há o que reduzir."""
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            compacta = pd.to_numeric(serie, downcast="integer")
+            return compacta if compacta.dtype != serie.dtype else None
+
+        if serie.dtype == np.float64:
+            valores = serie.to_numpy()
+            reduzidos = valores.astype(np.float32)
+            # NaN != NaN: compara só os preenchidos
+            exatos = (reduzidos.astype(np.float64) == valores) | np.isnan(valores)
+            if len(valores) and exatos.all():
+                return pd.Series(reduzidos, index=serie.index, name=serie.name)
+            return None
+
+        if serie.dtype == object and len(serie):
+            if pd.api.types.infer_dtype(serie, skipna=True) != "string":
+                return None
+            codes, uniques = pd.factorize(serie)
+            if len(uniques) > max_category_ratio * len(serie):
+                return None
+            categorias = pd.Categorical.from_codes(codes, categories=uniques)
+            return pd.Series(categorias, index=serie.index, name=serie.name)
+
+        return None
+
+    @staticmethod
+    def _distinct_strings(serie: pd.Series) -> Optional[tuple]:
+        """
+        Fatora uma coluna de texto em valores distintos.
+
+        Só vale para colunas cujos valores não nulos são todos str (o caso
+        do read_excel com dtype=str); com tipos misturados, 1, 1.0 e True
+        cairiam no mesmo código e o str() de cada um seria perdido.
+
+        Returns:
+            (máscara de nulos, códigos dos não nulos, distintos), ou None
+            se a coluna não é só texto
+        """
+        if serie.empty:
+            return None
+
+        valores = serie.to_numpy(dtype=object)
+        nulo = pd.isna(valores)
+        preenchidos = valores[~nulo]
+
+        if pd.api.types.infer_dtype(preenchidos, skipna=False) not in ("string", "empty"):
+            return None
+
+        codigos, unicos = pd.factorize(preenchidos)
+        return nulo, codigos, unicos
+
     def _convert_boolean(self, valor: Any) -> int:
         """Converte valor para booleano numérico (0 ou 1)."""
         if isinstance(valor, str):
@@ -579,8 +1436,6 @@ class Tabela:
         negativo = "-" in valor_str
 
         # Remove R$, espaços e o próprio símbolo de negativo
-        import re
-
         valor_str = re.sub(r"R\$|\s|-", "", valor_str)
 
         # Substituição de separadores brasileiros (1.234,56 → 1234.56)
@@ -779,9 +1634,9 @@ class Tabela:
             
             else:
                 # Lógica original para colunas DATE/DATETIME
-                # Converter para datetime se necessário
+                # Converter para datetime se necessário (sem alterar o df recebido)
                 try:
-                    df[date_column] = pd.to_datetime(df[date_column])
+                    datas = pd.to_datetime(df[date_column])
                 except Exception as e:
                     print(f"⚠️ Erro ao converter coluna {date_column}: {str(e)}")
                     return {
@@ -790,7 +1645,7 @@ class Tabela:
                     }
 
                 # Extrair ano/mês únicos
-                periodos = df[date_column].dt.to_period("M").unique()
+                periodos = datas.dt.to_period("M").unique()
 
                 if len(periodos) == 0:
                     return {"status": "skipped", "reason": "no periods found"}
@@ -857,3 +1712,157 @@ class Tabela:
             print(f"❌ Erro na limpeza pós-carga: {str(e)}")
             # Não propagar erro - a inserção já foi feita com sucesso
             return {"status": "error", "error": str(e)}
+
+
+class TabelaStream:
+    """
+    Tabela em blocos de linhas, para arquivos maiores que a memória.
+
+    O Excel é lido em blocos (openpyxl read_only) e cada bloco passa pela
+    mesma cadeia de transformações, como uma Tabela própria. Os blocos
+    prontos são entregues um a um (iter_chunks) ao loader, então a memória
+    não cresce com o tamanho do arquivo.
+
+    Passos:
+        - pipe(func): func(Tabela) -> Tabela aplicada a cada bloco; só pode
+          usar operações linha a linha (renomear, converter, filtrar...)
+        - remove_last_rows(n): remove as n últimas linhas do arquivo todo
+          (rodapé), segurando n linhas entre um bloco e o próximo
+
+    Passos que dependem da coluna inteira (ex.: remove_empty_columns)
+    não devem ser usados dentro de pipe.
+
+    Exemplo:
+        stream = (
+            TabelaStream(file_path)
+            .pipe(remover_filtros_aplicados)
+            .remove_last_rows(2)
+            .pipe(transformar)
+        )
+        for chunk in stream.iter_chunks():
+            ...
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        chunk_size: int = LINHAS_POR_CHUNK,
+        skiprows: Optional[int] = None,
+        usecols: Optional[Iterable[str]] = None,
+        buffer: Optional[IO[bytes]] = None,
+    ):
+        """
+        Args:
+            file_path: Caminho do arquivo Excel (ou nome lógico, com buffer)
+            chunk_size: Linhas lidas por bloco
+            skiprows: Linhas a pular antes do cabeçalho
+            usecols: Colunas do Excel a carregar (None = todas)
+            buffer: Conteúdo do Excel em memória; fica com a stream até a
+                    leitura (carga) e é fechado por quem o criou
+        """
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.skiprows = skiprows
+        self.usecols = list(usecols) if usecols is not None else None
+        self._source = Tabela.resolve_source(file_path, buffer)
+        self._passos: List[tuple] = []
+
+    def pipe(self, func) -> "TabelaStream":
+        """
+        Adiciona uma transformação aplicada a cada bloco.
+
+        Args:
+            func: Função Tabela -> Tabela (linha a linha)
+
+        Returns:
+            Self para permitir method chaining
+        """
+        self._passos.append(("bloco", func))
+        return self
+
+    def remove_last_rows(self, num_rows: int) -> "TabelaStream":
+        """
+        Remove as últimas N linhas do arquivo (ex.: rodapé).
+
+        Args:
+            num_rows: Número de linhas a remover do final
+
+        Returns:
+            Self para permitir method chaining
+        """
+        self._passos.append(("ultimas_linhas", num_rows))
+        return self
+
+    def iter_chunks(self) -> Iterable[pd.DataFrame]:
+        """
+        Lê e transforma o arquivo bloco a bloco.
+
+        Returns:
+            Iterador de DataFrames processados (blocos vazios são omitidos)
+        """
+        for chunk in self._processar():
+            if len(chunk):
+                yield chunk
+
+    def get_data(self) -> pd.DataFrame:
+        """
+        Retorna o arquivo todo processado num único DataFrame.
+
+        Mesmos valores da Tabela com a mesma cadeia (o dtype de uma coluna
+        pode virar object se algum bloco não tiver valores convertidos), mas
+        ocupa a memória do arquivo inteiro; na carga prefira iter_chunks().
+
+        Returns:
+            DataFrame processado
+        """
+        chunks = list(self._processar())
+        vazios = [chunk for chunk in chunks if not len(chunk)]
+        chunks = [chunk for chunk in chunks if len(chunk)] or vazios[:1]
+        return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+    def _processar(self) -> Iterable[pd.DataFrame]:
+        """Encadeia leitura e passos; o primeiro bloco pode vir vazio."""
+        if hasattr(self._source, "seek"):
+            self._source.seek(0)
+
+        chunks = iter_excel_chunks_as_text(
+            self._source,
+            self.chunk_size,
+            skiprows=self.skiprows,
+            usecols=columns_filter(self.usecols),
+        )
+        for tipo, arg in self._passos:
+            if tipo == "bloco":
+                chunks = self._aplicar(chunks, arg)
+            else:
+                chunks = self._reter_ultimas(chunks, arg)
+        return chunks
+
+    def _aplicar(self, chunks: Iterable[pd.DataFrame], func) -> Iterable[pd.DataFrame]:
+        """Aplica func a cada bloco como uma Tabela do mesmo arquivo."""
+        for chunk in chunks:
+            yield func(Tabela(self.file_path, dataframe=chunk)).df
+
+    @staticmethod
+    def _reter_ultimas(chunks: Iterable[pd.DataFrame], num_rows: int) -> Iterable[pd.DataFrame]:
+        """Remove as últimas num_rows linhas do conjunto de blocos."""
+        if num_rows <= 0:
+            yield from chunks
+            return
+
+        retidas = None
+        entregou = False
+        for chunk in chunks:
+            if retidas is not None:
+                chunk = pd.concat([retidas, chunk])
+            if len(chunk) > num_rows:
+                yield chunk.iloc[:-num_rows]
+                entregou = True
+                retidas = chunk.iloc[-num_rows:]
+            else:
+                retidas = chunk
+
+        # Como na Tabela: com num_rows linhas ou menos no total, nada é removido
+        if not entregou and retidas is not None:
+            yield retidas
+
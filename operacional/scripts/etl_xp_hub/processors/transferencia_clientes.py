@@ -7,7 +7,7 @@ from processors.tabela import Tabela
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, IO
 
 # Configurações específicas do processador
 NOME_TABELA = "xp_transferencia_clientes"
@@ -24,9 +24,6 @@ COLUMN_MAPPING = {
     "Código do Cliente": "cod_xp",
 }
 
-# Colunas a remover
-COLUMNS_TO_DROP = ["Código Solicitação"]
-
 # Colunas de texto a normalizar
 TEXT_COLUMNS = ["status", "cod_aai_origem", "cod_aai_destino", "cod_xp"]
 
@@ -45,23 +42,19 @@ COLUMN_ORDER = [
 ]
 
 
-def processar_transferencia_clientes(file_path: str) -> Tabela:
+def processar_transferencia_clientes(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de transferência de clientes do Hub XP.
 
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
 
     Returns:
         Objeto Tabela processado
     """
-    # Cria instância da tabela
-    tabela = Tabela(file_path)
-
-    # Remove colunas desnecessárias
-    for col in COLUMNS_TO_DROP:
-        if col in tabela.df.columns:
-            tabela.df = tabela.df.drop(col, axis=1)
+    # Cria instância da tabela carregando só as colunas mapeadas
+    tabela = Tabela(file_path, buffer=buffer, usecols=COLUMN_MAPPING)
 
     # Renomeia colunas conforme mapeamento
     tabela.rename_columns(COLUMN_MAPPING)
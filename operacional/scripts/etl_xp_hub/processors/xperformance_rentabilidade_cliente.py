@@ -7,7 +7,7 @@ from processors.tabela import Tabela
 from config.database_config import LoadStrategy
 from datetime import datetime
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, IO
 
 # Configurações específicas do processador
 NOME_TABELA = "xperformance_rentabilidade_cliente"
@@ -15,7 +15,7 @@ LOAD_STRATEGY = LoadStrategy.APPEND
 BATCH_SIZE = 5000
 
 
-def processar_xperformance_rentabilidade_cliente(file_path: str) -> Tabela:
+def processar_xperformance_rentabilidade_cliente(file_path: str, buffer: Optional[IO[bytes]] = None) -> Tabela:
     """
     Processa arquivo de XPerformance Rentabilidade Cliente.
 
@@ -27,12 +27,13 @@ def processar_xperformance_rentabilidade_cliente(file_path: str) -> Tabela:
 
     Args:
         file_path: Caminho do arquivo Excel
+        buffer: Conteúdo do arquivo em memória (S3_IN_MEMORY)
 
     Returns:
         Objeto Tabela processado
     """
     # Cria instância da tabela
-    tabela = Tabela(file_path)
+    tabela = Tabela(file_path, buffer=buffer)
 
     # Remove linhas completamente vazias (se houver)
     tabela.remove_empty_rows()
@@ -0,0 +1,230 @@
+"""
+Leitura de Excel com engine configurável
+
+Centraliza o pd.read_excel(dtype=str) usado pela Tabela e pelos
+processadores com leitura própria. O engine calamine (python-calamine,
+pandas >= 2.2) é bem mais rápido que o openpyxl nos arquivos grandes do
+Hub XP; quando não está instalado, ou falha num arquivo, a leitura cai
+para o openpyxl.
+
+Para arquivos maiores que a memória, iter_excel_chunks_as_text lê a
+planilha em blocos de linhas (openpyxl read_only) com o mesmo resultado
+do read_excel(dtype=str).
+"""
+
+import importlib.util
+import os
+from typing import IO, Any, Callable, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+ENGINE_AUTO = "auto"
+ENGINE_CALAMINE = "calamine"
+ENGINE_OPENPYXL = "openpyxl"
+
+# Engine padrão quando o processador não define EXCEL_ENGINE
+# ("auto" usa calamine se disponível)
+DEFAULT_ENGINE = os.getenv("EXCEL_ENGINE", ENGINE_OPENPYXL).lower()
+
+_calamine_disponivel: Optional[bool] = None
+
+
+def calamine_available() -> bool:
+    """Indica se o pandas instalado consegue ler com o engine calamine."""
+    global _calamine_disponivel
+    if _calamine_disponivel is None:
+        versao = tuple(int(p) for p in pd.__version__.split(".")[:2])
+        _calamine_disponivel = (
+            versao >= (2, 2) and importlib.util.find_spec("python_calamine") is not None
+        )
+    return _calamine_disponivel
+
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    """
+    Resolve o engine efetivo.
+
+    Args:
+        engine: "auto", "calamine", "openpyxl" ou None (usa EXCEL_ENGINE)
+
+    Returns:
+        "calamine" ou "openpyxl"
+    """
+    engine = (engine or DEFAULT_ENGINE).lower()
+
+    if engine not in (ENGINE_AUTO, ENGINE_CALAMINE, ENGINE_OPENPYXL):
+        raise ValueError(f"Unknown Excel engine: {engine}")
+
+    if engine == ENGINE_OPENPYXL:
+        return ENGINE_OPENPYXL
+    return ENGINE_CALAMINE if calamine_available() else ENGINE_OPENPYXL
+
+
+def columns_filter(columns: Optional[Iterable[str]]) -> Optional[Callable[[Any], bool]]:
+    """
+    Monta o usecols que projeta a leitura nas colunas informadas.
+
+    Ao contrário de uma lista, o filtro não falha quando uma coluna não
+    existe no arquivo; a ausência fica para validate_required_columns.
+    Duplicadas são vistas já renomeadas pelo pandas ("Coluna.1").
+
+    Args:
+        columns: Nomes de colunas do Excel (ex.: chaves de COLUMN_MAPPING)
+
+    Returns:
+        Callable para usecols, ou None para ler todas as colunas
+    """
+    if columns is None:
+        return None
+    wanted = frozenset(columns)
+    return lambda column: column in wanted
+
+
+def read_excel_as_text(
+    source: Union[str, IO[bytes]],
+    engine: Optional[str] = None,
+    skiprows: Optional[int] = None,
+    usecols: Any = None,
+) -> pd.DataFrame:
+    """
+    Lê a primeira planilha com todas as colunas como texto (dtype=str).
+
+    Args:
+        source: Caminho ou buffer binário do arquivo
+        engine: Engine preferido (ver resolve_engine)
+        skiprows: Linhas a pular antes do cabeçalho
+        usecols: Subconjunto de colunas (mesmo formato do pd.read_excel)
+
+    Returns:
+        DataFrame com os valores como string
+    """
+    kwargs = {"dtype": str, "skiprows": skiprows, "usecols": usecols}
+
+    if resolve_engine(engine) == ENGINE_CALAMINE:
+        try:
+            return pd.read_excel(source, engine=ENGINE_CALAMINE, **kwargs)
+        except FileNotFoundError:
+            raise
+        except Exception:
+            # Conteúdo que o calamine não lê: tenta de novo com openpyxl
+            if hasattr(source, "seek"):
+                source.seek(0)
+
+    return pd.read_excel(source, engine=ENGINE_OPENPYXL, **kwargs)
+
+
+def _converter_celula(cell) -> Any:
+    """Mesmo tratamento de célula do leitor openpyxl do pandas."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == "e":
+        return float("nan")
+    if cell.data_type == "n":
+        inteiro = int(cell.value)
+        return inteiro if inteiro == cell.value else float(cell.value)
+    return cell.value
+
+
+def iter_excel_chunks_as_text(
+    source: Union[str, IO[bytes]],
+    chunk_size: int,
+    skiprows: Optional[int] = None,
+    usecols: Any = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê a primeira planilha em blocos de até chunk_size linhas, como texto.
+
+    A concatenação dos blocos é igual a read_excel_as_text(engine="openpyxl"),
+    inclusive o índice. Só as linhas do bloco atual ficam em memória; linhas
+    vazias no fim da planilha são descartadas, como no pandas.
+
+    Sempre gera ao menos um bloco (vazio, se a planilha não tiver linhas),
+    para que o chamador conheça as colunas.
+
+    Args:
+        source: Caminho ou buffer binário do arquivo
+        chunk_size: Máximo de linhas por bloco
+        skiprows: Linhas a pular antes do cabeçalho
+        usecols: Subconjunto de colunas (mesmo formato do pd.read_excel)
+
+    Returns:
+        Iterador de DataFrames com os valores como string
+
+    Raises:
+        ValueError: Se uma linha tiver dados além da largura do cabeçalho
+                    e do primeiro bloco (no pandas viraria coluna "Unnamed")
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+        linhas = sheet.rows
+        for _ in range(skiprows or 0):
+            next(linhas, None)
+
+        cabecalho: Optional[List[Any]] = None
+        largura = 0
+        bloco: List[List[Any]] = []
+        vazias: List[List[Any]] = []  # só entram no bloco se vier linha com dados
+        inicio = 0
+
+        def montar(dados: List[List[Any]]) -> pd.DataFrame:
+            linhas_completas = [linha + [""] * (largura - len(linha)) for linha in dados]
+            parser = TextParser(
+                [cabecalho + [""] * (largura - len(cabecalho))] + linhas_completas,
+                header=0,
+                dtype=str,
+                skip_blank_lines=False,
+                usecols=usecols,
+            )
+            df = parser.read()
+            df.index = pd.RangeIndex(inicio, inicio + len(df))
+            return df
+
+        for row in linhas:
+            convertida = [_converter_celula(cell) for cell in row]
+            while convertida and convertida[-1] == "":
+                convertida.pop()
+
+            if cabecalho is None:
+                cabecalho = convertida
+                largura = len(cabecalho)
+                continue
+
+            if not convertida:
+                vazias.append(convertida)
+                continue
+
+            bloco.extend(vazias)
+            vazias = []
+            bloco.append(convertida)
+
+            if len(bloco) >= chunk_size:
+                if inicio == 0:
+                    largura = max([largura] + [len(linha) for linha in bloco])
+                elif any(len(linha) > largura for linha in bloco):
+                    raise ValueError(
+                        f"Row wider than the first {chunk_size} rows found after row {inicio}"
+                    )
+                yield montar(bloco)
+                inicio += len(bloco)
+                bloco = []
+
+        if cabecalho is None:
+            yield pd.DataFrame()
+            return
+
+        if inicio == 0:
+            largura = max([largura] + [len(linha) for linha in bloco])
+        elif any(len(linha) > largura for linha in bloco):
+            raise ValueError(
+                f"Row wider than the first {chunk_size} rows found after row {inicio}"
+            )
+        if bloco or inicio == 0:
+            yield montar(bloco)
+
+    finally:
+        workbook.close()
@@ -5,25 +5,56 @@ Este módulo contém funções utilitárias que seguem o princípio de
 responsabilidade única e podem ser reutilizadas por diferentes processadores.
 """
 
-from processors.tabela import Tabela
-from loaders.sql_server_loader import SQLServerLoader
+from processors.tabela import Tabela, TabelaStream, copy_on_write_ativo
+from loaders.sql_server_loader import SQLServerLoader, get_engine
 from config.database_config import get_database_config, TableConfig, LoadStrategy
 from datetime import datetime
 import os
 
 
-def inserir_tabela_no_banco(tabela: Tabela, nome_tabela: str, load_strategy: LoadStrategy = LoadStrategy.TRUNCATE_LOAD, batch_size: int = 5000, pre_load_func=None) -> dict:
+def chamar_hook(func, df, *args, nome: str = "hook"):
+    """
+    Chama um hook de carga (PRE_LOAD_FUNCTION, POST_LOAD_FUNCTION) com uma
+    cópia de df.
+
+    Hooks não devem alterar o DataFrame que recebem (o de pré-carga devolve
+    um novo). A cópia é rasa com copy-on-write (main.py liga a opção) e
+    completa sem ele (processadores rodados direto, scripts executar_*),
+    já que uma cópia rasa sem copy-on-write divide os dados com df. Nos
+    dois casos a escrita do hook não chega a df e é detectada comparando
+    a cópia entregue ao hook com df depois da chamada.
+
+    Args:
+        func: Hook a chamar como func(cópia de df, *args)
+        df: DataFrame da carga
+        nome: Nome do hook nas mensagens
+
+    Returns:
+        O retorno do hook
+    """
+    entrada = df.copy(deep=not copy_on_write_ativo())
+    resultado = func(entrada, *args)
+    if not entrada.equals(df) or list(entrada.columns) != list(df.columns):
+        print(f"⚠️ {nome} alterou o DataFrame recebido; a alteração foi descartada (devolva um DataFrame novo)")
+    return resultado
+
+
+def inserir_tabela_no_banco(tabela: Tabela, nome_tabela: str, load_strategy: LoadStrategy = LoadStrategy.TRUNCATE_LOAD, batch_size: int = 5000, pre_load_func=None, commit_every: int = None, atomic: bool = False, primary_key=None) -> dict:
     """
     Insere dados de uma instância Tabela no banco de dados.
     
     Função genérica que pode ser usada por qualquer processador.
     
     Args:
-        tabela: Instância de Tabela processada
+        tabela: Instância de Tabela (ou TabelaStream) processada
         nome_tabela: Nome da tabela no banco (sem schema)
         load_strategy: Estratégia de carregamento
         batch_size: Tamanho do lote para inserção
         pre_load_func: Função opcional para filtrar dados antes da inserção
+                       (numa TabelaStream, aplicada a cada bloco)
+        commit_every: Linhas por transação (None = commit a cada lote)
+        atomic: Arquivo inteiro numa única transação
+        primary_key: Chave do UPSERT (coluna, "a, b" ou lista para chave composta)
         
     Returns:
         Resultado da inserção
@@ -36,19 +67,44 @@ def inserir_tabela_no_banco(tabela: Tabela, nome_tabela: str, load_strategy: Loa
         config = TableConfig(
             name=nome_tabela,
             load_strategy=load_strategy,
-            batch_size=batch_size
+            batch_size=batch_size,
+            commit_every=commit_every,
+            atomic=atomic,
+            primary_key=primary_key,
         )
         db_config.add_table_config(nome_tabela, config)
     
+    # Pré-carga, tipos e carga usam o mesmo pool de conexões (get_engine)
+    loader = SQLServerLoader()
+
+    # Tipos das colunas de destino (consultados uma vez por execução)
+    column_types = loader.get_column_types(nome_tabela)
+
+    # Arquivo em blocos: cada bloco é filtrado e inserido sem juntar os demais
+    if isinstance(tabela, TabelaStream):
+        chunks = tabela.iter_chunks()
+        if pre_load_func is not None:
+            engine = get_engine()
+            full_table_name = db_config.get_full_table_name(nome_tabela)
+            chunks = (
+                chamar_hook(pre_load_func, chunk, full_table_name, engine, nome="PRE_LOAD_FUNCTION")
+                for chunk in chunks
+            )
+        if column_types:
+            chunks = (Tabela(dataframe=chunk).coerce_to_schema(column_types).df for chunk in chunks)
+
+        resultado = loader.load_chunks(chunks, nome_tabela)
+        print(f"✅ Inserido no banco: {resultado['rows_inserted']} linhas")
+        return resultado
+
     # Obtém dados para inserir
     df_to_insert = tabela.get_data()
     
     # Aplica pré-processamento se fornecido
     if pre_load_func is not None:
-        loader = SQLServerLoader()
-        engine = loader._get_engine()
+        engine = get_engine()
         full_table_name = db_config.get_full_table_name(nome_tabela)
-        df_to_insert = pre_load_func(df_to_insert, full_table_name, engine)
+        df_to_insert = chamar_hook(pre_load_func, df_to_insert, full_table_name, engine, nome="PRE_LOAD_FUNCTION")
         
         # Se o DataFrame filtrado estiver vazio, retorna sem inserir
         if len(df_to_insert) == 0:
@@ -58,8 +114,12 @@ def inserir_tabela_no_banco(tabela: Tabela, nome_tabela: str, load_strategy: Loa
                 "reason": "no new records to insert"
             }
     
+    # Converte para os tipos da tabela de destino (depois do pré-processamento,
+    # que pode ter mudado tipos, p.ex. chaves em str)
+    if column_types:
+        df_to_insert = Tabela(dataframe=df_to_insert).coerce_to_schema(column_types).df
+    
     # Insere no banco
-    loader = SQLServerLoader()
     resultado = loader.load_data(df_to_insert, nome_tabela)
     
     print(f"✅ Inserido no banco: {resultado['rows_inserted']} linhas")
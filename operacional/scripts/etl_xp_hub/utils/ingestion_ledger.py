@@ -0,0 +1,177 @@
+"""
+Registro de ingestão - evita recarregar arquivos idênticos
+
+Guarda, por tabela de destino, o ETag do S3 e o hash SHA-256 de cada
+arquivo já carregado. Um reenvio byte a byte idêntico (mesmo nome ou nome
+novo) é reconhecido antes do parse e do insert.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import IO, Any, Dict, Optional, Union
+
+from utils.exceptions import FileManagementError
+
+
+class IngestionLedger:
+    """
+    Registro persistente (arquivo JSON) dos arquivos já ingeridos.
+
+    Estrutura: {tabela: {"etag:<etag>" | "sha256:<hash>": entrada}}, onde a
+    entrada guarda chave S3, linhas inseridas e data da carga.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Inicializa o registro carregando o arquivo, se existir.
+
+        Args:
+            path: Caminho do JSON (padrão: ETL_LEDGER_PATH ou ./state/ingestion_ledger.json)
+        """
+        self.path = path or os.getenv("ETL_LEDGER_PATH", "./state/ingestion_ledger.json")
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Lê o registro do disco (vazio se ainda não existe)."""
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            raise FileManagementError(
+                f"Failed to read ingestion ledger: {self.path}",
+                file_path=self.path,
+                operation="read",
+                original_exception=e,
+            )
+
+    def _save(self):
+        """Grava o registro de forma atômica (arquivo temporário + rename)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise FileManagementError(
+                f"Failed to write ingestion ledger: {self.path}",
+                file_path=self.path,
+                operation="write",
+                original_exception=e,
+            )
+
+    @staticmethod
+    def compute_hash(source: Union[str, IO[bytes]]) -> str:
+        """
+        Calcula o SHA-256 do conteúdo lendo em blocos.
+
+        Args:
+            source: Caminho do arquivo ou buffer binário
+
+        Returns:
+            Hash hexadecimal
+        """
+        digest = hashlib.sha256()
+
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        else:
+            source.seek(0)
+            for block in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(block)
+            source.seek(0)
+
+        return digest.hexdigest()
+
+    def lookup(
+        self, table_name: str, etag: Optional[str] = None, content_hash: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Procura um arquivo já ingerido na tabela pelo ETag ou pelo hash.
+
+        Args:
+            table_name: Tabela de destino
+            etag: ETag do objeto no S3
+            content_hash: SHA-256 do conteúdo
+
+        Returns:
+            Entrada registrada ou None se o arquivo é novo
+        """
+        with self._lock:
+            table_entries = self._entries.get(table_name, {})
+            if etag and f"etag:{etag}" in table_entries:
+                return table_entries[f"etag:{etag}"]
+            if content_hash and f"sha256:{content_hash}" in table_entries:
+                return table_entries[f"sha256:{content_hash}"]
+        return None
+
+    def record(
+        self,
+        table_name: str,
+        s3_key: str,
+        etag: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        rows_inserted: Optional[int] = None,
+    ):
+        """
+        Registra um arquivo carregado com sucesso e persiste o registro.
+
+        Args:
+            table_name: Tabela de destino
+            s3_key: Chave do arquivo no S3
+            etag: ETag do objeto no S3
+            content_hash: SHA-256 do conteúdo
+            rows_inserted: Linhas inseridas na carga
+        """
+        entry = {
+            "s3_key": s3_key,
+            "etag": etag,
+            "sha256": content_hash,
+            "rows_inserted": rows_inserted,
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        with self._lock:
+            table_entries = self._entries.setdefault(table_name, {})
+            if etag:
+                table_entries[f"etag:{etag}"] = entry
+            if content_hash:
+                table_entries[f"sha256:{content_hash}"] = entry
+            self._save()
+
+
+# Instância global (singleton pattern)
+_ledger_instance = None
+
+
+def get_ingestion_ledger() -> Optional[IngestionLedger]:
+    """
+    Retorna instância singleton do registro de ingestão.
+
+    Desligado por padrão: um arquivo reenviado depois que as linhas dele
+    saíram do banco (truncate, limpeza por período, delete manual) seria
+    pulado. Habilite com ETL_LEDGER_ENABLED=true.
+
+    Returns:
+        IngestionLedger, ou None se não habilitado via ETL_LEDGER_ENABLED
+    """
+    global _ledger_instance
+    if os.getenv("ETL_LEDGER_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return None
+    if _ledger_instance is None:
+        _ledger_instance = IngestionLedger()
+    return _ledger_instance
@@ -0,0 +1,294 @@
+"""
+Pipeline em estágios - download → transformação → carga → movimentação
+
+Cada estágio roda em suas próprias threads e se comunica com o seguinte
+por filas limitadas. Enquanto um arquivo é carregado no banco, o próximo
+já está sendo transformado e outros já estão sendo baixados.
+
+O número de arquivos "em voo" (entre o início do download e o fim da
+carga) é limitado por um semáforo, então a memória de pico não depende
+de quantos arquivos estão esperando no bucket.
+"""
+
+import queue
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# Marca de fim de fila entre estágios
+_FIM = object()
+
+
+@dataclass
+class ItemPipeline:
+    """Estado de um arquivo ao longo dos estágios do pipeline."""
+
+    seq: int
+    file_info: Any
+    chave_ordem: str
+    baixado: bool = False
+    pulado: bool = False
+    contexto: Any = None
+    resultado: Any = None
+    erro: Optional[Exception] = None
+
+
+class PipelineEmEstagios:
+    """
+    Executa download, transformação, carga e movimentação em paralelo.
+
+    Estágios e concorrência:
+        - download: download_workers threads (I/O de rede)
+        - transformação: transform_workers threads (podem delegar a um
+          pool de processos dentro de `transformar`)
+        - carga: 1 thread; arquivos com a mesma chave_ordem (tabela de
+          destino) são carregados na ordem da lista de entrada
+        - movimentação: 1 thread, em lotes de até lote_movimento chaves
+
+    Todas as etapas recebem callables, então o pipeline não conhece S3,
+    processadores ou banco.
+    """
+
+    def __init__(
+        self,
+        baixar: Callable[[Any], Any],
+        preparar: Callable[[Any], Any],
+        transformar: Callable[[Any, Any], Any],
+        carregar: Callable[[Any, Any, Any], None],
+        mover: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+        chave_ordem: Callable[[Any], str],
+        pular: Optional[Callable[[Any], bool]] = None,
+        download_workers: int = 4,
+        transform_workers: int = 1,
+        tamanho_fila: int = 2,
+        max_em_voo: Optional[int] = None,
+        lote_movimento: int = 50,
+    ):
+        """
+        Args:
+            baixar: Baixa um arquivo e devolve o file_info preenchido
+            preparar: Devolve o contexto da carga, ou None para pular o arquivo
+            transformar: (file_info, contexto) → resultado da transformação
+            carregar: (file_info, resultado, contexto) → insere no banco
+            mover: Lista de chaves S3 → {chave: {"status", "new_key", "error"}}
+            chave_ordem: Chave que define a ordem de carga (tabela de destino)
+            pular: Verificação anterior ao download (ex.: ETag já ingerido)
+            download_workers: Downloads simultâneos
+            transform_workers: Transformações simultâneas
+            tamanho_fila: Capacidade das filas download→transformação e
+                transformação→carga
+            max_em_voo: Máximo de arquivos entre download e fim da carga
+                (padrão: soma das capacidades dos estágios)
+            lote_movimento: Máximo de chaves por chamada de mover
+        """
+        self.baixar = baixar
+        self.preparar = preparar
+        self.transformar = transformar
+        self.carregar = carregar
+        self.mover = mover
+        self.chave_ordem = chave_ordem
+        self.pular = pular
+        self.download_workers = max(1, download_workers)
+        self.transform_workers = max(1, transform_workers)
+        self.tamanho_fila = max(1, tamanho_fila)
+        self.max_em_voo = max_em_voo or (
+            self.download_workers + self.transform_workers + 2 * self.tamanho_fila + 1
+        )
+        self.lote_movimento = max(1, lote_movimento)
+
+    def executar(self, arquivos: List[Any]) -> Dict[str, Any]:
+        """
+        Processa os arquivos pelo pipeline e aguarda todos os estágios.
+
+        Args:
+            arquivos: Arquivos listados (ainda não baixados)
+
+        Returns:
+            Dict com sucessos, falhas, falhas_download e movimentos
+        """
+        itens = [
+            ItemPipeline(seq, arquivo, self.chave_ordem(arquivo))
+            for seq, arquivo in enumerate(arquivos)
+        ]
+
+        self._em_voo = threading.Semaphore(self.max_em_voo)
+        self._fila_download: queue.Queue = queue.Queue()
+        self._fila_transformacao: queue.Queue = queue.Queue(maxsize=self.tamanho_fila)
+        self._fila_carga: queue.Queue = queue.Queue(maxsize=self.tamanho_fila)
+        self._fila_movimento: queue.Queue = queue.Queue()
+
+        self._ordem: Dict[str, deque] = defaultdict(deque)
+        for item in itens:
+            self._ordem[item.chave_ordem].append(item.seq)
+
+        self._sucessos, self._falhas, self._falhas_download = 0, 0, 0
+        self._movimentos: Dict[str, Dict[str, Any]] = {}
+
+        alimentador = threading.Thread(target=self._alimentar, args=(itens,), daemon=True)
+        downloads = self._iniciar(self._estagio_download, self.download_workers)
+        transformacoes = self._iniciar(self._estagio_transformacao, self.transform_workers)
+        carga = self._iniciar(self._estagio_carga, 1)
+        movimento = self._iniciar(self._estagio_movimento, 1)
+        alimentador.start()
+
+        # Encerra cada estágio quando o anterior terminar
+        alimentador.join()
+        self._encerrar(downloads, self._fila_transformacao, self.transform_workers)
+        self._encerrar(transformacoes, self._fila_carga, 1)
+        self._encerrar(carga, self._fila_movimento, 1)
+        for thread in movimento:
+            thread.join()
+
+        return {
+            "sucessos": self._sucessos,
+            "falhas": self._falhas,
+            "falhas_download": self._falhas_download,
+            "movimentos": self._movimentos,
+        }
+
+    @staticmethod
+    def _iniciar(alvo: Callable[[], None], quantidade: int) -> List[threading.Thread]:
+        """Inicia as threads de um estágio."""
+        threads = [threading.Thread(target=alvo, daemon=True) for _ in range(quantidade)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    @staticmethod
+    def _encerrar(threads: List[threading.Thread], fila_seguinte: queue.Queue, consumidores: int):
+        """Aguarda um estágio e sinaliza fim para os consumidores do próximo."""
+        for thread in threads:
+            thread.join()
+        for _ in range(consumidores):
+            fila_seguinte.put(_FIM)
+
+    def _alimentar(self, itens: List[ItemPipeline]):
+        """Libera os arquivos para download respeitando o limite em voo."""
+        for item in itens:
+            self._em_voo.acquire()
+            self._fila_download.put(item)
+        for _ in range(self.download_workers):
+            self._fila_download.put(_FIM)
+
+    def _estagio_download(self):
+        """Baixa arquivos (ou marca como pulados) e prepara a carga."""
+        while True:
+            item = self._fila_download.get()
+            if item is _FIM:
+                return
+
+            arquivo = item.file_info
+            try:
+                if self.pular and self.pular(arquivo):
+                    print(f"⏭️ Ignorado (já ingerido): {arquivo.filename}")
+                    item.pulado = True
+                else:
+                    item.file_info = self.baixar(arquivo)
+                    item.baixado = True
+                    print(f"✅ Baixado: {arquivo.filename}")
+
+                    item.contexto = self.preparar(item.file_info)
+                    item.pulado = item.contexto is None
+
+            except Exception as e:
+                if item.baixado:
+                    print(f"❌ Erro processando {arquivo.filename}: {e}")
+                else:
+                    print(f"❌ Erro baixando {arquivo.filename}: {e}")
+                item.erro = e
+
+            self._fila_transformacao.put(item)
+
+    def _estagio_transformacao(self):
+        """Transforma os arquivos baixados."""
+        while True:
+            item = self._fila_transformacao.get()
+            if item is _FIM:
+                return
+
+            if item.erro is None and not item.pulado:
+                try:
+                    item.resultado = self.transformar(item.file_info, item.contexto)
+                except Exception as e:
+                    print(f"❌ Erro processando {item.file_info.filename}: {e}")
+                    item.erro = e
+
+            self._fila_carga.put(item)
+
+    def _estagio_carga(self):
+        """Carrega na ordem de entrada por chave_ordem e envia para movimentação."""
+        prontos: Dict[int, ItemPipeline] = {}
+
+        while True:
+            item = self._fila_carga.get()
+            if item is _FIM:
+                return
+
+            prontos[item.seq] = item
+            ordem = self._ordem[item.chave_ordem]
+
+            while ordem and ordem[0] in prontos:
+                self._finalizar(prontos.pop(ordem.popleft()))
+
+    def _finalizar(self, item: ItemPipeline):
+        """Executa a carga de um item e libera sua vaga no pipeline."""
+        try:
+            if item.erro is not None:
+                if item.baixado or item.pulado:
+                    self._falhas += 1
+                else:
+                    self._falhas_download += 1
+                    return
+            elif item.pulado:
+                self._sucessos += 1
+            else:
+                try:
+                    self.carregar(item.file_info, item.resultado, item.contexto)
+                    self._sucessos += 1
+                except Exception as e:
+                    print(f"❌ Erro processando {item.file_info.filename}: {e}")
+                    self._falhas += 1
+
+            # Igual ao modo serial: todo arquivo baixado vai para 'processado'
+            self._fila_movimento.put(item.file_info)
+
+        finally:
+            item.resultado = None
+            self._em_voo.release()
+
+    def _estagio_movimento(self):
+        """Move arquivos para 'processado' em lotes conforme as cargas terminam."""
+        fim = False
+
+        while not fim:
+            arquivo = self._fila_movimento.get()
+            if arquivo is _FIM:
+                return
+
+            lote = [arquivo]
+            while len(lote) < self.lote_movimento:
+                try:
+                    proximo = self._fila_movimento.get_nowait()
+                except queue.Empty:
+                    break
+                if proximo is _FIM:
+                    fim = True
+                    break
+                lote.append(proximo)
+
+            try:
+                resultado = self.mover([a.s3_key for a in lote])
+            except Exception as e:
+                resultado = {
+                    a.s3_key: {"status": "error", "new_key": None, "error": str(e)}
+                    for a in lote
+                }
+
+            for a in lote:
+                movimento = resultado[a.s3_key]
+                self._movimentos[a.s3_key] = movimento
+                if movimento["status"] == "success":
+                    print(f"✅ {a.filename} movido para processado")
+                else:
+                    print(f"⚠️ {a.filename} não foi movido: {movimento['error']}")
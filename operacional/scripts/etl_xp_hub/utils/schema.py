@@ -0,0 +1,144 @@
+"""
+Schema declarativo de processador
+
+Boa parte dos processadores repete a mesma sequência: renomear, limpar
+códigos, normalizar texto, converter datas/números/booleanos, adicionar
+data_carga e reordenar. O ProcessorSchema descreve essa sequência com as
+próprias constantes do módulo (COLUMN_MAPPING, TEXT_COLUMNS...) e
+compile() gera a função de transformação.
+
+A função gerada grava os passos no plano lazy da Tabela e o executa uma
+vez: cada coluna é convertida numa única passada, filtros de linha rodam
+antes das conversões e colunas fora de column_order nem são convertidas.
+
+Exemplo:
+    SCHEMA = ProcessorSchema.from_constants(globals(), add_processing_date=True)
+    transformar = SCHEMA.compile()
+
+    def processar_vendas(file_path, buffer=None):
+        return transformar(Tabela(file_path, buffer=buffer))
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional
+
+from processors.tabela import Tabela
+
+# Constante do módulo do processador -> campo do schema
+CONSTANTES_SCHEMA = {
+    "COLUMN_MAPPING": "column_mapping",
+    "REQUIRED_COLUMNS": "required_columns",
+    "TEXT_COLUMNS": "text_columns",
+    "DATE_COLUMNS": "date_columns",
+    "NUMERIC_COLUMNS": "numeric_columns",
+    "MONETARY_COLUMNS": "monetary_columns",
+    "BOOLEAN_COLUMNS": "boolean_columns",
+    "COLUMN_ORDER": "column_order",
+}
+
+
+@dataclass
+class ProcessorSchema:
+    """
+    Descrição declarativa das transformações de um processador.
+
+    Os passos são aplicados nesta ordem (a mesma dos processadores
+    escritos à mão):
+        1. validação de required_columns (nomes do Excel)
+        2. remoção das últimas remove_last_rows linhas
+        3. renomeação (column_mapping)
+        4. limpeza de códigos (code_columns) e CNPJs (cnpj_columns)
+        5. texto, datas, números, valores monetários e booleanos
+        6. converters: função aplicada a cada valor da coluna
+        7. data_carga (add_processing_date) e reordenação (column_order)
+    """
+
+    column_mapping: Dict[str, str] = field(default_factory=dict)
+    required_columns: List[str] = field(default_factory=list)
+    remove_last_rows: int = 0
+    code_columns: Dict[str, str] = field(default_factory=dict)
+    cnpj_columns: List[str] = field(default_factory=list)
+    text_columns: List[str] = field(default_factory=list)
+    date_columns: List[str] = field(default_factory=list)
+    numeric_columns: List[str] = field(default_factory=list)
+    monetary_columns: List[str] = field(default_factory=list)
+    boolean_columns: List[str] = field(default_factory=list)
+    converters: Dict[str, Callable[[Any], Any]] = field(default_factory=dict)
+    add_processing_date: bool = False
+    column_order: Optional[List[str]] = None
+
+    @classmethod
+    def from_constants(cls, constants: Dict[str, Any], **overrides) -> "ProcessorSchema":
+        """
+        Monta o schema a partir das constantes de um módulo de processador.
+
+        Args:
+            constants: Namespace do módulo (globals()) ou dict equivalente
+            **overrides: Campos do schema que não vêm de constantes
+                         (remove_last_rows, code_columns, converters...)
+
+        Returns:
+            ProcessorSchema
+        """
+        valores = {
+            campo: constants[constante]
+            for constante, campo in CONSTANTES_SCHEMA.items()
+            if constante in constants
+        }
+        valores.update(overrides)
+
+        desconhecidos = set(valores) - {f.name for f in fields(cls)}
+        if desconhecidos:
+            raise ValueError(f"Unknown schema fields: {sorted(desconhecidos)}")
+
+        return cls(**valores)
+
+    def compile(self) -> Callable[[Tabela], Tabela]:
+        """
+        Gera a função que aplica o schema a uma Tabela.
+
+        Returns:
+            Função Tabela -> Tabela (a mesma instância, já transformada)
+        """
+        schema = self
+
+        def transformar(tabela: Tabela) -> Tabela:
+            lazy = tabela.lazy
+            tabela.lazy = True
+            try:
+                if schema.required_columns:
+                    tabela.validate_required_columns(schema.required_columns)
+                if schema.remove_last_rows:
+                    tabela.remove_last_rows(schema.remove_last_rows)
+                if schema.column_mapping:
+                    tabela.rename_columns(schema.column_mapping)
+
+                for column, chars in schema.code_columns.items():
+                    tabela.clean_column_code(column, chars)
+                for column in schema.cnpj_columns:
+                    tabela.clean_cnpj_column(column)
+
+                (
+                    tabela.normalize_text_columns(schema.text_columns)
+                    .format_date_columns(schema.date_columns)
+                    .format_numeric_columns(schema.numeric_columns)
+                    .clean_monetary_columns(schema.monetary_columns)
+                    .format_boolean_columns(schema.boolean_columns)
+                )
+
+                for column, func in schema.converters.items():
+                    tabela.apply_to_column(column, func)
+
+                if schema.add_processing_date:
+                    tabela.add_processing_date()
+                if schema.column_order:
+                    tabela.reorder_columns(schema.column_order)
+
+                # Executa o plano: uma passada por coluna
+                tabela.df
+            finally:
+                tabela.lazy = lazy
+
+            return tabela
+
+        return transformar